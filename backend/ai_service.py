@@ -1,10 +1,18 @@
 import os
+import time
+import hashlib
+import random
+import asyncio
 import logging
-from typing import Dict, List, Optional
-from openai import OpenAI
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from dotenv import load_dotenv
 import json
 from rag_service import rag_service
+from single_flight import SingleFlight
+from conversation_store import trim_to_token_budget
+from llm_provider import LLMCompletion, TransientLLMError, create_llm_provider
 
 # Load environment variables
 load_dotenv()
@@ -12,31 +20,202 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Bump whenever the explanation prompt changes so cached explanations are regenerated
+EXPLANATION_PROMPT_VERSION = 1
+
+# Maximum LLM calls in flight per process
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+# Seconds before a single LLM call is abandoned
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+# Retries after a timeout, connection error, rate limit or 5xx
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# Base delay of the jittered exponential backoff between retries
+OPENAI_RETRY_BASE_DELAY_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_DELAY_SECONDS", "0.5"))
+
+# Estimated tokens of chat history sent with each tutor turn
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+
+# Number of recent streamed responses kept for latency percentiles
+STREAM_LATENCY_SAMPLES = 1000
+
+RETRYABLE_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError, asyncio.TimeoutError,
+                    TransientLLMError)
+
 class AIService:
     """AI service for generating explanations and educational content"""
     
     def __init__(self):
-        self.client = None
-        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.explanation_prompt_version = EXPLANATION_PROMPT_VERSION
+        self.timeout_seconds = OPENAI_TIMEOUT_SECONDS
+        self.max_retries = OPENAI_MAX_RETRIES
+        self.max_concurrency = OPENAI_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Identical concurrent explanation requests share one LLM call
+        self.single_flight = SingleFlight("llm")
         
-        if self.api_key:
-            try:
-                self.client = OpenAI(api_key=self.api_key)
-                logger.info("✅ OpenAI client initialized successfully")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize OpenAI client: {e}")
-                self.client = None
-        else:
-            logger.warning("⚠️ OPENAI_API_KEY not found in environment variables")
+        # Call metrics
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.total_latency_ms = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.streams = 0
+        self.stream_ttfb_ms = deque(maxlen=STREAM_LATENCY_SAMPLES)
+        self.stream_total_ms = deque(maxlen=STREAM_LATENCY_SAMPLES)
+        
+        # OpenAI or the offline stub, selected by LLM_PROVIDER
+        self.provider = None
+        try:
+            self.provider = create_llm_provider(timeout=self.timeout_seconds)
+            if self.provider:
+                logger.info(f"✅ LLM provider '{self.provider.name}' initialized successfully")
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize LLM provider: {e}")
+        self.model = self.provider.model if self.provider else os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     
     def is_available(self) -> bool:
         """Check if AI service is available"""
-        return self.client is not None
+        return self.provider is not None
+    
+    async def _create_completion(self, **kwargs) -> LLMCompletion:
+        """
+        Run one chat completion without blocking the event loop
+        
+        At most `max_concurrency` calls are in flight; each attempt is bounded by
+        `timeout_seconds` and transient failures are retried with jittered backoff.
+        Quota errors are not retried.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    self.in_flight += 1
+                    started = time.perf_counter()
+                    try:
+                        completion = await asyncio.wait_for(
+                            self.provider.complete(**kwargs),
+                            timeout=self.timeout_seconds
+                        )
+                    finally:
+                        self.in_flight -= 1
+                self.calls += 1
+                self.total_latency_ms += (time.perf_counter() - started) * 1000
+                self.prompt_tokens += completion.prompt_tokens
+                self.completion_tokens += completion.completion_tokens
+                return completion
+            except RETRYABLE_ERRORS as e:
+                if getattr(e, "code", None) == "insufficient_quota" or attempt == self.max_retries:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                # Full jitter keeps retries from concurrent requests from aligning
+                delay = random.uniform(0, OPENAI_RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+                logger.warning(f"⚠️ LLM call failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.failures += 1
+                raise
+    
+    async def _stream_completion(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Run one streamed chat completion, yielding content tokens as they arrive
+        
+        The concurrency slot is held until the stream ends. Opening the stream is
+        retried like `_create_completion`, but only until the first token has been
+        yielded; after that an error is raised to the caller. Every wait for the
+        next token is bounded by `timeout_seconds`.
+        """
+        for attempt in range(self.max_retries + 1):
+            first_token_at = None
+            try:
+                async with self._semaphore:
+                    self.in_flight += 1
+                    started = time.perf_counter()
+                    tokens = self.provider.stream(**kwargs)
+                    try:
+                        while True:
+                            try:
+                                token = await asyncio.wait_for(tokens.__anext__(), timeout=self.timeout_seconds)
+                            except StopAsyncIteration:
+                                break
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                                self.stream_ttfb_ms.append((first_token_at - started) * 1000)
+                            yield token
+                    finally:
+                        self.in_flight -= 1
+                        await tokens.aclose()
+                total_ms = (time.perf_counter() - started) * 1000
+                self.calls += 1
+                self.streams += 1
+                self.total_latency_ms += total_ms
+                self.stream_total_ms.append(total_ms)
+                return
+            except RETRYABLE_ERRORS as e:
+                if (first_token_at is not None or getattr(e, "code", None) == "insufficient_quota"
+                        or attempt == self.max_retries):
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                delay = random.uniform(0, OPENAI_RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+                logger.warning(f"⚠️ LLM stream failed to start ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                self.failures += 1
+                raise
+    
+    @staticmethod
+    def _percentile(samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+    
+    def stats(self) -> Dict[str, any]:
+        """LLM call metrics"""
+        return {
+            "available": self.is_available(),
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_latency_ms": round(self.total_latency_ms / self.calls, 1) if self.calls else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "streams": self.streams,
+            "stream_ttfb_p50_ms": self._percentile(self.stream_ttfb_ms, 0.5),
+            "stream_ttfb_p95_ms": self._percentile(self.stream_ttfb_ms, 0.95),
+            "stream_total_p50_ms": self._percentile(self.stream_total_ms, 0.5),
+            "stream_total_p95_ms": self._percentile(self.stream_total_ms, 0.95)
+        }
     
     def is_rag_available(self, subject: str = None) -> bool:
-        """Check if RAG service is available for a subject"""
+        """
+        Check if RAG service is available for a subject
+        
+        Never waits for the embedding model: while it is still loading, the
+        warm-up is started in the background and plain explanations are used.
+        """
+        if not rag_service.is_ready():
+            rag_service.start_warm_up()
+            return False
         return rag_service.is_available(subject)
     
+    def start_rag_warm_up(self):
+        """Load the RAG embedding model in the background"""
+        rag_service.start_warm_up()
+    
+    def rag_status(self) -> Dict[str, any]:
+        return rag_service.status()
+    
+    def _flight_key(self, kind: str, **params) -> str:
+        """Identity of an explanation request for single-flight coalescing"""
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"{kind}:{params.get('subject')}:{digest[:16]}"
+    
     async def generate_rag_explanation(
         self,
         question: str,
@@ -47,6 +226,50 @@ class AIService:
         difficulty: str = "medium",
         interface_language: str = "en",
         content_language: str = None
+    ) -> Dict[str, any]:
+        """Generate a RAG explanation; identical concurrent calls share one upstream call"""
+        key = self._flight_key(
+            "rag_explanation", question=question, options=options, correct_answer=correct_answer,
+            selected_answer=selected_answer, subject=subject, difficulty=difficulty,
+            interface_language=interface_language, content_language=content_language
+        )
+        result = await self.single_flight.do(key, lambda: self._generate_rag_explanation(
+            question, options, correct_answer, selected_answer,
+            subject, difficulty, interface_language, content_language
+        ))
+        # Each caller gets its own copy of the shared result
+        return dict(result)
+    
+    async def generate_explanation(
+        self,
+        question: str,
+        options: List[Dict[str, str]],
+        correct_answer: str,
+        selected_answer: Optional[str] = None,
+        subject: str = "General",
+        difficulty: str = "medium",
+        language: str = "en"
+    ) -> Dict[str, any]:
+        """Generate an explanation; identical concurrent calls share one LLM call"""
+        key = self._flight_key(
+            "explanation", question=question, options=options, correct_answer=correct_answer,
+            selected_answer=selected_answer, subject=subject, difficulty=difficulty, language=language
+        )
+        result = await self.single_flight.do(key, lambda: self._generate_explanation(
+            question, options, correct_answer, selected_answer, subject, difficulty, language
+        ))
+        return dict(result)
+    
+    async def _generate_rag_explanation(
+        self,
+        question: str,
+        options: List[Dict[str, str]],
+        correct_answer: str,
+        selected_answer: Optional[str] = None,
+        subject: str = "General",
+        difficulty: str = "medium",
+        interface_language: str = "en",
+        content_language: str = None
     ) -> Dict[str, any]:
         """
         Generate an AI explanation using RAG system
@@ -111,8 +334,8 @@ class AIService:
             {explanation_focus} Please provide a detailed educational explanation with step-by-step reasoning.
             """
             
-            # Query the RAG system
-            rag_response = rag_service.query(
+            # Query the RAG system (off the event loop)
+            rag_response = await rag_service.aquery(
                 question=rag_query,
                 interface_language=interface_language,
                 content_language=content_language,
@@ -167,7 +390,7 @@ class AIService:
                 subject, difficulty, interface_language
             )
     
-    async def generate_explanation(
+    async def _generate_explanation(
         self,
         question: str,
         options: List[Dict[str, str]],
@@ -270,8 +493,7 @@ Make sure the explanation is:
 """
 
             # Make API call
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._create_completion(
                 messages=[
                     {
                         "role": "system", 
@@ -284,7 +506,7 @@ Make sure the explanation is:
             )
             
             # Parse the response
-            explanation_text = response.choices[0].message.content.strip()
+            explanation_text = response.content.strip()
             
             # Try to parse as JSON
             try:
@@ -331,32 +553,22 @@ Make sure the explanation is:
                 "Course materials and lecture notes"
             ],
             "bias_check": "No significant biases detected in this question.",
-            "reflection": "Understanding this concept will help you tackle similar problems in the future. Keep practicing!"
+            "reflection": "Understanding this concept will help you tackle similar problems in the future. Keep practicing!",
+            # Marks generic content so callers do not cache it as a real explanation
+            "fallback": True
         }
     
-    async def generate_chat_response(
+    def _build_chat_messages(
         self,
         messages: List[Dict[str, str]],
         question_context: Optional[Dict[str, any]] = None,
-        language: str = "en"
-    ) -> str:
-        """
-        Generate a conversational AI response based on chat history
-        
-        Args:
-            messages: List of conversation messages with role and content
-            question_context: Optional context about the original question
-            
-        Returns:
-            AI response string
-        """
-        if not self.is_available():
-            return self._get_fallback_chat_response()
-        
-        try:
-            # Language-specific system prompts
-            system_prompts = {
-                "en": """You are an expert AI tutor helping students understand educational concepts. You maintain context throughout the conversation and provide helpful, educational responses in English.
+        language: str = "en",
+        summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """System prompt, question context, summary and recent history for a chat call"""
+        # Language-specific system prompts
+        system_prompts = {
+            "en": """You are an expert AI tutor helping students understand educational concepts. You maintain context throughout the conversation and provide helpful, educational responses in English.
 
 Guidelines:
 - Maintain conversation context and remember what was discussed
@@ -367,7 +579,7 @@ Guidelines:
 - If asked about topics outside the original question, still try to be helpful while staying educational
 - Keep responses concise but informative
 - Always respond in English""",
-                "pt": """Você é um tutor de IA especialista ajudando estudantes a entender conceitos educacionais. Você mantém o contexto durante a conversa e fornece respostas úteis e educacionais em português brasileiro.
+            "pt": """Você é um tutor de IA especialista ajudando estudantes a entender conceitos educacionais. Você mantém o contexto durante a conversa e fornece respostas úteis e educacionais em português brasileiro.
 
 Diretrizes:
 - Mantenha o contexto da conversa e lembre-se do que foi discutido
@@ -378,7 +590,7 @@ Diretrizes:
 - Se perguntado sobre tópicos fora da questão original, ainda tente ser útil mantendo-se educacional
 - Mantenha as respostas concisas mas informativas
 - Sempre responda em português brasileiro""",
-                "es": """Eres un tutor de IA experto que ayuda a los estudiantes a entender conceptos educativos. Mantienes el contexto durante la conversación y proporcionas respuestas útiles y educativas en español.
+            "es": """Eres un tutor de IA experto que ayuda a los estudiantes a entender conceptos educativos. Mantienes el contexto durante la conversación y proporcionas respuestas útiles y educativas en español.
 
 Pautas:
 - Mantén el contexto de la conversación y recuerda lo que se ha discutido
@@ -389,48 +601,164 @@ Pautas:
 - Si se pregunta sobre temas fuera de la pregunta original, aún trata de ser útil manteniéndote educativo
 - Mantén las respuestas concisas pero informativas
 - Siempre responde en español"""
-            }
-            
-            system_prompt = system_prompts.get(language, system_prompts["en"])
+        }
+        
+        system_prompt = system_prompts.get(language, system_prompts["en"])
 
-            # Add question context if provided
-            if question_context:
-                context_info = f"""
-                
+        # Add question context if provided
+        if question_context:
+            context_info = f"""
+            
 Original Question Context:
 - Question: {question_context.get('question', 'N/A')}
 - Student's Answer: {question_context.get('selected_answer_text', 'N/A')}
 - Correct Answer: {question_context.get('correct_answer_text', 'N/A')}
 - Was Correct: {question_context.get('is_correct', False)}"""
-                system_prompt += context_info
+            system_prompt += context_info
 
-            # Prepare messages for API call
-            api_messages = [{"role": "system", "content": system_prompt}]
+        # Earlier turns that were folded into the conversation's rolling summary
+        if summary:
+            system_prompt += f"""
+
+Summary of the earlier conversation:
+{summary}"""
+
+        # Prepare messages for API call
+        api_messages = [{"role": "system", "content": system_prompt}]
+        
+        # Add the most recent conversation history that fits the token budget
+        recent_messages = trim_to_token_budget(messages, CHAT_HISTORY_TOKEN_BUDGET)
+        api_messages.extend({"role": message["role"], "content": message["content"]} for message in recent_messages)
+        return api_messages
+    
+    def _is_quota_error(self, error: Exception) -> bool:
+        """Whether an LLM error means the account is out of quota or billing"""
+        error_str = str(error).lower()
+        return any(keyword in error_str for keyword in ['quota', 'billing', 'insufficient_quota', '429'])
+    
+    async def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        question_context: Optional[Dict[str, any]] = None,
+        language: str = "en",
+        summary: Optional[str] = None
+    ) -> str:
+        """
+        Generate a conversational AI response based on chat history
+        
+        Args:
+            messages: List of conversation messages with role and content
+            question_context: Optional context about the original question
+            summary: Optional rolling summary of earlier turns
             
-            # Add conversation history, limiting to last 10 messages to manage token usage
-            recent_messages = messages[-10:] if len(messages) > 10 else messages
-            api_messages.extend(recent_messages)
+        Returns:
+            AI response string
+        """
+        if not self.is_available():
+            return self._get_fallback_chat_response()
+        
+        try:
+            api_messages = self._build_chat_messages(messages, question_context, language, summary)
 
             # Make API call
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._create_completion(
                 messages=api_messages,
                 max_tokens=500,
                 temperature=0.7
             )
             
-            response_text = response.choices[0].message.content.strip()
+            response_text = response.content.strip()
             logger.info("✅ AI chat response generated successfully")
             return response_text
             
         except Exception as e:
             logger.error(f"Failed to generate AI chat response: {e}")
             # Check if it's specifically a quota/billing issue
-            error_str = str(e).lower()
-            if any(keyword in error_str for keyword in ['quota', 'billing', 'insufficient_quota', '429']):
+            if self._is_quota_error(e):
                 return self._get_quota_exceeded_response()
             return self._get_fallback_chat_response()
     
+    async def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        question_context: Optional[Dict[str, any]] = None,
+        language: str = "en",
+        summary: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Stream a conversational AI response as the model generates it
+        
+        Yields `{"type": "token", "content": ...}` events. When the LLM is
+        unavailable or fails, a `{"type": "fallback", "reason": ..., "content": ...}`
+        event carries the same fallback or quota-exceeded message that
+        `generate_chat_response` would return.
+        """
+        if not self.is_available():
+            yield {"type": "fallback", "reason": "unavailable", "content": self._get_fallback_chat_response()}
+            return
+        
+        tokens_sent = False
+        try:
+            api_messages = self._build_chat_messages(messages, question_context, language, summary)
+            async for token in self._stream_completion(
+                messages=api_messages,
+                max_tokens=500,
+                temperature=0.7
+            ):
+                tokens_sent = True
+                yield {"type": "token", "content": token}
+            logger.info("✅ AI chat response streamed successfully")
+            
+        except Exception as e:
+            logger.error(f"Failed to stream AI chat response: {e}")
+            if self._is_quota_error(e):
+                yield {"type": "fallback", "reason": "quota_exceeded", "content": self._get_quota_exceeded_response()}
+            elif tokens_sent:
+                yield {"type": "fallback", "reason": "interrupted",
+                       "content": "\n\n⚠️ The response was interrupted. Please try again in a few moments."}
+            else:
+                yield {"type": "fallback", "reason": "unavailable", "content": self._get_fallback_chat_response()}
+    
+    async def summarize_conversation(
+        self,
+        previous_summary: Optional[str],
+        messages: List[Dict[str, str]],
+        language: str = "en"
+    ) -> Optional[str]:
+        """
+        Fold older tutor chat turns into a short rolling summary
+        
+        Returns:
+            The new summary, or None when the LLM is unavailable or fails
+        """
+        if not self.is_available():
+            return None
+        
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        prompt = f"""Summarize this tutoring conversation so the summary can replace the messages as context for later turns.
+Keep the student's questions, misconceptions and what the tutor already explained. Use at most 150 words and write in the language code "{language}".
+
+Previous summary:
+{previous_summary or "None"}
+
+Messages to add:
+{transcript}"""
+        
+        try:
+            response = await self._create_completion(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=300,
+                temperature=0.3
+            )
+            return response.content.strip()
+        except Exception as e:
+            logger.error(f"Failed to summarize AI chat conversation: {e}")
+            return None
+    
+    def is_fallback_chat_response(self, response: str) -> bool:
+        """Whether a chat reply is a canned fallback that should not enter the history"""
+        return response in (self._get_fallback_chat_response(), self._get_quota_exceeded_response())
+    
     def _get_quota_exceeded_response(self) -> str:
         """Get a specific response when OpenAI quota is exceeded"""
         return """🚨 **OpenAI API Quota Exceeded**
@@ -519,8 +847,7 @@ Provide practical, actionable study tips in JSON format:
 }}
 """
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._create_completion(
                 messages=[
                     {"role": "system", "content": "You are a helpful study advisor. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
@@ -529,7 +856,7 @@ Provide practical, actionable study tips in JSON format:
                 temperature=0.8
             )
             
-            tips_text = response.choices[0].message.content.strip()
+            tips_text = response.content.strip()
             tips_data = json.loads(tips_text)
             
             return tips_data.get("tips", self._get_fallback_study_tips(subject))
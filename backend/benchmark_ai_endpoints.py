@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Throughput and tail-latency benchmark of the AI endpoints, fully offline.
+
+Start the API with the in-process stub LLM, e.g.
+
+    LLM_PROVIDER=stub STUB_LLM_LATENCY_MS=800 STUB_LLM_LATENCY_SIGMA=0.5 \\
+    STUB_LLM_FAIL_RATE=0.02 STUB_LLM_SEED=7 uvicorn main:app --port 8000
+
+then fire concurrent requests at /ai-explanation and /ai-chat. Each
+explanation request asks for a different (question, selected answer)
+variant until they run out, so the first pass measures generation rather
+than the explanation cache.
+
+Usage:
+    python benchmark_ai_endpoints.py --requests 200 --concurrency 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BASE_URL = os.getenv("TEST_BASE_URL", "http://127.0.0.1:8000/api/v1")
+TEST_EMAIL = os.getenv("TEST_EMAIL", "test@example.com")
+TEST_PASSWORD = os.getenv("TEST_PASSWORD", "TestPassword123!")
+
+
+def login() -> dict:
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    if response.status_code != 200:
+        print(f"❌ Login failed: {response.status_code} {response.text}")
+        sys.exit(1)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def load_questions(headers: dict) -> list:
+    exams = requests.get(f"{BASE_URL}/exams", headers=headers).json()
+    questions = []
+    for exam_summary in exams:
+        exam = requests.get(f"{BASE_URL}/exams/{exam_summary['id']}", headers=headers).json()
+        for subject in exam.get("subjects", []):
+            questions += requests.get(
+                f"{BASE_URL}/exams/{exam['id']}/subjects/{subject['id']}/questions", headers=headers
+            ).json()
+    return questions
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_load(name: str, call, total: int, concurrency: int):
+    """Run `call(i)` `total` times with `concurrency` threads and print latency percentiles"""
+    def timed(i):
+        started = time.perf_counter()
+        ok = call(i)
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    print(f"\n📊 {name}: {total} requests, concurrency {concurrency}")
+    print(f"   throughput {total / elapsed:8.1f} req/s   errors {errors}")
+    print(f"   p50 {percentile(latencies, 0.5):8.0f} ms   p95 {percentile(latencies, 0.95):8.0f} ms   "
+          f"p99 {percentile(latencies, 0.99):8.0f} ms   max {max(latencies):8.0f} ms   "
+          f"mean {statistics.mean(latencies):8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /ai-explanation and /ai-chat against a stub LLM")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    headers = login()
+    questions = load_questions(headers)
+    if not questions:
+        print("❌ No questions available")
+        sys.exit(1)
+    variants = [(question["id"], option["id"]) for question in questions for option in question["options"]]
+    print(f"🧪 {len(questions)} questions, {len(variants)} explanation variants")
+
+    def explanation(i):
+        question_id, selected_answer = variants[i % len(variants)]
+        response = requests.get(f"{BASE_URL}/questions/{question_id}/ai-explanation",
+                                params={"selected_answer": selected_answer}, headers=headers)
+        return response.status_code == 200
+
+    def chat(i):
+        question_id = questions[i % len(questions)]["id"]
+        response = requests.post(f"{BASE_URL}/questions/{question_id}/ai-chat", headers=headers,
+                                 json={"messages": [{"role": "user", "content": f"Why is this the answer? ({i})"}]})
+        return response.status_code == 200
+
+    run_load("/ai-explanation", explanation, args.requests, args.concurrency)
+    run_load("/ai-chat", chat, args.requests, args.concurrency)
+
+    # Only visible when the benchmark user is an admin
+    metrics = requests.get(f"{BASE_URL}/admin/system/metrics", headers=headers)
+    if metrics.status_code == 200:
+        llm = metrics.json()["llm"]
+        print(f"\n🔎 Server LLM metrics: {llm['calls']} calls, {llm['retries']} retries, "
+              f"{llm['failures']} failures, avg {llm['avg_latency_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
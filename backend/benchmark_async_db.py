@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the async data-access layer.
+
+Simulates concurrent route handlers against a local mongod and compares:
+- "blocking": pymongo called directly inside the coroutine (the old handlers)
+- "async":    the same query awaited through database.AsyncDatabase
+
+Usage:
+    python benchmark_async_db.py --uri mongodb://localhost:27017 --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from pymongo import MongoClient
+
+from database import AsyncDatabase
+
+BENCH_DB = "artori_benchmark"
+BENCH_COLLECTION = "bench_users"
+
+
+def build_query(delay_ms: int):
+    """Query that optionally makes the server sleep to mimic a slow round-trip"""
+    if delay_ms > 0:
+        return {"email": "bench@artori.app", "$where": f"sleep({delay_ms}) || true"}
+    return {"email": "bench@artori.app"}
+
+
+async def run_load(handler, total_requests: int, concurrency: int):
+    """Fire `total_requests` handler calls with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            await handler()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+    return elapsed, latencies
+
+
+def report(label: str, elapsed: float, latencies, total_requests: int):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"   {label:<9} {total_requests / elapsed:>9.1f} req/s   "
+          f"p50 {statistics.median(latencies):>8.2f} ms   p95 {p95:>8.2f} ms   total {elapsed:.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocking vs async MongoDB access")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=int, default=10, help="Server-side sleep per query (0 disables)")
+    args = parser.parse_args()
+
+    print("🧪 Async data layer benchmark")
+    print("=" * 60)
+
+    client = MongoClient(args.uri, maxPoolSize=args.concurrency, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"❌ Could not reach mongod at {args.uri}: {e}")
+        sys.exit(1)
+
+    sync_db = client[BENCH_DB]
+    sync_db[BENCH_COLLECTION].delete_many({})
+    sync_db[BENCH_COLLECTION].insert_one({"email": "bench@artori.app", "name": "Bench User"})
+    async_db = AsyncDatabase(sync_db)
+    query = build_query(args.delay_ms)
+
+    async def blocking_handler():
+        sync_db[BENCH_COLLECTION].find_one(query)
+
+    async def async_handler():
+        await async_db[BENCH_COLLECTION].find_one(query)
+
+    print(f"   requests={args.requests} concurrency={args.concurrency} server delay={args.delay_ms}ms\n")
+    blocking_elapsed, blocking_latencies = await run_load(blocking_handler, args.requests, args.concurrency)
+    report("blocking", blocking_elapsed, blocking_latencies, args.requests)
+    async_elapsed, async_latencies = await run_load(async_handler, args.requests, args.concurrency)
+    report("async", async_elapsed, async_latencies, args.requests)
+
+    print(f"\n✅ Throughput speedup: {blocking_elapsed / async_elapsed:.1f}x")
+    client.drop_database(BENCH_DB)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for keyset vs skip/limit pagination of the admin user listing.
+
+Seeds a users collection on a local mongod, then times fetching page 1 and
+a deep page (default 1000) with skip/limit and with the opaque cursors
+from pagination.py. Keyset pages should cost the same at any depth.
+
+Usage:
+    python benchmark_pagination.py --uri mongodb://localhost:27017 --users 100000 --deep-page 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from database import AsyncDatabase
+from migrations import run_migrations
+from pagination import fetch_page
+
+BENCH_DB = "artori_pagination_benchmark"
+
+
+def seed(db, user_count: int):
+    """Insert users with distinct, descending creation times"""
+    start = datetime.utcnow()
+    batch = []
+    for i in range(user_count):
+        batch.append({"email": f"bench{i}@artori.app", "name": f"Bench {i}", "role": "student",
+                      "status": "active", "created_at": start - timedelta(seconds=i)})
+        if len(batch) == 10000:
+            db.users.insert_many(batch)
+            batch = []
+    if batch:
+        db.users.insert_many(batch)
+
+
+async def time_call(fn, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark skip/limit vs keyset pagination")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--deep-page", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.deep_page * args.page_size > args.users:
+        print(f"❌ Page {args.deep_page} needs at least {args.deep_page * args.page_size} users")
+        sys.exit(1)
+
+    print("🧪 Pagination benchmark")
+    print("=" * 60)
+
+    client = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"❌ Could not reach mongod at {args.uri}: {e}")
+        sys.exit(1)
+
+    client.drop_database(BENCH_DB)
+    sync_db = client[BENCH_DB]
+    try:
+        run_migrations(sync_db)
+        seed(sync_db, args.users)
+        db = AsyncDatabase(sync_db)
+        limit = args.page_size
+
+        # Walk to the deep page once (untimed) to obtain its cursor
+        cursor = None
+        for _ in range(args.deep_page - 1):
+            _, cursor = await fetch_page(db.users, {}, limit, cursor=cursor)
+        deep_cursor = cursor
+
+        async def skip_page(page):
+            return await db.users.find({}).sort("created_at", -1).skip((page - 1) * limit).limit(limit).to_list()
+
+        print(f"   users={args.users} page_size={limit} iterations={args.iterations}\n")
+        results = {
+            "skip p1": await time_call(lambda: skip_page(1), args.iterations),
+            f"skip p{args.deep_page}": await time_call(lambda: skip_page(args.deep_page), args.iterations),
+            "keyset p1": await time_call(lambda: fetch_page(db.users, {}, limit), args.iterations),
+            f"keyset p{args.deep_page}": await time_call(
+                lambda: fetch_page(db.users, {}, limit, cursor=deep_cursor), args.iterations),
+        }
+        for label, median in results.items():
+            print(f"   {label:<14} p50 {median:>8.2f} ms")
+
+        keyset_ratio = results[f"keyset p{args.deep_page}"] / results["keyset p1"]
+        skip_ratio = results[f"skip p{args.deep_page}"] / results["skip p1"]
+        print(f"\n✅ Deep/first page latency ratio: keyset {keyset_ratio:.1f}x, skip {skip_ratio:.1f}x")
+    finally:
+        client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
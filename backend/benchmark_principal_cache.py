@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the authenticated-principal cache.
+
+Resolves a token's user on every simulated request against a local mongod,
+once with a users.find_one per request (the old get_current_user) and once
+through principal_cache, and reports the latency saved per request.
+
+Usage:
+    python benchmark_principal_cache.py --uri mongodb://localhost:27017 --requests 2000 --users 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from database import AsyncDatabase
+from principal_cache import PrincipalCache
+
+BENCH_DB = "artori_principal_benchmark"
+
+
+async def resolve_uncached(db, user_id: str, iat: int):
+    return await db.users.find_one({"_id": ObjectId(user_id)})
+
+
+def make_cached_resolver(cache: PrincipalCache):
+    async def resolve_cached(db, user_id: str, iat: int):
+        key = (user_id, iat)
+        user = cache.get(key)
+        if user is not None:
+            return user
+        version = cache.version
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        cache.put(key, dict(user), version)
+        return user
+    return resolve_cached
+
+
+async def measure(label: str, resolver, db, tokens, total_requests: int):
+    latencies = []
+    for _ in range(total_requests):
+        user_id, iat = random.choice(tokens)
+        started = time.perf_counter()
+        await resolver(db, user_id, iat)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    mean = statistics.mean(latencies)
+    print(f"   {label:<9} mean {mean:>7.3f} ms   p50 {statistics.median(latencies):>7.3f} ms   p95 {p95:>7.3f} ms")
+    return mean
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark principal resolution with and without the cache")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50, help="Distinct tokens in the request mix")
+    args = parser.parse_args()
+
+    print("🧪 Principal cache benchmark")
+    print("=" * 60)
+
+    client = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"❌ Could not reach mongod at {args.uri}: {e}")
+        sys.exit(1)
+
+    client.drop_database(BENCH_DB)
+    sync_db = client[BENCH_DB]
+    try:
+        now = datetime.utcnow()
+        result = sync_db.users.insert_many([
+            {"email": f"bench{i}@artori.app", "name": f"Bench {i}", "role": "student", "created_at": now}
+            for i in range(args.users)
+        ])
+        tokens = [(str(user_id), int(now.timestamp())) for user_id in result.inserted_ids]
+        db = AsyncDatabase(sync_db)
+        cache = PrincipalCache(ttl_seconds=60)
+
+        print(f"   requests={args.requests} tokens={args.users}\n")
+        uncached = await measure("find_one", resolve_uncached, db, tokens, args.requests)
+        cached = await measure("cached", make_cached_resolver(cache), db, tokens, args.requests)
+
+        stats = cache.stats()
+        print(f"\n   cache hit rate {stats['hit_rate'] * 100:.1f}%")
+        print(f"✅ Saved {uncached - cached:.3f} ms per request ({uncached / cached:.0f}x faster lookups)")
+    finally:
+        client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
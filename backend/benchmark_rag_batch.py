@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark of RAGService.query_batch against serial RAGService.query calls.
+
+Builds a throw-away local Chroma collection, then answers the same 20
+questions (an "explain all my wrong answers" page) twice:
+
+- serially, one `query` per question (embed, search and LLM call each),
+- with one `query_batch` call (one embedding pass, one multi-query search,
+  LLM calls fanned out under a concurrency cap).
+
+The LLM is the in-process stub with a fixed latency, so the run is offline
+apart from downloading the embedding model. Pass --fake-embeddings to skip
+the model as well (then only search and LLM fan-out are compared). The
+query embedding cache is cleared before each run.
+
+Usage:
+    python benchmark_rag_batch.py --questions 20 --llm-latency-ms 300 [--fake-embeddings]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ["STUB_LLM_LATENCY_DISTRIBUTION"] = "fixed"
+os.environ.pop("CHROMA_API_KEY", None)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare serial RAG queries with one batch query")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=200, help="Chunks ingested into the test collection")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM calls in flight during the batch")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Use deterministic fake embeddings")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["STUB_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ.setdefault("STUB_LLM_TOKENS_PER_SECOND", "0")
+
+    from langchain.schema import Document
+
+    from embedding_cache import CachedEmbeddings, embedding_cache
+    from rag_service import RAGService
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        service = RAGService(persist_directory=persist_directory)
+        if args.fake_embeddings:
+            from langchain.embeddings import DeterministicFakeEmbedding
+
+            def fake_embeddings():
+                service.embeddings = DeterministicFakeEmbedding(size=384)
+                service.query_embeddings = CachedEmbeddings(service.embeddings, "fake", embedding_cache)
+
+            service._initialize_embeddings = fake_embeddings
+
+        print(f"📚 Ingesting {args.chunks} chunks")
+        documents = [
+            Document(page_content=f"Note {i}: {topic} explained with a worked example and common mistakes.",
+                     metadata={"content_language": "en"})
+            for i, topic in enumerate(["cell respiration", "photosynthesis", "mitosis", "meiosis", "enzymes"]
+                                      * (args.chunks // 5))
+        ]
+        if not service.add_documents(documents, subject="biology"):
+            print("❌ Ingestion failed")
+            sys.exit(1)
+
+        questions = [f"Question {i}: why is the answer about {documents[i % len(documents)].page_content[9:30]} wrong?"
+                     for i in range(args.questions)]
+
+        embedding_cache.clear()
+        started = time.perf_counter()
+        serial = [service.query(question=question, subject="biology") for question in questions]
+        serial_seconds = time.perf_counter() - started
+
+        embedding_cache.clear()
+        started = time.perf_counter()
+        batch = service.query_batch(questions, subject="biology", max_concurrency=args.concurrency)
+        batch_seconds = time.perf_counter() - started
+
+    failed = sum(1 for response in serial + batch if response.get("fallback"))
+    print(f"\n📊 {args.questions} questions, stub LLM {args.llm_latency_ms:.0f} ms, "
+          f"batch LLM concurrency {args.concurrency}")
+    print(f"   serial query   {serial_seconds * 1000:8.0f} ms   ({serial_seconds / args.questions * 1000:.0f} ms/question)")
+    print(f"   query_batch    {batch_seconds * 1000:8.0f} ms   ({batch_seconds / args.questions * 1000:.0f} ms/question)")
+    print(f"   speed-up       {serial_seconds / batch_seconds:8.1f}x")
+    if failed:
+        print(f"❌ {failed} responses fell back")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the per-query overhead of the two RAG engines.
+
+Runs the same queries through `RAGService.query` with RAG_ENGINE=chain
+(LangChain vectorstore + "stuff" QA chain) and RAG_ENGINE=direct (Chroma
+collection queried with precomputed embeddings, own prompt assembly, LLM
+provider), one at a time. The stub LLM answers instantly and the
+embeddings are deterministic fakes, so what is measured is the retrieval
+and orchestration overhead around the model calls.
+
+Usage:
+    python benchmark_rag_engine.py --queries 300 --k 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ["STUB_LLM_LATENCY_DISTRIBUTION"] = "fixed"
+os.environ["STUB_LLM_LATENCY_MS"] = "0"
+os.environ["STUB_LLM_TOKENS_PER_SECOND"] = "0"
+os.environ.pop("CHROMA_API_KEY", None)
+
+from langchain.embeddings import DeterministicFakeEmbedding
+from langchain.schema import Document
+
+import rag_service as rag_module
+from embedding_cache import CachedEmbeddings, embedding_cache
+from rag_service import RAGService
+
+ENGINES = ["chain", "direct"]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(service: RAGService, engine: str, questions: list, k: int) -> list:
+    rag_module.RAG_ENGINE = engine
+    latencies = []
+    for question in questions:
+        started = time.perf_counter()
+        response = service.query(question=question, subject="benchmark", max_results=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.get("fallback"):
+            print(f"❌ {engine} query fell back")
+            sys.exit(1)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-query overhead of the chain and direct RAG engines")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--chunks", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        service = RAGService(persist_directory=persist_directory)
+
+        def fake_embeddings():
+            service.embeddings = DeterministicFakeEmbedding(size=384)
+            service.query_embeddings = CachedEmbeddings(service.embeddings, "fake", embedding_cache)
+
+        service._initialize_embeddings = fake_embeddings
+        service.add_documents([
+            Document(page_content=f"Chunk {i} on topic {i % 17} with an explanation and an example.",
+                     metadata={"content_language": "en", "topic": i % 17})
+            for i in range(args.chunks)
+        ], subject="benchmark")
+
+        # Embeddings are precomputed, so neither engine pays for them in the timed runs
+        questions = [f"Explain topic {i % 17}, variant {i}" for i in range(args.queries)]
+        for question in questions:
+            service.query_embeddings.embed_query(question)
+        # Warm both paths (chain/vectorstore construction, collection handles)
+        for engine in ENGINES:
+            run(service, engine, questions[:5], args.k)
+
+        results = {engine: run(service, engine, questions, args.k) for engine in ENGINES}
+
+    print(f"\n📊 {args.queries} sequential queries, k={args.k}, {args.chunks} chunks, instant stub LLM")
+    for engine, latencies in results.items():
+        print(f"   {engine:7s} mean {statistics.mean(latencies):7.2f} ms   p50 {percentile(latencies, 0.5):7.2f} ms   "
+              f"p95 {percentile(latencies, 0.95):7.2f} ms")
+    saved = statistics.mean(results["chain"]) - statistics.mean(results["direct"])
+    print(f"   direct saves {saved:.2f} ms per query "
+          f"({statistics.mean(results['chain']) / statistics.mean(results['direct']):.1f}x less overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark of the API.
+
+Boots `uvicorn main:app` in a subprocess and measures how long it takes
+until `GET /` answers, i.e. until non-AI routes such as login and the
+dashboard can be served. The RAG embedding model must not be on that path:
+it is loaded lazily or by the background warm-up. With --wait-for-rag the
+benchmark also reports when /readyz says RAG is ready.
+
+A bare FastAPI app is booted the same way as a baseline, so interpreter
+and framework start-up on the machine running the benchmark are not
+counted. Fails (exit code 1) if the API needs more than --max-seconds on
+top of that baseline, so it can guard against imports or startup work
+creeping back in. Loading the embedding model and LangChain alone takes
+several times the default budget.
+
+Usage:
+    python benchmark_startup.py --runs 3 --max-seconds 2 [--wait-for-rag]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BASELINE_APP = """
+from fastapi import FastAPI
+
+app = FastAPI()
+
+@app.get("/")
+async def root():
+    return {"message": "ok"}
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(url: str, predicate, timeout: float) -> float:
+    """Seconds until `predicate(response)` holds for GET url, or raise TimeoutError"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            response = requests.get(url, timeout=1)
+            if predicate(response):
+                return time.perf_counter() - started
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def measure_boot(app: str, app_dir: str, wait_for_rag: bool = False, rag_timeout: float = 300) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--app-dir", app_dir,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until(f"{base_url}/", lambda response: response.status_code == 200, timeout=60)
+        result = {"serving": time.perf_counter() - started}
+        if wait_for_rag:
+            rag_state = lambda response: response.ok and response.json()["rag"]["state"] in ("ready", "failed")
+            wait_until(f"{base_url}/readyz", rag_state, timeout=rag_timeout)
+            result["rag_ready"] = time.perf_counter() - started
+            result["rag"] = requests.get(f"{base_url}/readyz").json()["rag"]
+        return result
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API boot time until non-AI routes are served")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=2.0,
+                        help="Budget for the API to start serving, on top of a bare FastAPI app")
+    parser.add_argument("--wait-for-rag", action="store_true", help="Also measure until the RAG warm-up finishes")
+    parser.add_argument("--rag-timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"🚀 Booting the API {args.runs} times")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        with open(os.path.join(baseline_dir, "baseline_app.py"), "w") as f:
+            f.write(BASELINE_APP)
+        baseline = statistics.median(
+            measure_boot("baseline_app:app", baseline_dir)["serving"] for _ in range(args.runs)
+        )
+    print(f"   bare FastAPI app: serving after {baseline * 1000:7.0f} ms")
+
+    serving = []
+    for run in range(args.runs):
+        result = measure_boot("main:app", BACKEND_DIR, args.wait_for_rag, args.rag_timeout)
+        serving.append(result["serving"])
+        line = f"   run {run + 1}: serving after {result['serving'] * 1000:7.0f} ms"
+        if "rag_ready" in result:
+            line += f", RAG {result['rag']['state']} after {result['rag_ready'] * 1000:7.0f} ms"
+        print(line)
+
+    overhead = statistics.median(serving) - baseline
+    print(f"\n📊 Median start-up over a bare FastAPI app: {overhead * 1000:.0f} ms "
+          f"(budget {args.max_seconds * 1000:.0f} ms)")
+    if overhead > args.max_seconds:
+        print("❌ Startup is over budget")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
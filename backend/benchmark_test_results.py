@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark for building test results of a single session.
+
+Seeds a 200-question session (plus unrelated answers from the same user)
+on a local mongod and compares:
+- "n+1":     time-range scan of user_answers and one find_one per question
+- "$in":     session_id query plus one $in fetch of the questions
+- "$lookup": a single aggregation joining answers to questions
+
+Usage:
+    python benchmark_test_results.py --uri mongodb://localhost:27017 --questions 200 --iterations 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from migrations import run_migrations
+
+BENCH_DB = "artori_results_benchmark"
+
+
+def seed(db, question_count: int, noise_answers: int):
+    """Insert a session with one answer per question and unrelated answers around it"""
+    user_id, subject_id = ObjectId(), ObjectId()
+    start = datetime.utcnow()
+    questions = [{
+        "_id": ObjectId(),
+        "subject_id": subject_id,
+        "question": f"Question {i}",
+        "correct_answer": "a",
+        "explanation": {"reasoning": "r", "concept": "c", "sources": [], "bias_check": "b", "reflection": "f"},
+        "created_at": start
+    } for i in range(question_count)]
+    db.questions.insert_many(questions)
+
+    session = {"_id": ObjectId(), "user_id": user_id, "start_time": start,
+               "end_time": start + timedelta(seconds=question_count), "status": "completed"}
+    db.test_sessions.insert_one(session)
+
+    db.user_answers.insert_many([{
+        "user_id": user_id,
+        "session_id": session["_id"],
+        "question_id": q["_id"],
+        "selected_option_id": "a" if i % 2 else "b",
+        "is_correct": bool(i % 2),
+        "answered_at": start + timedelta(seconds=i)
+    } for i, q in enumerate(questions)])
+
+    # Practice answers outside the session widen the legacy time-range scan
+    if noise_answers:
+        db.user_answers.insert_many([{
+            "user_id": user_id,
+            "question_id": questions[i % question_count]["_id"],
+            "selected_option_id": "a",
+            "is_correct": True,
+            "answered_at": start - timedelta(minutes=i + 1)
+        } for i in range(noise_answers)])
+    return session
+
+
+def legacy_results(db, session):
+    answers = list(db.user_answers.find({
+        "user_id": session["user_id"],
+        "answered_at": {"$gte": session["start_time"], "$lte": session["end_time"]}
+    }))
+    return [(a, db.questions.find_one({"_id": a["question_id"]})) for a in answers]
+
+
+def in_query_results(db, session):
+    answers = list(db.user_answers.find({"session_id": session["_id"], "user_id": session["user_id"]})
+                   .sort("answered_at", 1))
+    questions = {q["_id"]: q for q in db.questions.find({"_id": {"$in": list({a["question_id"] for a in answers})}})}
+    return [(a, questions.get(a["question_id"])) for a in answers]
+
+
+def lookup_results(db, session):
+    return list(db.user_answers.aggregate([
+        {"$match": {"session_id": session["_id"], "user_id": session["user_id"]}},
+        {"$sort": {"answered_at": 1}},
+        {"$lookup": {"from": "questions", "localField": "question_id", "foreignField": "_id", "as": "question"}},
+        {"$unwind": "$question"}
+    ]))
+
+
+def measure(label: str, fn, db, session, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rows = fn(db, session)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"   {label:<8} rows {len(rows):>4}   p50 {statistics.median(timings):>8.2f} ms   p95 {p95:>8.2f} ms")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark test result assembly strategies")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--noise", type=int, default=2000, help="Unrelated answers of the same user")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print("🧪 Test results benchmark")
+    print("=" * 60)
+
+    client = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"❌ Could not reach mongod at {args.uri}: {e}")
+        sys.exit(1)
+
+    client.drop_database(BENCH_DB)
+    db = client[BENCH_DB]
+    try:
+        run_migrations(db)
+        session = seed(db, args.questions, args.noise)
+        print(f"   questions={args.questions} noise answers={args.noise} iterations={args.iterations}\n")
+
+        legacy = measure("n+1", legacy_results, db, session, args.iterations)
+        batched = measure("$in", in_query_results, db, session, args.iterations)
+        lookup = measure("$lookup", lookup_results, db, session, args.iterations)
+
+        print(f"\n✅ Speedup vs n+1: $in {legacy / batched:.1f}x, $lookup {legacy / lookup:.1f}x")
+    finally:
+        client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
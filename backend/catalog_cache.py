@@ -0,0 +1,132 @@
+"""
+In-process cache of the exam catalog.
+
+Exams (with their embedded subjects) change only through the admin exam
+and question endpoints, but almost every student request reads them. This
+module keeps the whole catalog in memory with a `subject_id -> (exam,
+subject)` index. A snapshot is reloaded after a TTL or when an admin write
+handler calls `invalidate()`.
+
+Each invalidation bumps a version number. A reload that started before the
+bump is returned to its caller but not installed, so a write can never be
+hidden by a slower concurrent reload. Invalidation is per process; other
+workers pick the change up when their TTL expires.
+
+Cached documents are shared between requests and must not be mutated.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Maximum age of a catalog snapshot before it is reloaded
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "60"))
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version"""
+
+    def __init__(self, exams: List[Dict[str, Any]], version: int):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.exams = exams
+        self.exams_by_id = {exam["_id"]: exam for exam in exams}
+        self.subjects_by_id = {
+            subject["_id"]: (exam, subject)
+            for exam in exams
+            for subject in exam.get("subjects", [])
+        }
+
+
+class CatalogCache:
+    def __init__(self, ttl_seconds: float = CATALOG_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._load_lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+        )
+
+    async def _get_snapshot(self, db) -> CatalogSnapshot:
+        """Return a fresh snapshot, reloading it from `db` (an AsyncDatabase) if needed"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+
+        # Only one coroutine reloads; the others wait and reuse its snapshot
+        async with self._load_lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            version = self.version
+            exams = await db.exams.find({}).to_list()
+            snapshot = CatalogSnapshot(exams, version)
+            self.reloads += 1
+
+            if version == self.version:
+                self._snapshot = snapshot
+            else:
+                logger.info("Catalog changed while reloading; not caching the stale snapshot")
+            return snapshot
+
+    async def list_exams(self, db) -> List[Dict[str, Any]]:
+        """All exam documents"""
+        return (await self._get_snapshot(db)).exams
+
+    async def get_exam(self, db, exam_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """Exam document by id, or None"""
+        return (await self._get_snapshot(db)).exams_by_id.get(exam_id)
+
+    async def get_subject(self, db, subject_id: ObjectId) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(exam, subject) containing `subject_id`, or (None, None)"""
+        return (await self._get_snapshot(db)).subjects_by_id.get(subject_id, (None, None))
+
+    def invalidate(self, reason: str = ""):
+        """Drop the cached catalog after an exam or question write"""
+        self.version += 1
+        self._snapshot = None
+        self.invalidations += 1
+        if reason:
+            logger.info(f"Catalog cache invalidated: {reason}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate and freshness metrics"""
+        lookups = self.hits + self.misses
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "ttl_seconds": self.ttl_seconds,
+            "cached_exams": len(snapshot.exams) if snapshot else 0,
+            "snapshot_age_seconds": round(time.monotonic() - snapshot.loaded_at, 1) if snapshot else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global catalog cache instance
+catalog_cache = CatalogCache()
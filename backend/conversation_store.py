@@ -0,0 +1,190 @@
+"""
+Server-side storage of AI tutor conversations.
+
+Each chat lives in one `ai_conversations` document owned by a user and a
+question. After the first turn the client sends only its new message with
+the `conversation_id` it got back, so request payloads no longer grow with
+the chat. Messages are appended incrementally and carry an estimated
+token count.
+
+Once the stored history exceeds a token budget, the oldest turns are folded
+into a rolling summary by the LLM and removed from the document, keeping
+only the most recent turns verbatim. Together with the token-aware trimming
+in `AIService`, this keeps prompt tokens per turn bounded however long the
+chat runs. Idle conversations expire through a TTL index.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONVERSATIONS_COLLECTION = "ai_conversations"
+
+# Stored history (in estimated tokens) above which older turns are summarized
+CONVERSATION_SUMMARY_TRIGGER_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_TRIGGER_TOKENS", "3000"))
+# Recent history kept verbatim when the rest is summarized
+CONVERSATION_KEEP_RECENT_TOKENS = int(os.getenv("CONVERSATION_KEEP_RECENT_TOKENS", "1200"))
+# Days an idle conversation is kept
+CONVERSATION_TTL_DAYS = float(os.getenv("CONVERSATION_TTL_DAYS", "7"))
+# Hard cap on stored messages in case summarization keeps failing
+CONVERSATION_MAX_STORED_MESSAGES = 200
+
+# Per-message overhead of the chat format, in tokens
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a chat message (about four characters per token)"""
+    return len(text or "") // 4 + MESSAGE_TOKEN_OVERHEAD
+
+
+def trim_to_token_budget(messages: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Most recent messages whose estimated tokens fit in `budget` (at least the last one)"""
+    kept, used = [], 0
+    for message in reversed(messages):
+        tokens = message.get("tokens") or estimate_tokens(message["content"])
+        if kept and used + tokens > budget:
+            break
+        kept.append(message)
+        used += tokens
+    return list(reversed(kept))
+
+
+def _stored_message(message: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "id": ObjectId(),
+        "role": message["role"],
+        "content": message["content"],
+        "tokens": estimate_tokens(message["content"]),
+        "created_at": datetime.utcnow(),
+    }
+
+
+class ConversationStore:
+    def __init__(self, summary_trigger_tokens: int = CONVERSATION_SUMMARY_TRIGGER_TOKENS,
+                 keep_recent_tokens: int = CONVERSATION_KEEP_RECENT_TOKENS,
+                 ttl_days: float = CONVERSATION_TTL_DAYS):
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self.ttl_days = ttl_days
+        self.summaries = 0
+        self.summarized_messages = 0
+
+    async def create(self, db, user_id: ObjectId, question_id: ObjectId,
+                     messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Start a conversation with its first messages (db is an AsyncDatabase)"""
+        now = datetime.utcnow()
+        conversation = {
+            "user_id": user_id,
+            "question_id": question_id,
+            "messages": [_stored_message(message) for message in messages],
+            "summary": None,
+            "summary_version": 0,
+            "turns": 0,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(days=self.ttl_days),
+        }
+        result = await db[CONVERSATIONS_COLLECTION].insert_one(conversation)
+        conversation["_id"] = result.inserted_id
+        return conversation
+
+    async def append(self, db, conversation_id: str, user_id: ObjectId, question_id: ObjectId,
+                     messages: List[Dict[str, str]], turn: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Append messages to a conversation of this user and question
+
+        Returns:
+            The updated conversation, or None if it does not exist or is not theirs
+
+        Raises:
+            ValueError: If the conversation id is malformed
+        """
+        if not ObjectId.is_valid(conversation_id):
+            raise ValueError("Invalid conversation ID")
+
+        now = datetime.utcnow()
+        update = {
+            "$push": {"messages": {
+                "$each": [_stored_message(message) for message in messages],
+                "$slice": -CONVERSATION_MAX_STORED_MESSAGES,
+            }},
+            "$set": {"updated_at": now, "expires_at": now + timedelta(days=self.ttl_days)},
+        }
+        if turn:
+            update["$inc"] = {"turns": 1}
+        return await db[CONVERSATIONS_COLLECTION].find_one_and_update(
+            {"_id": ObjectId(conversation_id), "user_id": user_id, "question_id": question_id},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def chat_messages(conversation: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Stored messages in the shape AIService expects"""
+        return [
+            {"role": message["role"], "content": message["content"], "tokens": message["tokens"]}
+            for message in conversation["messages"]
+        ]
+
+    async def summarize_if_needed(self, db, conversation_id: ObjectId,
+                                  summarize: Callable[[Optional[str], List[Dict[str, str]]], Awaitable[Optional[str]]]) -> bool:
+        """
+        Fold the oldest turns into the rolling summary once history is over budget
+
+        `summarize(previous_summary, messages)` returns the new summary, or None
+        to leave the conversation unchanged.
+        """
+        conversation = await db[CONVERSATIONS_COLLECTION].find_one({"_id": conversation_id})
+        if not conversation:
+            return False
+
+        messages = conversation["messages"]
+        if sum(message["tokens"] for message in messages) <= self.summary_trigger_tokens:
+            return False
+
+        recent = trim_to_token_budget(messages, self.keep_recent_tokens)
+        older = messages[:len(messages) - len(recent)]
+        if not older:
+            return False
+
+        summary = await summarize(
+            conversation.get("summary"),
+            [{"role": message["role"], "content": message["content"]} for message in older]
+        )
+        if not summary:
+            return False
+
+        # Messages appended meanwhile are kept; a concurrent summarization wins the version check
+        result = await db[CONVERSATIONS_COLLECTION].update_one(
+            {"_id": conversation_id, "summary_version": conversation.get("summary_version", 0)},
+            {
+                "$set": {"summary": summary},
+                "$inc": {"summary_version": 1},
+                "$pull": {"messages": {"id": {"$in": [message["id"] for message in older]}}},
+            }
+        )
+        if result.modified_count:
+            self.summaries += 1
+            self.summarized_messages += len(older)
+            logger.info(f"Summarized {len(older)} messages of conversation {conversation_id}")
+        return bool(result.modified_count)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "summaries": self.summaries,
+            "summarized_messages": self.summarized_messages,
+            "summary_trigger_tokens": self.summary_trigger_tokens,
+            "keep_recent_tokens": self.keep_recent_tokens,
+        }
+
+
+# Global conversation store instance
+conversation_store = ConversationStore()
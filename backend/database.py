@@ -0,0 +1,359 @@
+import os
+import asyncio
+import functools
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Default number of worker threads used to run blocking pymongo calls
+DEFAULT_EXECUTOR_WORKERS = int(os.getenv("MONGODB_EXECUTOR_WORKERS", "32"))
+
+# Named connection pool profiles, selected with MONGODB_POOL_PROFILE
+MONGODB_POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Vercel functions: one request per instance, short-lived, cold starts
+    "serverless": {
+        "client_options": {
+            "maxPoolSize": 1,
+            "minPoolSize": 0,
+            "maxIdleTimeMS": 10000,
+            "serverSelectionTimeoutMS": 3000,
+            "connectTimeoutMS": 5000,
+            "socketTimeoutMS": 10000,
+            "waitQueueTimeoutMS": 5000,
+            "compressors": "zlib",
+        },
+        "executor_workers": 4,
+    },
+    # Multi-worker uvicorn: many concurrent requests per process, warm connections
+    "long_running": {
+        "client_options": {
+            "maxPoolSize": 50,
+            "minPoolSize": 5,
+            "maxIdleTimeMS": 300000,
+            "serverSelectionTimeoutMS": 5000,
+            "connectTimeoutMS": 10000,
+            "socketTimeoutMS": 20000,
+            "waitQueueTimeoutMS": 2000,
+            "compressors": "zlib",
+        },
+        "executor_workers": 64,
+    },
+    # Maintenance scripts and migrations: few connections, long-running operations
+    "batch": {
+        "client_options": {
+            "maxPoolSize": 10,
+            "minPoolSize": 0,
+            "maxIdleTimeMS": 60000,
+            "serverSelectionTimeoutMS": 30000,
+            "connectTimeoutMS": 20000,
+            "socketTimeoutMS": 0,  # No socket timeout for long index builds / bulk jobs
+            "waitQueueTimeoutMS": 60000,
+            "compressors": "zlib",
+            "zlibCompressionLevel": 6,
+        },
+        "executor_workers": 16,
+    },
+}
+
+
+def resolve_pool_profile(profile: Optional[str] = None) -> str:
+    """Resolve the pool profile name from the argument or MONGODB_POOL_PROFILE"""
+    name = (profile or os.getenv("MONGODB_POOL_PROFILE") or "").strip().lower().replace("-", "_")
+    if not name:
+        # Keep the historical serverless tuning on Vercel, use a real pool everywhere else
+        name = "serverless" if os.getenv("VERCEL") else "long_running"
+    if name not in MONGODB_POOL_PROFILES:
+        logger.warning(f"⚠️ Unknown MONGODB_POOL_PROFILE '{name}', falling back to 'long_running'")
+        name = "long_running"
+    return name
+
+
+def get_client_options(profile: Optional[str] = None) -> Dict[str, Any]:
+    """Build MongoClient keyword arguments for a pool profile, applying env overrides"""
+    name = resolve_pool_profile(profile)
+    options = dict(MONGODB_POOL_PROFILES[name]["client_options"])
+
+    # Per-setting overrides for tuning a profile without editing code
+    env_overrides = {
+        "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+        "MONGODB_MIN_POOL_SIZE": "minPoolSize",
+        "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+        "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    }
+    for env_name, option in env_overrides.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = int(value)
+    if os.getenv("MONGODB_COMPRESSORS") is not None:
+        options["compressors"] = os.getenv("MONGODB_COMPRESSORS")
+    if not options.get("compressors"):
+        options.pop("compressors", None)
+        options.pop("zlibCompressionLevel", None)
+
+    options.update({
+        # SSL/TLS is on unless explicitly disabled (e.g. a local mongod)
+        "tls": os.getenv("MONGODB_TLS", "true").lower() != "false",
+        "retryWrites": True,
+        "retryReads": True,
+    })
+    if options["tls"]:
+        options["tlsAllowInvalidCertificates"] = False
+    return options
+
+
+class PoolWaitMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool listener that measures how long operations wait for a socket"""
+
+    def __init__(self, sample_size: int = 1000):
+        self.profile = None
+        self.max_pool_size = None
+        self.warn_threshold_ms = float(os.getenv("MONGODB_POOL_WAIT_WARN_MS", "50"))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=sample_size)
+        self._last_warning = 0.0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.saturated_checkouts = 0
+        self.checked_out = 0
+        self.open_connections = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        self._local.started = None
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._samples.append(wait_ms)
+            if wait_ms >= self.warn_threshold_ms:
+                self.saturated_checkouts += 1
+                now = time.monotonic()
+                if now - self._last_warning > 60:
+                    self._last_warning = now
+                    logger.warning(
+                        f"⚠️ MongoDB pool saturated: waited {wait_ms:.1f}ms for a connection "
+                        f"(profile={self.profile}, maxPoolSize={self.max_pool_size})"
+                    )
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(self.open_connections - 1, 0)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool-wait metrics"""
+        with self._lock:
+            samples = sorted(self._samples)
+            p95 = samples[max(int(len(samples) * 0.95) - 1, 0)] if samples else 0.0
+            return {
+                "profile": self.profile,
+                "max_pool_size": self.max_pool_size,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "saturated_checkouts": self.saturated_checkouts,
+                "wait_ms_avg": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_p95": round(p95, 3),
+                "wait_ms_max": round(self.max_wait_ms, 3),
+                "saturated": p95 >= self.warn_threshold_ms or self.checkout_failures > 0,
+            }
+
+
+def create_mongo_client(uri: str, profile: Optional[str] = None) -> MongoClient:
+    """Create a MongoClient configured for the selected pool profile"""
+    name = resolve_pool_profile(profile)
+    options = get_client_options(name)
+    pool_monitor.profile = name
+    pool_monitor.max_pool_size = options["maxPoolSize"]
+    logger.info(
+        f"MongoDB pool profile '{name}': maxPoolSize={options['maxPoolSize']}, "
+        f"minPoolSize={options['minPoolSize']}, maxIdleTimeMS={options['maxIdleTimeMS']}, "
+        f"compressors={options.get('compressors', 'none')}"
+    )
+    return MongoClient(uri, event_listeners=[pool_monitor], **options)
+
+
+def get_executor_workers(profile: Optional[str] = None) -> int:
+    """Thread pool size for the async layer of a pool profile"""
+    if os.getenv("MONGODB_EXECUTOR_WORKERS"):
+        return DEFAULT_EXECUTOR_WORKERS
+    return MONGODB_POOL_PROFILES[resolve_pool_profile(profile)]["executor_workers"]
+
+
+class AsyncCursor:
+    """Awaitable cursor that builds a pymongo cursor lazily and drains it off the event loop"""
+
+    def __init__(self, factory: Callable[[], Any], run: Callable):
+        self._factory = factory
+        self._run = run
+        self._modifiers = []
+
+    def sort(self, *args, **kwargs) -> "AsyncCursor":
+        self._modifiers.append(("sort", args, kwargs))
+        return self
+
+    def skip(self, *args, **kwargs) -> "AsyncCursor":
+        self._modifiers.append(("skip", args, kwargs))
+        return self
+
+    def limit(self, *args, **kwargs) -> "AsyncCursor":
+        self._modifiers.append(("limit", args, kwargs))
+        return self
+
+    def _materialize(self, length: Optional[int]) -> List[Dict[str, Any]]:
+        cursor = self._factory()
+        for name, args, kwargs in self._modifiers:
+            cursor = getattr(cursor, name)(*args, **kwargs)
+        if length is not None:
+            return list(itertools.islice(cursor, length))
+        return list(cursor)
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run the query in a worker thread and return up to `length` documents"""
+        return await self._run(self._materialize, length)
+
+
+class AsyncCollection:
+    """Async facade over a pymongo collection (Motor-compatible subset)"""
+
+    def __init__(self, collection: Collection, run: Callable):
+        self.delegate = collection
+        self._run = run
+
+    @property
+    def name(self) -> str:
+        return self.delegate.name
+
+    def find(self, *args, **kwargs) -> AsyncCursor:
+        return AsyncCursor(functools.partial(self.delegate.find, *args, **kwargs), self._run)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs) -> AsyncCursor:
+        return AsyncCursor(functools.partial(self.delegate.aggregate, pipeline, **kwargs), self._run)
+
+    async def find_one(self, *args, **kwargs):
+        return await self._run(self.delegate.find_one, *args, **kwargs)
+
+    async def insert_one(self, *args, **kwargs):
+        return await self._run(self.delegate.insert_one, *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await self._run(self.delegate.insert_many, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await self._run(self.delegate.update_one, *args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return await self._run(self.delegate.update_many, *args, **kwargs)
+
+    async def delete_one(self, *args, **kwargs):
+        return await self._run(self.delegate.delete_one, *args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return await self._run(self.delegate.delete_many, *args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs) -> int:
+        return await self._run(self.delegate.count_documents, *args, **kwargs)
+
+    async def estimated_document_count(self, *args, **kwargs) -> int:
+        return await self._run(self.delegate.estimated_document_count, *args, **kwargs)
+
+    async def distinct(self, *args, **kwargs):
+        return await self._run(self.delegate.distinct, *args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return await self._run(self.delegate.find_one_and_update, *args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return await self._run(self.delegate.bulk_write, *args, **kwargs)
+
+
+class AsyncDatabase:
+    """
+    Non-blocking data-access layer used by every FastAPI route handler.
+
+    pymongo is synchronous, so each operation is dispatched to a dedicated
+    thread pool instead of running on the uvicorn event loop. The underlying
+    pymongo database stays reachable through `delegate` for startup code and
+    maintenance scripts that run outside the event loop.
+    """
+
+    def __init__(self, database: Database, max_workers: int = DEFAULT_EXECUTOR_WORKERS):
+        self.delegate = database
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="mongo"
+        )
+        self._collections: Dict[str, AsyncCollection] = {}
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> AsyncCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> AsyncCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = AsyncCollection(self.delegate[name], self._run)
+            self._collections[name] = collection
+        return collection
+
+    async def list_collection_names(self, *args, **kwargs) -> List[str]:
+        return await self._run(self.delegate.list_collection_names, *args, **kwargs)
+
+    async def command(self, *args, **kwargs):
+        return await self._run(self.delegate.command, *args, **kwargs)
+
+
+# Global pool monitor shared by every client created through create_mongo_client
+pool_monitor = PoolWaitMonitor()
@@ -0,0 +1,306 @@
+"""
+In-process cache of RAG query embeddings.
+
+`RAGService.query` embeds the constructed prompt with the SentenceTransformer
+model on CPU for every request, although many students ask about the same
+question within minutes of each other. `EmbeddingCache` keeps query vectors
+in a least-recently-used map keyed by a hash of the model name and the
+normalized query text, bounded by a memory budget in MB. Normalization only
+shapes the key: the model always embeds the text as given, so vectors are
+the same as without the cache.
+
+With EMBEDDING_CACHE_PATH set, every new vector is also written to a local
+SQLite file, and memory misses are looked up there, so cached embeddings
+survive restarts. The file is bounded separately and pruned by last use.
+Disk reads and writes hold their own lock, never the memory lock, so
+memory hits are not stalled by SQLite.
+
+`CachedEmbeddings` wraps the LangChain embedding model so vectorstores get
+cached `embed_query` calls transparently; document embedding is not cached.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Memory budget of cached query embeddings (0 disables the cache)
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "32"))
+# Optional SQLite file cached embeddings are spilled to, so they survive restarts
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+# Size bound of the on-disk store
+EMBEDDING_CACHE_DISK_MAX_MB = float(os.getenv("EMBEDDING_CACHE_DISK_MAX_MB", "256"))
+
+# Bookkeeping per cached entry (key, OrderedDict node, array header), in bytes
+ENTRY_OVERHEAD_BYTES = 200
+# Inserts between size checks of the on-disk store
+DISK_PRUNE_INTERVAL = 200
+# Part of every key; bumped when cached vectors stop matching what the model returns
+# (v2: the model embeds the original text, no longer the normalized one)
+CACHE_KEY_VERSION = 2
+
+
+def normalize_query(text: str) -> str:
+    """Unicode-normalized text with collapsed whitespace (what the cache key is hashed from)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"v{CACHE_KEY_VERSION}\n{model_name}\n{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_mb: float = EMBEDDING_CACHE_MAX_MB, path: str = EMBEDDING_CACHE_PATH,
+                 disk_max_mb: float = EMBEDDING_CACHE_DISK_MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.path = path or None
+        self.disk_max_bytes = int(disk_max_mb * 1024 * 1024)
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._disk_inserts = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.embed_count = 0
+        self.embed_seconds = 0.0
+        self.seconds_saved = 0.0
+
+        if self.path:
+            self._open_disk()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _open_disk(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(self.path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._disk.commit()
+            logger.info(f"💾 Query embedding cache spills to {self.path}")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Embedding cache disk store unavailable ({e}), using memory only")
+            self._disk = None
+
+    @staticmethod
+    def _entry_bytes(vector: array) -> int:
+        return len(vector) * vector.itemsize + ENTRY_OVERHEAD_BYTES
+
+    def _remember(self, key: str, vector: array):
+        """Insert into the memory LRU and evict down to the budget (lock held)"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = vector
+        self._bytes += self._entry_bytes(vector)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._entry_bytes(evicted)
+            self.evictions += 1
+
+    def _disk_get(self, key: str) -> Optional[array]:
+        if self._disk is None:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._disk.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._disk.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Embedding cache disk read failed: {e}")
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector
+
+    def _disk_put(self, items: Dict[str, array]):
+        """Write new vectors in one transaction"""
+        if self._disk is None or not items:
+            return
+        now = time.time()
+        try:
+            with self._disk_lock:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, vector.tobytes(), now) for key, vector in items.items()]
+                )
+                self._disk.commit()
+                inserts_before = self._disk_inserts
+                self._disk_inserts += len(items)
+                if self._disk_inserts // DISK_PRUNE_INTERVAL > inserts_before // DISK_PRUNE_INTERVAL:
+                    self._prune_disk(self._entry_bytes(next(iter(items.values()))))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Embedding cache disk write failed: {e}")
+
+    def _prune_disk(self, entry_bytes: int):
+        """Drop the least recently used rows beyond the disk budget (disk lock held)"""
+        max_rows = max(1, self.disk_max_bytes // entry_bytes)
+        (rows,) = self._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if rows > max_rows:
+            self._disk.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (rows - max_rows,)
+            )
+            self._disk.commit()
+
+    def _count_hit(self):
+        self.hits += 1
+        self.seconds_saved += self._avg_embed_seconds()
+
+    def _lookup(self, key: str) -> Optional[array]:
+        """Cached vector from memory or disk, counting the hit or miss"""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._count_hit()
+                return vector
+
+        vector = self._disk_get(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._count_hit()
+            self._remember(key, vector)
+        return vector
+
+    def _store(self, items: Dict[str, array], embed_count: int, elapsed: float):
+        """Remember freshly embedded vectors in memory, then write them to disk"""
+        with self._lock:
+            self.embed_count += embed_count
+            self.embed_seconds += elapsed
+            for key, vector in items.items():
+                self._remember(key, vector)
+        self._disk_put(items)
+
+    def get_or_embed(self, model_name: str, text: str, embed) -> List[float]:
+        """
+        Embedding of `text`, computed with `embed(text)` on a miss
+
+        The model runs outside the lock, so concurrent misses on different
+        queries embed in parallel.
+        """
+        if not self.enabled:
+            return embed(text)
+
+        key = embedding_cache_key(model_name, text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector.tolist()
+
+        started = time.perf_counter()
+        embedding = embed(text)
+        elapsed = time.perf_counter() - started
+
+        vector = array("f", embedding)
+        self._store({key: vector}, 1, elapsed)
+        # Same float32 values as later hits return
+        return vector.tolist()
+
+    def get_or_embed_many(self, model_name: str, texts: List[str], embed_many) -> List[List[float]]:
+        """
+        Embeddings of `texts`, computing all misses with one `embed_many(missing_texts)` call
+
+        Texts with the same cache key in the batch are embedded once.
+        """
+        if not self.enabled:
+            return embed_many(texts)
+
+        keys = [embedding_cache_key(model_name, text) for text in texts]
+        vectors: Dict[str, array] = {}
+        looked_up = set()
+        for key in keys:
+            if key not in looked_up:
+                looked_up.add(key)
+                vector = self._lookup(key)
+                if vector is not None:
+                    vectors[key] = vector
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            started = time.perf_counter()
+            embeddings = embed_many(list(missing.values()))
+            elapsed = time.perf_counter() - started
+            embedded = {key: array("f", embedding) for key, embedding in zip(missing, embeddings)}
+            self._store(embedded, len(missing), elapsed)
+            vectors.update(embedded)
+
+        return [vectors[key].tolist() for key in keys]
+
+    def _avg_embed_seconds(self) -> float:
+        return self.embed_seconds / self.embed_count if self.embed_count else 0.0
+
+    def clear(self):
+        """Drop the in-memory entries (the disk store is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "memory_mb": round(self._bytes / (1024 * 1024), 2),
+            "max_memory_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "disk_path": self.path if self._disk is not None else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "avg_embed_ms": round(self._avg_embed_seconds() * 1000, 1),
+            "embed_seconds_saved": round(self.seconds_saved, 2),
+        }
+
+
+class CachedEmbeddings:
+    """LangChain embeddings whose `embed_query` goes through an EmbeddingCache"""
+
+    def __init__(self, embeddings: Any, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.cache.get_or_embed(self.model_name, text, self.embeddings.embed_query)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Several query embeddings, with the cache misses in one forward pass of the model"""
+        return self.cache.get_or_embed_many(self.model_name, texts, self.embeddings.embed_documents)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+
+# Global query embedding cache instance
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,160 @@
+"""
+Persistent cache of AI-generated question explanations.
+
+An explanation depends only on the question, the selected option, the
+response language, the model and the prompt template. This cache stores
+generated explanations in the `ai_explanations` collection under a
+deterministic key hashed from those five values, so repeated clicks on a
+popular question are served from Mongo instead of waiting on the LLM.
+
+Regular entries expire through a TTL index on `expires_at`. Pinned entries
+(pre-generated for the whole question bank) have no expiry. The collection
+is kept under a size bound, which pinned entries do not count against, by
+evicting the least recently served unpinned entries. Editing or deleting a
+question drops all of its entries.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EXPLANATION_CACHE_COLLECTION = "ai_explanations"
+
+# Days an unpinned explanation is kept after it was generated
+EXPLANATION_CACHE_TTL_DAYS = float(os.getenv("EXPLANATION_CACHE_TTL_DAYS", "30"))
+# Upper bound on cached explanations before least-recently-served eviction
+EXPLANATION_CACHE_MAX_ENTRIES = int(os.getenv("EXPLANATION_CACHE_MAX_ENTRIES", "50000"))
+# How many writes between size checks, and how many entries one eviction removes
+EVICTION_CHECK_INTERVAL = 100
+EVICTION_BATCH_SIZE = 500
+
+
+def explanation_cache_key(question_id: Any, selected_answer: Optional[str], language: str,
+                          model: str, prompt_version: Any) -> str:
+    """Deterministic document id for one explanation variant"""
+    # Hashing the JSON tuple keeps distinct values distinct whatever characters they contain
+    parts = [str(question_id), selected_answer, language, model, str(prompt_version)]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    def __init__(self, ttl_days: float = EXPLANATION_CACHE_TTL_DAYS,
+                 max_entries: int = EXPLANATION_CACHE_MAX_ENTRIES):
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, db, question_id: ObjectId, selected_answer: Optional[str], language: str,
+                  model: str, prompt_version: Any) -> Optional[Dict[str, Any]]:
+        """Cached explanation for the key, or None (db is an AsyncDatabase)"""
+        key = explanation_cache_key(question_id, selected_answer, language, model, prompt_version)
+        entry = await db[EXPLANATION_CACHE_COLLECTION].find_one_and_update(
+            {"_id": key},
+            {"$set": {"last_hit_at": datetime.utcnow()}, "$inc": {"hits": 1}},
+            projection={"explanation": 1}
+        )
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["explanation"]
+
+    async def peek(self, db, question_id: ObjectId, selected_answer: Optional[str], language: str,
+                   model: str, prompt_version: Any) -> Optional[Dict[str, Any]]:
+        """Cached explanation without counting a lookup (used while waiting on another worker)"""
+        key = explanation_cache_key(question_id, selected_answer, language, model, prompt_version)
+        entry = await db[EXPLANATION_CACHE_COLLECTION].find_one({"_id": key}, {"explanation": 1})
+        return entry["explanation"] if entry else None
+
+    async def put(self, db, question_id: ObjectId, selected_answer: Optional[str], language: str,
+                  model: str, prompt_version: Any, explanation: Dict[str, Any], pinned: bool = False):
+        """Store a generated explanation; fallback explanations are never cached"""
+        if explanation.get("fallback"):
+            return
+
+        now = datetime.utcnow()
+        key = explanation_cache_key(question_id, selected_answer, language, model, prompt_version)
+        await db[EXPLANATION_CACHE_COLLECTION].update_one(
+            {"_id": key},
+            {
+                "$set": {
+                    "question_id": question_id,
+                    "selected_answer": selected_answer,
+                    "language": language,
+                    "model": model,
+                    "prompt_version": prompt_version,
+                    "explanation": explanation,
+                    "pinned": pinned,
+                    "created_at": now,
+                    "last_hit_at": now,
+                    "expires_at": None if pinned else now + timedelta(days=self.ttl_days),
+                },
+                "$setOnInsert": {"hits": 0},
+            },
+            upsert=True
+        )
+
+        self.writes += 1
+        if self.writes % EVICTION_CHECK_INTERVAL == 0:
+            await self.evict_if_needed(db)
+
+    async def evict_if_needed(self, db) -> int:
+        """Drop least recently served unpinned entries while over the size bound"""
+        collection = db[EXPLANATION_CACHE_COLLECTION]
+        # Pinned (pre-generated) entries do not count towards the bound
+        pinned = await collection.count_documents({"pinned": True})
+        excess = await collection.estimated_document_count() - pinned - self.max_entries
+        if excess <= 0:
+            return 0
+
+        victims = await (collection.find({"pinned": {"$ne": True}}, {"_id": 1})
+                         .sort("last_hit_at", 1)
+                         .limit(min(excess, EVICTION_BATCH_SIZE))
+                         .to_list())
+        if not victims:
+            return 0
+
+        result = await collection.delete_many({"_id": {"$in": [victim["_id"] for victim in victims]}})
+        self.evictions += result.deleted_count
+        logger.info(f"Evicted {result.deleted_count} cached explanations")
+        return result.deleted_count
+
+    async def invalidate_questions(self, db, question_ids: Iterable[ObjectId]) -> int:
+        """Drop every cached explanation of the given questions"""
+        question_ids = list(question_ids)
+        if not question_ids:
+            return 0
+        result = await db[EXPLANATION_CACHE_COLLECTION].delete_many({"question_id": {"$in": question_ids}})
+        self.invalidations += result.deleted_count
+        return result.deleted_count
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics of this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "invalidated_entries": self.invalidations,
+            "max_entries": self.max_entries,
+            "ttl_days": self.ttl_days,
+        }
+
+
+# Global explanation cache instance
+explanation_cache = ExplanationCache()
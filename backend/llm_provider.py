@@ -0,0 +1,261 @@
+"""
+Pluggable LLM backends for AIService.
+
+`AIService` talks to an `LLMProvider` instead of constructing an OpenAI
+client itself. Two providers ship:
+
+- `OpenAIProvider` calls the OpenAI chat completions API (or any
+  compatible endpoint through OPENAI_BASE_URL).
+- `StubProvider` answers in process, without network or API key, after a
+  latency drawn from a configurable distribution, emits tokens at a fixed
+  rate and fails a configurable fraction of calls. With a seed, its timing
+  and failures are reproducible, so throughput and tail-latency
+  benchmarks of the AI endpoints can run offline and in CI.
+
+Select one with LLM_PROVIDER=openai (default) or LLM_PROVIDER=stub.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+
+# Stub provider knobs
+STUB_LLM_LATENCY_DISTRIBUTION = os.getenv("STUB_LLM_LATENCY_DISTRIBUTION", "lognormal")
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "800"))
+STUB_LLM_LATENCY_SIGMA = float(os.getenv("STUB_LLM_LATENCY_SIGMA", "0.5"))
+STUB_LLM_TOKENS_PER_SECOND = float(os.getenv("STUB_LLM_TOKENS_PER_SECOND", "50"))
+STUB_LLM_FAIL_RATE = float(os.getenv("STUB_LLM_FAIL_RATE", "0"))
+STUB_LLM_SEED = os.getenv("STUB_LLM_SEED")
+
+
+# Canned explanation returned by the stub for JSON prompts
+STUB_EXPLANATION = {
+    "reasoning": [
+        "Identify what the question is asking.",
+        "Eliminate options that contradict the key principle.",
+        "The remaining option applies the principle correctly."
+    ],
+    "concept": "Stub concept",
+    "sources": ["Stub textbook"],
+    "bias_check": "Stub bias check",
+    "reflection": "Stub reflection"
+}
+
+
+def reply_for(messages: List[Dict[str, str]]) -> str:
+    """Stub reply: explanation JSON for JSON prompts, a short tutor reply otherwise"""
+    prompt = " ".join(str(message.get("content", "")) for message in messages)
+    if "JSON" in prompt:
+        if '"tips"' in prompt:
+            return json.dumps({"tips": ["Stub tip 1", "Stub tip 2", "Stub tip 3"]})
+        return json.dumps(STUB_EXPLANATION)
+    return "This is a stub tutor reply. Review the key concept and try a similar problem."
+
+
+class TransientLLMError(Exception):
+    """A failed call that is worth retrying (raised by the stub's failure injection)"""
+
+
+@dataclass
+class LLMCompletion:
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMProvider(ABC):
+    """Chat completion backend used by AIService"""
+
+    name = "base"
+    model = "unknown"
+
+    @abstractmethod
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float) -> LLMCompletion:
+        """Whole reply in one response"""
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]], max_tokens: int,
+               temperature: float) -> AsyncIterator[str]:
+        """Content tokens of the reply as they are generated"""
+
+    @abstractmethod
+    def complete_blocking(self, messages: List[Dict[str, str]], max_tokens: int,
+                          temperature: float) -> LLMCompletion:
+        """Synchronous completion for callers outside the event loop (RAG query threads)"""
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout: float = 30):
+        from openai import AsyncOpenAI
+
+        self.model = model
+        self._client_options = {"api_key": api_key, "base_url": base_url or None, "timeout": timeout}
+        # Retries are handled by AIService (with jitter) rather than by the client
+        self.client = AsyncOpenAI(max_retries=0, **self._client_options)
+        self._sync_client = None
+
+    async def complete(self, messages, max_tokens, temperature) -> LLMCompletion:
+        response = await self.client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
+        return self._completion(response)
+
+    def complete_blocking(self, messages, max_tokens, temperature) -> LLMCompletion:
+        if self._sync_client is None:
+            from openai import OpenAI
+            self._sync_client = OpenAI(max_retries=2, **self._client_options)
+        response = self._sync_client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
+        return self._completion(response)
+
+    @staticmethod
+    def _completion(response) -> LLMCompletion:
+        usage = response.usage
+        return LLMCompletion(
+            content=response.choices[0].message.content,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0
+        )
+
+    async def stream(self, messages, max_tokens, temperature) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True
+        )
+        try:
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    yield token
+        finally:
+            await stream.close()
+
+
+class StubProvider(LLMProvider):
+    name = "stub"
+
+    def __init__(self, latency_ms: float = STUB_LLM_LATENCY_MS,
+                 distribution: str = STUB_LLM_LATENCY_DISTRIBUTION,
+                 sigma: float = STUB_LLM_LATENCY_SIGMA,
+                 tokens_per_second: float = STUB_LLM_TOKENS_PER_SECOND,
+                 fail_rate: float = STUB_LLM_FAIL_RATE,
+                 seed: Optional[int] = None):
+        self.model = "stub"
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.tokens_per_second = tokens_per_second
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def sample_latency_ms(self) -> float:
+        """
+        Time to first token: `fixed`, `uniform` (0 to 2x the median) or
+        `lognormal` (median `latency_ms`, spread `sigma`, i.e. a long tail)
+        """
+        if self.distribution == "fixed":
+            return self.latency_ms
+        if self.distribution == "uniform":
+            return self._random.uniform(0, 2 * self.latency_ms)
+        return self._random.lognormvariate(0, self.sigma) * self.latency_ms
+
+    def should_fail(self) -> bool:
+        return bool(self.fail_rate) and self._random.random() < self.fail_rate
+
+    def reply(self, messages: List[Dict[str, str]]) -> str:
+        return reply_for(messages)
+
+    def _generation_seconds(self, content: str) -> float:
+        return (len(content) / 4) / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    async def complete(self, messages, max_tokens, temperature) -> LLMCompletion:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency_ms() / 1000)
+        if self.should_fail():
+            raise TransientLLMError("Stub LLM failure")
+
+        content = self.reply(messages)
+        await asyncio.sleep(self._generation_seconds(content))
+        return LLMCompletion(
+            content=content,
+            prompt_tokens=sum(len(str(message.get("content", ""))) for message in messages) // 4,
+            completion_tokens=max(1, len(content) // 4)
+        )
+
+    async def stream(self, messages, max_tokens, temperature) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency_ms() / 1000)
+        if self.should_fail():
+            raise TransientLLMError("Stub LLM failure")
+
+        words = self.reply(messages).split(" ")
+        interval = self._generation_seconds(" ".join(words)) / max(len(words), 1)
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(interval)
+            yield word if index == 0 else f" {word}"
+
+    def complete_blocking(self, messages, max_tokens, temperature) -> LLMCompletion:
+        self.calls += 1
+        time.sleep(self.sample_latency_ms() / 1000)
+        if self.should_fail():
+            raise TransientLLMError("Stub LLM failure")
+        content = self.reply(messages)
+        time.sleep(self._generation_seconds(content))
+        return LLMCompletion(
+            content=content,
+            prompt_tokens=sum(len(str(message.get("content", ""))) for message in messages) // 4,
+            completion_tokens=max(1, len(content) // 4)
+        )
+
+
+def openai_settings() -> Dict[str, Optional[str]]:
+    """API key, model and endpoint of the OpenAI provider, from the environment"""
+    return {
+        "api_key": os.getenv("OPENAI_API_KEY"),
+        "model": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+        "base_url": os.getenv("OPENAI_BASE_URL") or None,
+    }
+
+
+def is_llm_configured(kind: str = LLM_PROVIDER) -> bool:
+    """Whether `create_llm_provider` would return a provider, without building one"""
+    return kind == "stub" or bool(openai_settings()["api_key"])
+
+
+def create_llm_provider(kind: str = LLM_PROVIDER, timeout: float = 30) -> Optional[LLMProvider]:
+    """
+    Provider selected by LLM_PROVIDER
+
+    Returns:
+        The provider, or None if OpenAI was selected without an API key
+    """
+    if kind == "stub":
+        seed = int(STUB_LLM_SEED) if STUB_LLM_SEED else None
+        logger.info(f"🧪 Using the stub LLM provider ({STUB_LLM_LATENCY_DISTRIBUTION} latency, "
+                    f"median {STUB_LLM_LATENCY_MS:.0f}ms, fail rate {STUB_LLM_FAIL_RATE})")
+        return StubProvider(seed=seed)
+
+    if kind != "openai":
+        logger.warning(f"⚠️ Unknown LLM_PROVIDER '{kind}', using OpenAI")
+
+    settings = openai_settings()
+    if not settings["api_key"]:
+        logger.warning("⚠️ OPENAI_API_KEY not found in environment variables")
+        return None
+    return OpenAIProvider(timeout=timeout, **settings)
@@ -1,18 +1,23 @@
 import os
+import asyncio
 import logging
 import re
+import time
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
-from fastapi import FastAPI, HTTPException, Depends, status, Query, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, field_validator
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from pymongo import MongoClient
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from dotenv import load_dotenv
 import json
 
@@ -26,6 +31,20 @@ import os
 # Add the current directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from database import AsyncDatabase, create_mongo_client, get_executor_workers, pool_monitor
+from migrations import run_migrations
+from catalog_cache import catalog_cache
+from principal_cache import principal_cache
+from pagination import CountMode, InvalidPage, count_total, fetch_page
+from user_search import build_search_tokens, search_filter
+from explanation_cache import explanation_cache, explanation_cache_key
+from single_flight import SingleFlight, create_flight_lock
+from conversation_store import conversation_store
+from platform_counters import (
+    RECONCILE_INTERVAL_SECONDS, count_answers, increment_counters, read_counters,
+    reconcile_counters, record_user_created, record_user_deleted
+)
+
 try:
     from ai_service import ai_service
     logger.info("✅ AI service imported successfully")
@@ -34,12 +53,27 @@ except Exception as ai_import_error:
     logger.error(f"AI import error type: {type(ai_import_error).__name__}")
     # Create a mock AI service to prevent crashes
     class MockAIService:
+        model = "unavailable"
+        explanation_prompt_version = 0
+        single_flight = SingleFlight("llm")
         def is_available(self):
             return False
+        def stats(self):
+            return {"available": False}
         async def generate_explanation(self, *args, **kwargs):
-            return {"reasoning": ["AI service unavailable"], "concept": "N/A", "sources": [], "bias_check": "N/A", "reflection": "N/A"}
+            return {"reasoning": ["AI service unavailable"], "concept": "N/A", "sources": [], "bias_check": "N/A", "reflection": "N/A", "fallback": True}
         async def generate_chat_response(self, *args, **kwargs):
             return "AI service is currently unavailable."
+        async def stream_chat_response(self, *args, **kwargs):
+            yield {"type": "fallback", "reason": "unavailable", "content": "AI service is currently unavailable."}
+        async def summarize_conversation(self, *args, **kwargs):
+            return None
+        def is_fallback_chat_response(self, response):
+            return True
+        def start_rag_warm_up(self):
+            pass
+        def rag_status(self):
+            return {"state": "unavailable"}
     ai_service = MockAIService()
     logger.info("✅ Mock AI service created as fallback")
 
@@ -102,6 +136,15 @@ async def startup_event():
         logger.error("   The application will not function properly without these variables.")
         logger.error("   Please check your .env file or deployment environment configuration.")
     
+    # Correct any drift in the dashboard counters on long-running servers
+    if db is not None and RECONCILE_INTERVAL_SECONDS > 0 and not os.getenv("VERCEL"):
+        asyncio.create_task(reconcile_platform_counters_periodically())
+    
+    # Load the RAG embedding model off the request path; until it is ready, AI
+    # explanations skip RAG instead of blocking on it
+    if RAG_WARMUP_ON_STARTUP and not os.getenv("VERCEL"):
+        ai_service.start_rag_warm_up()
+    
     logger.info("Registered routes:")
     for route in app.routes:
         if hasattr(route, 'methods') and hasattr(route, 'path'):
@@ -131,6 +174,15 @@ JWT_EXPIRES_IN_MINUTES = int(os.getenv("JWT_EXPIRES_IN_MINUTES", "30"))
 # Default language for internationalization
 DEFAULT_LANGUAGE = "en"
 
+# Upper bound on answers accepted by one bulk submission
+MAX_BULK_ANSWERS = int(os.getenv("MAX_BULK_ANSWERS", "500"))
+
+# Load the RAG embedding model in the background at startup instead of on the first RAG request
+RAG_WARMUP_ON_STARTUP = os.getenv("RAG_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Concurrent misses on the same explanation (across workers with SINGLE_FLIGHT_LOCK=mongo) share one generation
+explanation_flight = SingleFlight("explanations", lock=create_flight_lock())
+
 def get_translation(key: str, language: str = DEFAULT_LANGUAGE) -> str:
     """Get translation for a given key and language"""
     # Simple fallback function - returns the key if no translation system is implemented
@@ -158,28 +210,13 @@ if MONGODB_URI:
             if len(parts) >= 2:
                 logger.info(f"MongoDB host: @{parts[1]}")
         
-        # Configure MongoDB client for Vercel serverless environment
-        # More aggressive timeouts for serverless
-        client = MongoClient(
-            MONGODB_URI,
-            # SSL/TLS configuration for serverless environments
-            tls=True,
-            tlsAllowInvalidCertificates=False,
-            # Optimized connection pool settings for serverless
-            maxPoolSize=1,  # Reduced for serverless
-            minPoolSize=0,  # Allow zero connections when idle
-            maxIdleTimeMS=10000,  # Reduced idle time
-            # More aggressive timeout settings for serverless
-            serverSelectionTimeoutMS=3000,  # Reduced from 5000
-            connectTimeoutMS=5000,  # Reduced from 10000
-            socketTimeoutMS=10000,  # Reduced from 20000
-            # Retry settings
-            retryWrites=True,
-            retryReads=True
-        )
+        # Pool size, idle time, timeouts and compression come from the
+        # deployment profile selected with MONGODB_POOL_PROFILE
+        client = create_mongo_client(MONGODB_URI)
         
         logger.info("MongoDB client created, testing connection...")
-        db = client.artori
+        # All route handlers go through the non-blocking data-access layer
+        db = AsyncDatabase(client.artori, max_workers=get_executor_workers())
         
         # Test the connection with timeout
         import time
@@ -191,7 +228,7 @@ if MONGODB_URI:
         
         # List collections with error handling
         try:
-            collections = db.list_collection_names()
+            collections = db.delegate.list_collection_names()
             logger.info(f"Available collections: {collections}")
         except Exception as coll_error:
             logger.warning(f"Could not list collections: {coll_error}")
@@ -374,6 +411,7 @@ class QuestionResponse(BaseModel):
 
 class AnswerSubmission(BaseModel):
     answer: str
+    session_id: Optional[str] = None
 
 class AnswerResponse(BaseModel):
     correct: bool
@@ -385,7 +423,9 @@ class ChatMessage(BaseModel):
     content: str
 
 class ChatRequest(BaseModel):
+    # With a conversation_id only the new messages are sent; without one they start a new conversation
     messages: List[ChatMessage]
+    conversation_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -481,9 +521,11 @@ class AdminUserResponse(BaseModel):
 class AdminUsersListResponse(BaseModel):
     users: List[AdminUserResponse]
     total_count: int
+    # Derived from skip; ignored in cursor (keyset) mode, follow next_cursor instead
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 class UserProgressDetail(BaseModel):
     user_id: str
@@ -575,9 +617,11 @@ class AdminQuestionResponse(BaseModel):
 class AdminQuestionsListResponse(BaseModel):
     questions: List[AdminQuestionResponse]
     total_count: int
+    # Derived from skip; ignored in cursor (keyset) mode, follow next_cursor instead
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 # Analytics Models
 class UserAnalytics(BaseModel):
@@ -705,6 +749,26 @@ class TestSessionResult(BaseModel):
     percentile: int
     improvement: float
 
+# Bulk answer submission models
+class SessionAnswer(BaseModel):
+    question_id: str
+    answer: str
+
+class BulkAnswerSubmission(BaseModel):
+    answers: List[SessionAnswer]
+
+class BulkAnswerResult(BaseModel):
+    question_id: str
+    correct: bool
+    correct_answer: str
+    explanation: Explanation
+
+class BulkAnswerResponse(BaseModel):
+    session_id: str
+    total_answers: int
+    correct_answers: int
+    results: List[BulkAnswerResult]
+
 # Helper functions
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -750,22 +814,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRES_IN_MINUTES)
-    to_encode.update({"exp": expire})
+    # iat lets cached principals be keyed per issued token
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-def get_user_by_email(email: str):
+async def get_user_by_email(email: str):
     """Get user by email from database"""
     if db is None:
         return None
-    return db.users.find_one({"email": email})
+    return await db.users.find_one({"email": email})
 
-def get_user_by_id(user_id: str):
+async def get_user_by_id(user_id: str):
     """Get user by ID from database"""
     if db is None:
         return None
     try:
-        return db.users.find_one({"_id": ObjectId(user_id)})
+        return await db.users.find_one({"_id": ObjectId(user_id)})
     except:
         return None
 
@@ -785,54 +850,47 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_id(user_id)
+    # Reuse the principal resolved for this token within the cache TTL
+    cache_key = (user_id, payload.get("iat"))
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
+    
+    cache_version = principal_cache.version
+    user = await get_user_by_id(user_id)
     if user is None:
         raise credentials_exception
     
+    principal_cache.put(cache_key, dict(user), cache_version)
     return user
 
-# Admin authentication and authorization
-async def get_current_admin_user(current_user = Depends(get_current_user)):
-    """Get current authenticated admin user"""
-    user_role = current_user.get("role", "student")
-    if user_role not in ["admin", "super_admin"]:
+def require_role(user: dict, allowed_roles: List[str], detail: str):
+    """Raise 403 unless the user has one of the allowed roles"""
+    if user.get("role", "student") not in allowed_roles:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
+            detail=detail
         )
-    return current_user
+    return user
+
+# Admin authentication and authorization
+async def get_current_admin_user(current_user = Depends(get_current_user)):
+    """Get current authenticated admin user"""
+    return require_role(current_user, ["admin", "super_admin"], "Admin access required")
 
 async def get_current_tutor_user(current_user = Depends(get_current_user)):
     """Get current authenticated tutor user"""
-    user_role = current_user.get("role", "student")
-    if user_role != "tutor":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Tutor access required"
-        )
-    return current_user
+    return require_role(current_user, ["tutor"], "Tutor access required")
 
 async def get_current_tutor_or_admin_user(current_user = Depends(get_current_user)):
     """Get current authenticated tutor or admin user"""
-    user_role = current_user.get("role", "student")
-    if user_role not in ["tutor", "admin", "super_admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Tutor or admin access required"
-        )
-    return current_user
+    return require_role(current_user, ["tutor", "admin", "super_admin"], "Tutor or admin access required")
 
 async def get_current_super_admin_user(current_user = Depends(get_current_user)):
     """Get current authenticated super admin user"""
-    user_role = current_user.get("role", "student")
-    if user_role != "super_admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Super admin access required"
-        )
-    return current_user
+    return require_role(current_user, ["super_admin"], "Super admin access required")
 
-def log_admin_activity(admin_id: str, action: str, resource_type: str, resource_id: str = None, details: Dict[str, Any] = None, ip_address: str = None):
+async def log_admin_activity(admin_id: str, action: str, resource_type: str, resource_id: str = None, details: Dict[str, Any] = None, ip_address: str = None):
     """Log admin activity for audit purposes"""
     if db is None:
         return
@@ -849,35 +907,30 @@ def log_admin_activity(admin_id: str, action: str, resource_type: str, resource_
     }
     
     try:
-        db.admin_activity_logs.insert_one(activity_log)
+        await db.admin_activity_logs.insert_one(activity_log)
     except Exception as e:
         logger.error(f"Failed to log admin activity: {e}")
 
-def calculate_dashboard_stats():
+async def calculate_dashboard_stats():
     """Calculate dashboard statistics"""
     if db is None:
         return None
     
     try:
-        # User statistics
-        total_users = db.users.count_documents({})
-        active_users = db.users.count_documents({"status": {"$ne": "inactive"}})
         today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        new_users_today = db.users.count_documents({"created_at": {"$gte": today}})
-        
-        # Exam statistics
-        total_exams = db.exams.count_documents({})
-        total_questions = db.questions.count_documents({})
-        
-        # Calculate total subjects across all exams
-        total_subjects = 0
-        exams = list(db.exams.find({}, {"subjects": 1}))
-        for exam in exams:
-            total_subjects += len(exam.get("subjects", []))
-        
-        # Calculate completion and accuracy rates
-        total_answers = db.user_answers.count_documents({})
-        correct_answers = db.user_answers.count_documents({"is_correct": True})
+        counters = await read_counters(db, today)
+        if counters is None:
+            # Counters have not been built yet (e.g. migrations disabled)
+            counters = await asyncio.get_running_loop().run_in_executor(None, reconcile_counters, db.delegate)
+        
+        total_users = counters["total_users"]
+        active_users = counters["active_users"]
+        new_users_today = counters["new_users_today"]
+        total_exams = counters["total_exams"]
+        total_questions = counters["total_questions"]
+        total_subjects = counters["total_subjects"]
+        total_answers = counters["total_answers"]
+        correct_answers = counters["correct_answers"]
         
         completion_rate = 0.0
         average_accuracy = 0.0
@@ -904,6 +957,228 @@ def calculate_dashboard_stats():
         logger.error(f"Failed to calculate dashboard stats: {e}")
         return None
 
+async def reconcile_platform_counters_periodically():
+    """Background loop that rebuilds the platform counters from the source collections"""
+    while True:
+        await asyncio.sleep(RECONCILE_INTERVAL_SECONDS)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, reconcile_counters, db.delegate)
+            logger.info("✅ Platform counters reconciled")
+        except Exception as e:
+            logger.error(f"Failed to reconcile platform counters: {e}")
+
+def build_progress_update(questions_delta: int, correct_delta: int, studied_at: datetime) -> List[Dict[str, Any]]:
+    """Update pipeline that increments progress counters and recomputes accuracy on the server"""
+    return [
+        {"$set": {
+            "questions_solved": {"$add": [{"$ifNull": ["$questions_solved", 0]}, questions_delta]},
+            "correct_answers": {"$add": [{"$ifNull": ["$correct_answers", 0]}, correct_delta]},
+            "last_studied_date": studied_at
+        }},
+        {"$set": {
+            "accuracy_rate": {"$cond": [
+                {"$gt": ["$questions_solved", 0]},
+                {"$multiply": [{"$divide": ["$correct_answers", "$questions_solved"]}, 100]},
+                0.0
+            ]}
+        }}
+    ]
+
+async def upsert_user_progress(user_id: ObjectId, exam_id: ObjectId, subject_id: ObjectId,
+                               questions_delta: int, correct_delta: int, studied_at: datetime):
+    """Atomically apply answer counts to a user's subject progress, creating it if needed"""
+    progress_filter = {"user_id": user_id, "exam_id": exam_id, "subject_id": subject_id}
+    update = build_progress_update(questions_delta, correct_delta, studied_at)
+    try:
+        return await db.user_progress.update_one(progress_filter, update, upsert=True)
+    except DuplicateKeyError:
+        # Two first answers raced on the unique progress index; the document exists now
+        return await db.user_progress.update_one(progress_filter, update, upsert=True)
+
+async def bulk_upsert_user_progress(user_id: ObjectId, exam_id: ObjectId, deltas: Dict[ObjectId, Dict[str, int]],
+                                    studied_at: datetime):
+    """Apply aggregated per-subject answer counts to a user's progress in one bulk write"""
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "exam_id": exam_id, "subject_id": subject_id},
+            build_progress_update(delta["questions"], delta["correct"], studied_at),
+            upsert=True
+        )
+        for subject_id, delta in deltas.items()
+    ]
+    if not operations:
+        return None
+    try:
+        return await db.user_progress.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Retry only the upserts that lost a race on the unique progress index
+        retry = [operations[error["index"]] for error in e.details.get("writeErrors", []) if error.get("code") == 11000]
+        if len(retry) != len(e.details.get("writeErrors", [])):
+            raise
+        return await db.user_progress.bulk_write(retry, ordered=False)
+
+async def get_session_answers(session: dict) -> List[dict]:
+    """Answers of a test session, read by session_id with a time-range fallback for untagged answers"""
+    user_answers = await db.user_answers.find(
+        {"session_id": session["_id"], "user_id": session["user_id"]}
+    ).sort("answered_at", 1).to_list()
+    if user_answers:
+        return user_answers
+    
+    # Sessions answered before answers were tagged are matched by time range
+    return await db.user_answers.find({
+        "user_id": session["user_id"],
+        "answered_at": {
+            "$gte": session["start_time"],
+            "$lte": session["end_time"]
+        }
+    }).sort("answered_at", 1).to_list()
+
+async def build_test_session_result(session: dict) -> TestSessionResult:
+    """Compute the full result of a completed test session from its answers"""
+    # Get exam and subject details
+    exam = await catalog_cache.get_exam(db, session["exam_id"])
+    subject = next((s for s in exam.get("subjects", []) if s["_id"] == session["subject_id"]), None) if exam else None
+    
+    if not exam or not subject:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam or subject not found"
+        )
+    
+    # Get user answers for this session
+    user_answers = await get_session_answers(session)
+    
+    # Fetch every answered question in one round-trip
+    question_ids = list({answer["question_id"] for answer in user_answers})
+    questions = await db.questions.find({"_id": {"$in": question_ids}}).to_list() if question_ids else []
+    questions_by_id = {question["_id"]: question for question in questions}
+    
+    # Get questions and build detailed results
+    question_details = []
+    topic_stats = {}
+    correct_count = 0
+    
+    for i, answer in enumerate(user_answers):
+        question = questions_by_id.get(answer["question_id"])
+        if question:
+            is_correct = answer["is_correct"]
+            if is_correct:
+                correct_count += 1
+            
+            # Track topic statistics
+            topic = "General"  # Default topic, could be enhanced with actual topic data
+            if topic not in topic_stats:
+                topic_stats[topic] = {"correct": 0, "total": 0}
+            topic_stats[topic]["total"] += 1
+            if is_correct:
+                topic_stats[topic]["correct"] += 1
+            
+            question_details.append(TestResultDetail(
+                question_id=str(question["_id"]),
+                question_number=i + 1,
+                question_text=question["question"],
+                selected_answer=answer["selected_option_id"],
+                correct_answer=question["correct_answer"],
+                is_correct=is_correct,
+                explanation=Explanation(
+                    reasoning=question["explanation"]["reasoning"],
+                    concept=question["explanation"]["concept"],
+                    sources=question["explanation"]["sources"],
+                    bias_check=question["explanation"]["bias_check"],
+                    reflection=question["explanation"]["reflection"]
+                ),
+                topic=topic,
+                difficulty=question.get("difficulty", "medium"),
+                time_spent=None  # Could be calculated if we track timing
+            ))
+    
+    total_questions = len(user_answers)
+    score_percentage = (correct_count / total_questions * 100) if total_questions > 0 else 0
+    
+    # Calculate grade
+    if score_percentage >= 90:
+        grade = "A"
+    elif score_percentage >= 80:
+        grade = "B"
+    elif score_percentage >= 70:
+        grade = "C"
+    elif score_percentage >= 60:
+        grade = "D"
+    else:
+        grade = "F"
+    
+    # Build topic breakdown
+    topic_breakdown = []
+    for topic, stats in topic_stats.items():
+        percentage = (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0
+        topic_breakdown.append(TopicBreakdown(
+            topic=topic,
+            correct=stats["correct"],
+            total=stats["total"],
+            percentage=percentage
+        ))
+    
+    # Generate study recommendations based on performance
+    recommendations = []
+    for topic_data in topic_breakdown:
+        if topic_data.percentage < 70:
+            priority = "High" if topic_data.percentage < 50 else "Medium"
+            recommendations.append(StudyRecommendation(
+                area=topic_data.topic,
+                suggestion=f"Focus on {topic_data.topic.lower()} concepts and practice more problems",
+                priority=priority,
+                estimated_time="2-3 hours" if priority == "High" else "1-2 hours"
+            ))
+    
+    # Calculate time spent
+    time_diff = session["end_time"] - session["start_time"]
+    total_seconds = int(time_diff.total_seconds())
+    minutes = total_seconds // 60
+    seconds = total_seconds % 60
+    time_spent = f"{minutes}:{seconds:02d}"
+    
+    # Calculate percentile (mock calculation)
+    percentile = min(95, int(score_percentage + 5))
+    
+    # Calculate improvement (mock calculation)
+    improvement = 5.0  # Could be calculated from previous sessions
+    
+    return TestSessionResult(
+        session_id=str(session["_id"]),
+        user_id=str(session["user_id"]),
+        exam_id=str(session["exam_id"]),
+        subject_id=str(session["subject_id"]),
+        exam_name=exam["name"],
+        subject_name=subject["name"],
+        start_time=session["start_time"],
+        end_time=session["end_time"],
+        total_questions=total_questions,
+        correct_answers=correct_count,
+        score_percentage=score_percentage,
+        grade=grade,
+        time_spent=time_spent,
+        question_details=question_details,
+        topic_breakdown=topic_breakdown,
+        recommendations=recommendations,
+        percentile=percentile,
+        improvement=improvement
+    )
+
+async def materialize_test_session_result(session: dict) -> TestSessionResult:
+    """Compute a session's result and store it on the session document"""
+    answers_version = session.get("answers_version", 0)
+    result = await build_test_session_result(session)
+    
+    # Only store the result if no answer arrived while it was being computed;
+    # sessions created before versioning have no answers_version field
+    version_filter = answers_version if answers_version else {"$in": [0, None]}
+    await db.test_sessions.update_one(
+        {"_id": session["_id"], "answers_version": version_filter},
+        {"$set": {"result": result.model_dump(), "result_version": answers_version}}
+    )
+    return result
+
 # Routes
 @app.get("/healthz")
 async def health_check():
@@ -914,7 +1189,7 @@ async def health_check():
         
         if db is not None:
             # Test database connectivity
-            collections = db.list_collection_names()
+            collections = await db.list_collection_names()
             logger.info(f"Database collections: {collections}")
         
         response = {"status": "ok", "database": db_status}
@@ -925,6 +1200,17 @@ async def health_check():
         logger.error(f"Error type: {type(e).__name__}")
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness of the database and of the (lazily loaded) RAG service"""
+    rag = ai_service.rag_status()
+    return {
+        "status": "ok" if db is not None else "degraded",
+        "database": "connected" if db is not None else "disconnected",
+        "rag": rag,
+        "rag_ready": rag["state"] == "ready"
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -943,7 +1229,7 @@ async def signup(user_data: UserCreate):
         )
     
     # Check if user already exists
-    existing_user = get_user_by_email(user_data.email)
+    existing_user = await get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -971,14 +1257,16 @@ async def signup(user_data: UserCreate):
         "role": "student",  # Default role for regular signup
         "status": "active",  # Default status for new users
         "selected_exam_id": None,
+        "search_tokens": build_search_tokens(user_data.name, user_data.email),
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
         "login_count": 0
     }
     
     # Insert user into database
-    result = db.users.insert_one(user_doc)
+    result = await db.users.insert_one(user_doc)
     user_id = str(result.inserted_id)
+    await record_user_created(db, user_doc["created_at"])
     
     # Create access token
     access_token = create_access_token(data={"sub": user_id})
@@ -1006,7 +1294,7 @@ async def login(user_data: UserLogin):
     # Debug: Test database connectivity
     try:
         logger.info("Testing database connectivity...")
-        db.users.count_documents({}, limit=1)
+        await db.users.count_documents({}, limit=1)
         logger.info("✅ Database connectivity test passed")
     except Exception as db_error:
         logger.error(f"❌ LOGIN FAILED: Database connectivity test failed: {db_error}")
@@ -1031,7 +1319,7 @@ async def login(user_data: UserLogin):
     # Get user by email with enhanced error handling
     try:
         logger.info(f"Looking up user by email: {user_data.email}")
-        user = get_user_by_email(user_data.email)
+        user = await get_user_by_email(user_data.email)
         if not user:
             logger.info(f"❌ User not found for email: {user_data.email}")
             raise HTTPException(
@@ -1077,7 +1365,7 @@ async def login(user_data: UserLogin):
     # Update login tracking with enhanced error handling
     try:
         logger.info("Updating login tracking...")
-        db.users.update_one(
+        await db.users.update_one(
             {"_id": user["_id"]},
             {
                 "$set": {"last_login": datetime.utcnow()},
@@ -1154,7 +1442,7 @@ async def get_exams():
             detail="Database connection not available"
         )
     
-    exams = list(db.exams.find({}))
+    exams = await catalog_cache.list_exams(db)
     return [
         ExamListResponse(
             id=str(exam["_id"]),
@@ -1180,7 +1468,7 @@ async def get_exam(exam_id: str):
         )
     
     try:
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        exam = await catalog_cache.get_exam(db, ObjectId(exam_id))
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1235,7 +1523,7 @@ async def set_user_exam(
     
     # Validate exam exists
     try:
-        exam = db.exams.find_one({"_id": ObjectId(exam_selection.exam_id)})
+        exam = await catalog_cache.get_exam(db, ObjectId(exam_selection.exam_id))
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1249,7 +1537,7 @@ async def set_user_exam(
         )
     
     # Update user's selected exam
-    db.users.update_one(
+    await db.users.update_one(
         {"_id": ObjectId(current_user["_id"])},
         {
             "$set": {
@@ -1258,6 +1546,7 @@ async def set_user_exam(
             }
         }
     )
+    principal_cache.invalidate(current_user["_id"])
     
     return {"message": "Exam selected successfully"}
 
@@ -1279,7 +1568,7 @@ async def get_user_dashboard(current_user = Depends(get_current_user)):
         )
     
     try:
-        exam = db.exams.find_one({"_id": ObjectId(current_user["selected_exam_id"])})
+        exam = await catalog_cache.get_exam(db, ObjectId(current_user["selected_exam_id"]))
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1322,10 +1611,10 @@ async def get_user_dashboard(current_user = Depends(get_current_user)):
     
     # Get user progress for this exam
     user_progress = None
-    progress_records = list(db.user_progress.find({
+    progress_records = await db.user_progress.find({
         "user_id": ObjectId(current_user["_id"]),
         "exam_id": ObjectId(current_user["selected_exam_id"])
-    }))
+    }).to_list()
     
     if progress_records:
         # Calculate overall statistics
@@ -1390,7 +1679,7 @@ async def get_questions(exam_id: str, subject_id: str):
     
     # Validate exam and subject exist
     try:
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        exam = await catalog_cache.get_exam(db, ObjectId(exam_id))
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1417,7 +1706,7 @@ async def get_questions(exam_id: str, subject_id: str):
     
     # Get questions for the subject
     try:
-        questions = list(db.questions.find({"subject_id": ObjectId(subject_id)}))
+        questions = await db.questions.find({"subject_id": ObjectId(subject_id)}).to_list()
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1449,80 +1738,96 @@ async def submit_answer(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database connection not available"
         )
-    
+
     # Get the question
     try:
-        question = db.questions.find_one({"_id": ObjectId(question_id)})
+        question = await db.questions.find_one({"_id": ObjectId(question_id)})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid question ID"
         )
-    
+
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Question not found"
         )
-    
+
     # Check if answer is correct
     is_correct = answer_submission.answer == question["correct_answer"]
-    
+
     # Record user answer
     user_id = ObjectId(current_user["_id"])
     subject_id = question["subject_id"]
-    
-    # Insert answer record
-    db.user_answers.insert_one({
+    answered_at = datetime.utcnow()
+
+    answer_doc = {
         "user_id": user_id,
         "question_id": ObjectId(question_id),
         "selected_option_id": answer_submission.answer,
         "is_correct": is_correct,
-        "answered_at": datetime.utcnow()
-    })
-    
-    # Get user's selected exam ID
-    exam_id = current_user.get("selected_exam_id")
-    if not exam_id:
-        # If no exam selected, we can't update progress properly
-        pass
-    else:
-        # Find or create user progress record for this exam and subject
-        progress = db.user_progress.find_one({
-            "user_id": user_id,
-            "exam_id": ObjectId(exam_id),
-            "subject_id": subject_id
-        })
-        
-        if progress:
-            # Update existing progress
-            questions_solved = progress.get("questions_solved", 0) + 1
-            correct_answers = progress.get("correct_answers", 0) + (1 if is_correct else 0)
-            accuracy_rate = (correct_answers / questions_solved * 100) if questions_solved > 0 else 0
-            
-            db.user_progress.update_one(
-                {"_id": progress["_id"]},
-                {
-                    "$set": {
-                        "questions_solved": questions_solved,
-                        "correct_answers": correct_answers,
-                        "accuracy_rate": accuracy_rate,
-                        "last_studied_date": datetime.utcnow()
-                    }
-                }
+        "answered_at": answered_at
+    }
+
+    # Tag the answer with its test session so results can be read by session_id
+    if answer_submission.session_id:
+        if not ObjectId.is_valid(answer_submission.session_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid session ID"
             )
-        else:
-            # Create new progress record
-            db.user_progress.insert_one({
-                "user_id": user_id,
-                "exam_id": ObjectId(exam_id),
-                "subject_id": subject_id,
-                "questions_solved": 1,
-                "correct_answers": 1 if is_correct else 0,
-                "accuracy_rate": 100.0 if is_correct else 0.0,
-                "last_studied_date": datetime.utcnow()
-            })
-    
+        session = await db.test_sessions.find_one(
+            {"_id": ObjectId(answer_submission.session_id), "user_id": user_id},
+            {"status": 1, "subject_id": 1}
+        )
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Test session not found"
+            )
+        # Same rules as the bulk endpoint: open sessions only, and only the session's subject
+        if session.get("status") != "in_progress":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Test session is not in progress"
+            )
+        if subject_id != session.get("subject_id"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Question is not in this test session's subject"
+            )
+        answer_doc["session_id"] = session["_id"]
+
+    writes = [
+        # Insert answer record
+        db.user_answers.insert_one(answer_doc),
+        increment_counters(db, total_answers=1, correct_answers=1 if is_correct else 0)
+    ]
+
+    # Progress is tracked against the user's selected exam
+    exam_id = current_user.get("selected_exam_id")
+    if exam_id:
+        # Single atomic upsert; counters and accuracy are computed on the server
+        writes.append(upsert_user_progress(
+            user_id,
+            ObjectId(exam_id),
+            subject_id,
+            questions_delta=1,
+            correct_delta=1 if is_correct else 0,
+            studied_at=answered_at
+        ))
+
+    # Answer and progress writes go out together
+    await asyncio.gather(*writes)
+
+    if "session_id" in answer_doc:
+        # Marks any materialized result of the session as stale once the answer is stored
+        await db.test_sessions.update_one(
+            {"_id": answer_doc["session_id"], "user_id": user_id},
+            {"$inc": {"answers_version": 1}}
+        )
+
     # Return answer result with explanation
     explanation = Explanation(
         reasoning=question["explanation"]["reasoning"],
@@ -1531,7 +1836,7 @@ async def submit_answer(
         bias_check=question["explanation"]["bias_check"],
         reflection=question["explanation"]["reflection"]
     )
-    
+
     return AnswerResponse(
         correct=is_correct,
         correct_answer=question["correct_answer"],
@@ -1556,7 +1861,7 @@ async def get_ai_explanation(
     
     # Get the question
     try:
-        question = db.questions.find_one({"_id": ObjectId(question_id)})
+        question = await db.questions.find_one({"_id": ObjectId(question_id)})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1569,29 +1874,56 @@ async def get_ai_explanation(
             detail="Question not found"
         )
     
+    # Only real options are explained; anything else would create cache entries and LLM calls
+    if selected_answer is not None and selected_answer not in {option["id"] for option in question["options"]}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid selected answer"
+        )
+    
     # Get subject information for context
     subject_name = "General"
     try:
         # Find the exam that contains this subject
-        exam = db.exams.find_one({"subjects._id": question["subject_id"]})
-        if exam:
-            subject = next((s for s in exam.get("subjects", []) if s["_id"] == question["subject_id"]), None)
-            if subject:
-                subject_name = subject["name"]
+        exam, subject = await catalog_cache.get_subject(db, question["subject_id"])
+        if subject:
+            subject_name = subject["name"]
     except Exception as e:
         logger.warning(f"Could not determine subject name: {e}")
     
     # Generate AI explanation
     try:
-        ai_explanation = await ai_service.generate_explanation(
-            question=question["question"],
-            options=question["options"],
-            correct_answer=question["correct_answer"],
+        cache_key = dict(
+            question_id=question["_id"],
             selected_answer=selected_answer,
-            subject=subject_name,
-            difficulty=question.get("difficulty", "medium"),
-            language=language
-        )
+            language=language,
+            model=ai_service.model,
+            prompt_version=ai_service.explanation_prompt_version
+        )
+        ai_explanation = await explanation_cache.get(db, **cache_key)
+        if ai_explanation is None:
+            async def generate_and_cache():
+                generated = await ai_service.generate_explanation(
+                    question=question["question"],
+                    options=question["options"],
+                    correct_answer=question["correct_answer"],
+                    selected_answer=selected_answer,
+                    subject=subject_name,
+                    difficulty=question.get("difficulty", "medium"),
+                    language=language
+                )
+                # An edit during generation already invalidated the cache; don't store the old explanation
+                current = await db.questions.find_one({"_id": question["_id"]}, {"updated_at": 1})
+                if current is not None and current.get("updated_at") == question.get("updated_at"):
+                    await explanation_cache.put(db, explanation=generated, **cache_key)
+                return generated
+            
+            ai_explanation = await explanation_flight.do(
+                explanation_cache_key(**cache_key),
+                generate_and_cache,
+                recheck=lambda: explanation_cache.peek(db, **cache_key),
+                db=db
+            )
         
         # Convert to Explanation model
         explanation = Explanation(
@@ -1625,25 +1957,11 @@ async def get_ai_explanation(
             explanation=explanation
         )
 
-@app.post("/api/v1/questions/{question_id}/ai-chat", response_model=ChatResponse)
-async def ai_chat(
-    question_id: str,
-    chat_request: ChatRequest,
-    request: Request,
-    current_user = Depends(get_current_user)
-):
-    """Handle conversational AI chat for a specific question"""
-    if db is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database connection not available"
-        )
-    
-    language = getattr(request.state, 'language', DEFAULT_LANGUAGE)
-    
+async def get_chat_question_context(question_id: str) -> Dict[str, Any]:
+    """Question, options and subject the AI tutor chat is grounded on"""
     # Get the question
     try:
-        question = db.questions.find_one({"_id": ObjectId(question_id)})
+        question = await db.questions.find_one({"_id": ObjectId(question_id)})
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1660,34 +1978,99 @@ async def ai_chat(
     subject_name = "General"
     try:
         # Find the exam that contains this subject
-        exam = db.exams.find_one({"subjects._id": question["subject_id"]})
-        if exam:
-            subject = next((s for s in exam.get("subjects", []) if s["_id"] == question["subject_id"]), None)
-            if subject:
-                subject_name = subject["name"]
+        exam, subject = await catalog_cache.get_subject(db, question["subject_id"])
+        if subject:
+            subject_name = subject["name"]
     except Exception as e:
         logger.warning(f"Could not determine subject name: {e}")
     
     # Build question context for the AI
-    question_context = {
+    return {
         "question": question["question"],
         "options": question["options"],
         "correct_answer": question["correct_answer"],
         "subject": subject_name,
         "difficulty": question.get("difficulty", "medium")
     }
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """One Server-Sent Events message carrying a JSON payload"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+async def open_conversation(question_id: str, chat_request: ChatRequest, current_user) -> Dict[str, Any]:
+    """Append the request's new messages to its conversation, or start one with them"""
+    incoming = [{"role": msg.role, "content": msg.content} for msg in chat_request.messages]
+    if not chat_request.conversation_id:
+        return await conversation_store.create(db, current_user["_id"], ObjectId(question_id), incoming)
+    
+    try:
+        conversation = await conversation_store.append(
+            db, chat_request.conversation_id, current_user["_id"], ObjectId(question_id), incoming
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if conversation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    return conversation
+
+async def record_assistant_reply(conversation: Dict[str, Any], question_id: str, current_user, reply: str):
+    """Store the tutor's reply as the end of a turn"""
+    await conversation_store.append(
+        db, str(conversation["_id"]), current_user["_id"], ObjectId(question_id),
+        [{"role": "assistant", "content": reply}], turn=True
+    )
+
+async def summarize_conversation_if_needed(conversation_id: ObjectId, language: str):
+    """Fold old turns into the rolling summary once the history is over budget (runs after the response)"""
+    try:
+        await conversation_store.summarize_if_needed(
+            db, conversation_id,
+            lambda summary, messages: ai_service.summarize_conversation(summary, messages, language)
+        )
+    except Exception as e:
+        logger.error(f"Failed to summarize conversation {conversation_id}: {e}")
+
+@app.post("/api/v1/questions/{question_id}/ai-chat", response_model=ChatResponse)
+async def ai_chat(
+    question_id: str,
+    chat_request: ChatRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_user)
+):
+    """Handle conversational AI chat for a specific question"""
+    if db is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection not available"
+        )
+    
+    language = getattr(request.state, 'language', DEFAULT_LANGUAGE)
+    question_context = await get_chat_question_context(question_id)
+    conversation = await open_conversation(question_id, chat_request, current_user)
     
     # Generate AI chat response
     try:
         ai_response = await ai_service.generate_chat_response(
-            messages=[{"role": msg.role, "content": msg.content} for msg in chat_request.messages],
+            messages=conversation_store.chat_messages(conversation),
             question_context=question_context,
-            language=language
+            language=language,
+            summary=conversation.get("summary")
         )
         
+        if not ai_service.is_fallback_chat_response(ai_response):
+            await record_assistant_reply(conversation, question_id, current_user, ai_response)
+            background_tasks.add_task(summarize_conversation_if_needed, conversation["_id"], language)
+        
         return ChatResponse(
             response=ai_response,
-            conversation_id=None  # Could be implemented for session tracking
+            conversation_id=str(conversation["_id"])
         )
         
     except Exception as e:
@@ -1697,6 +2080,72 @@ async def ai_chat(
             detail="Failed to generate AI response"
         )
 
+@app.post("/api/v1/questions/{question_id}/ai-chat/stream")
+async def ai_chat_stream(
+    question_id: str,
+    chat_request: ChatRequest,
+    request: Request,
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream the AI tutor's reply as Server-Sent Events
+    
+    Each event is `data: {json}`: `token` events carry the reply as it is
+    generated, a `fallback` event carries the unavailable or quota-exceeded
+    message, and a final `done` event reports the conversation id, time to
+    first token and total time in milliseconds.
+    """
+    if db is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection not available"
+        )
+    
+    started = time.perf_counter()
+    language = getattr(request.state, 'language', DEFAULT_LANGUAGE)
+    question_context = await get_chat_question_context(question_id)
+    conversation = await open_conversation(question_id, chat_request, current_user)
+    
+    async def event_stream():
+        first_event_at = None
+        reply, fell_back = [], False
+        try:
+            async for event in ai_service.stream_chat_response(
+                messages=conversation_store.chat_messages(conversation),
+                question_context=question_context,
+                language=language,
+                summary=conversation.get("summary")
+            ):
+                if first_event_at is None:
+                    first_event_at = time.perf_counter()
+                if event["type"] == "token":
+                    reply.append(event["content"])
+                else:
+                    fell_back = True
+                yield sse_event(event)
+        except Exception as e:
+            logger.error(f"Failed to stream AI chat response: {e}")
+            fell_back = True
+            yield sse_event({"type": "fallback", "reason": "error", "content": "Failed to generate AI response"})
+        
+        finished = time.perf_counter()
+        if reply and not fell_back:
+            await record_assistant_reply(conversation, question_id, current_user, "".join(reply))
+        yield sse_event({
+            "type": "done",
+            "conversation_id": str(conversation["_id"]),
+            "ttfb_ms": round(((first_event_at or finished) - started) * 1000, 1),
+            "total_ms": round((finished - started) * 1000, 1)
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(summarize_conversation_if_needed, conversation["_id"], language)
+    )
+
 # =============================================================================
 # ADMIN API ENDPOINTS
 # =============================================================================
@@ -1705,7 +2154,7 @@ async def ai_chat(
 @app.get("/api/v1/admin/dashboard/stats", response_model=DashboardStats)
 async def get_admin_dashboard_stats(current_admin = Depends(get_current_admin_user)):
     """Get dashboard statistics for admin panel"""
-    stats = calculate_dashboard_stats()
+    stats = await calculate_dashboard_stats()
     if stats is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -1713,7 +2162,7 @@ async def get_admin_dashboard_stats(current_admin = Depends(get_current_admin_us
         )
     
     # Log admin activity
-    log_admin_activity(
+    await log_admin_activity(
         admin_id=str(current_admin["_id"]),
         action="view",
         resource_type="dashboard_stats"
@@ -1735,10 +2184,11 @@ async def get_admin_activity_logs(
         )
     
     try:
-        logs = list(db.admin_activity_logs.find({})
-                   .sort("timestamp", -1)
-                   .skip(skip)
-                   .limit(limit))
+        logs = await (db.admin_activity_logs.find({})
+                      .sort("timestamp", -1)
+                      .skip(skip)
+                      .limit(limit)
+                      .to_list())
         
         return [
             ActivityLog(
@@ -1774,7 +2224,7 @@ async def get_system_health(current_admin = Depends(get_current_admin_user)):
         start_time = datetime.utcnow()
         
         # Test database response time
-        db.users.count_documents({})
+        await db.users.count_documents({})
         db_response_time = (datetime.utcnow() - start_time).total_seconds() * 1000
         
         # Mock system health data (in a real system, these would come from monitoring tools)
@@ -1783,7 +2233,7 @@ async def get_system_health(current_admin = Depends(get_current_admin_user)):
             uptime="99.9%",
             response_time=round(db_response_time, 2),
             error_rate=0.1,
-            active_connections=25
+            active_connections=pool_monitor.open_connections
         )
         
         return health
@@ -1794,12 +2244,31 @@ async def get_system_health(current_admin = Depends(get_current_admin_user)):
             detail="Failed to retrieve system health"
         )
 
+@app.get("/api/v1/admin/system/metrics")
+async def get_system_metrics(current_admin = Depends(get_current_admin_user)):
+    """Get internal runtime metrics (connection pool saturation)"""
+    return {
+        "db_pool": pool_monitor.snapshot(),
+        "catalog_cache": catalog_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "explanation_cache": explanation_cache.stats(),
+        "single_flight": {
+            "explanations": explanation_flight.stats(),
+            "llm": ai_service.single_flight.stats()
+        },
+        "conversations": conversation_store.stats(),
+        "llm": ai_service.stats(),
+        "rag": ai_service.rag_status()
+    }
+
 # Admin User Management Endpoints
 @app.get("/api/v1/admin/users", response_model=AdminUsersListResponse)
 async def get_admin_users(
     current_admin = Depends(get_current_admin_user),
     limit: int = Query(50, ge=1, le=100),
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Offset for page-number navigation; not allowed with cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count_mode: CountMode = Query(CountMode.EXACT),
     search: Optional[str] = Query(None),
     role: Optional[UserRole] = Query(None),
     status: Optional[UserStatus] = Query(None)
@@ -1815,30 +2284,25 @@ async def get_admin_users(
         # Build query filter
         query_filter = {}
         if search:
-            query_filter["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"email": {"$regex": search, "$options": "i"}}
-            ]
+            # Prefix match on normalized name/email tokens (multikey index)
+            query_filter.update(search_filter(search))
         if role:
             query_filter["role"] = role.value
         if status:
             query_filter["status"] = status.value
         
         # Get total count for pagination
-        total_count = db.users.count_documents(query_filter)
+        total_count = await count_total(db.users, query_filter, count_mode)
         
-        # Get paginated users
-        users = list(db.users.find(query_filter)
-                    .sort("created_at", -1)
-                    .skip(skip)
-                    .limit(limit))
+        # Get paginated users (keyset order, continuing after the cursor if given)
+        users, next_cursor = await fetch_page(db.users, query_filter, limit, skip=skip, cursor=cursor)
         
         # Calculate pagination info
         page = (skip // limit) + 1
         total_pages = (total_count + limit - 1) // limit  # Ceiling division
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="view",
             resource_type="users",
@@ -1866,12 +2330,16 @@ async def get_admin_users(
             total_count=total_count,
             page=page,
             page_size=limit,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
+    except InvalidPage as e:
+        # `status` is shadowed by the query parameter here
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get users: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=500,
             detail="Failed to retrieve users"
         )
 
@@ -1888,7 +2356,7 @@ async def create_admin_user(
         )
     
     # Check if user already exists
-    existing_user = get_user_by_email(user_data.email)
+    existing_user = await get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1907,17 +2375,19 @@ async def create_admin_user(
             "role": user_data.role.value,
             "status": user_data.status.value,
             "selected_exam_id": None,
+            "search_tokens": build_search_tokens(user_data.name, user_data.email),
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
             "login_count": 0
         }
         
         # Insert user into database
-        result = db.users.insert_one(user_doc)
+        result = await db.users.insert_one(user_doc)
         user_id = str(result.inserted_id)
+        await record_user_created(db, user_doc["created_at"], active=user_doc["status"] != "inactive")
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="create",
             resource_type="user",
@@ -1926,7 +2396,7 @@ async def create_admin_user(
         )
         
         # Return created user
-        created_user = db.users.find_one({"_id": result.inserted_id})
+        created_user = await db.users.find_one({"_id": result.inserted_id})
         return AdminUserResponse(
             id=str(created_user["_id"]),
             name=created_user["name"],
@@ -1959,7 +2429,7 @@ async def get_admin_user(
         )
     
     try:
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1967,7 +2437,7 @@ async def get_admin_user(
             )
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="view",
             resource_type="user",
@@ -2008,7 +2478,7 @@ async def update_admin_user(
     
     try:
         # Check if user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2021,7 +2491,7 @@ async def update_admin_user(
             update_doc["name"] = user_data.name
         if user_data.email is not None:
             # Check if email is already taken by another user
-            existing_user = db.users.find_one({"email": user_data.email, "_id": {"$ne": ObjectId(user_id)}})
+            existing_user = await db.users.find_one({"email": user_data.email, "_id": {"$ne": ObjectId(user_id)}})
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -2038,15 +2508,28 @@ async def update_admin_user(
             update_doc["role"] = user_data.role.value
         if user_data.status is not None:
             update_doc["status"] = user_data.status.value
+        if "name" in update_doc or "email" in update_doc:
+            update_doc["search_tokens"] = build_search_tokens(
+                update_doc.get("name", user.get("name")),
+                update_doc.get("email", user.get("email"))
+            )
         
         # Update user
-        db.users.update_one(
+        await db.users.update_one(
             {"_id": ObjectId(user_id)},
             {"$set": update_doc}
         )
+        principal_cache.invalidate(user_id)
+        
+        # Keep the active user counter in step with status changes
+        if "status" in update_doc:
+            was_active = user.get("status") != "inactive"
+            is_active = update_doc["status"] != "inactive"
+            if was_active != is_active:
+                await increment_counters(db, active_users=1 if is_active else -1)
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="user",
@@ -2055,7 +2538,7 @@ async def update_admin_user(
         )
         
         # Return updated user
-        updated_user = db.users.find_one({"_id": ObjectId(user_id)})
+        updated_user = await db.users.find_one({"_id": ObjectId(user_id)})
         return AdminUserResponse(
             id=str(updated_user["_id"]),
             name=updated_user["name"],
@@ -2089,7 +2572,7 @@ async def delete_admin_user(
     
     try:
         # Check if user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2104,12 +2587,21 @@ async def delete_admin_user(
             )
         
         # Delete user and related data
-        db.users.delete_one({"_id": ObjectId(user_id)})
-        db.user_progress.delete_many({"user_id": ObjectId(user_id)})
-        db.user_answers.delete_many({"user_id": ObjectId(user_id)})
+        answers = await count_answers(db, {"user_id": ObjectId(user_id)})
+        await db.users.delete_one({"_id": ObjectId(user_id)})
+        principal_cache.invalidate(user_id)
+        await db.user_progress.delete_many({"user_id": ObjectId(user_id)})
+        await db.user_answers.delete_many({"user_id": ObjectId(user_id)})
+        await record_user_deleted(
+            db,
+            user.get("created_at"),
+            active=user.get("status") != "inactive",
+            total_answers=-answers["total"],
+            correct_answers=-answers["correct"]
+        )
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="delete",
             resource_type="user",
@@ -2139,7 +2631,7 @@ async def reset_admin_user(
     
     try:
         # Check if user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2161,22 +2653,24 @@ async def reset_admin_user(
             reset_fields.append("selected_exam")
         
         # Delete user progress
-        progress_deleted = db.user_progress.delete_many({"user_id": ObjectId(user_id)})
+        progress_deleted = await db.user_progress.delete_many({"user_id": ObjectId(user_id)})
         if progress_deleted.deleted_count > 0:
             reset_fields.append("progress_data")
         
         # Delete user answers
-        answers_deleted = db.user_answers.delete_many({"user_id": ObjectId(user_id)})
+        answers = await count_answers(db, {"user_id": ObjectId(user_id)})
+        answers_deleted = await db.user_answers.delete_many({"user_id": ObjectId(user_id)})
         if answers_deleted.deleted_count > 0:
             reset_fields.append("answer_history")
+            await increment_counters(db, total_answers=-answers["total"], correct_answers=-answers["correct"])
         
         # Delete test sessions
-        sessions_deleted = db.test_sessions.delete_many({"user_id": ObjectId(user_id)})
+        sessions_deleted = await db.test_sessions.delete_many({"user_id": ObjectId(user_id)})
         if sessions_deleted.deleted_count > 0:
             reset_fields.append("test_sessions")
         
         # Update user document
-        db.users.update_one(
+        await db.users.update_one(
             {"_id": ObjectId(user_id)},
             {
                 "$set": {
@@ -2185,9 +2679,10 @@ async def reset_admin_user(
                 }
             }
         )
+        principal_cache.invalidate(user_id)
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="reset",
             resource_type="user",
@@ -2226,7 +2721,7 @@ async def get_user_progress_detail(
     
     try:
         # Check if user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2234,21 +2729,21 @@ async def get_user_progress_detail(
             )
         
         # Get user progress records
-        progress_records = list(db.user_progress.find({"user_id": ObjectId(user_id)}))
+        progress_records = await db.user_progress.find({"user_id": ObjectId(user_id)}).to_list()
         
         progress_details = []
         for record in progress_records:
             # Get exam details
-            exam = db.exams.find_one({"_id": record["exam_id"]})
+            exam = await catalog_cache.get_exam(db, record["exam_id"])
             if not exam:
                 continue
             
             # Build subject progress
             subject_progress = []
-            subject_records = list(db.user_progress.find({
+            subject_records = await db.user_progress.find({
                 "user_id": ObjectId(user_id),
                 "exam_id": record["exam_id"]
-            }))
+            }).to_list()
             
             for sub_record in subject_records:
                 subject_id = str(sub_record["subject_id"])
@@ -2296,7 +2791,7 @@ async def get_user_progress_detail(
             ))
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="view",
             resource_type="user_progress",
@@ -2332,13 +2827,14 @@ async def get_admin_exams(
         if status:
             query_filter["status"] = status.value
         
-        exams = list(db.exams.find(query_filter)
-                    .sort("created_at", -1)
-                    .skip(skip)
-                    .limit(limit))
+        exams = await (db.exams.find(query_filter)
+                       .sort("created_at", -1)
+                       .skip(skip)
+                       .limit(limit)
+                       .to_list())
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="view",
             resource_type="exams",
@@ -2413,11 +2909,14 @@ async def create_admin_exam(
         }
         
         # Insert exam into database
-        result = db.exams.insert_one(exam_doc)
+        result = await db.exams.insert_one(exam_doc)
         exam_id = str(result.inserted_id)
+        await increment_counters(db, total_exams=1, total_subjects=len(exam_doc["subjects"]))
+        
+        catalog_cache.invalidate(f"exam {exam_id} created")
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="create",
             resource_type="exam",
@@ -2426,7 +2925,7 @@ async def create_admin_exam(
         )
         
         # Return created exam
-        created_exam = db.exams.find_one({"_id": result.inserted_id})
+        created_exam = await db.exams.find_one({"_id": result.inserted_id})
         return ExamResponse(
             id=str(created_exam["_id"]),
             name=created_exam["name"],
@@ -2461,7 +2960,7 @@ async def update_admin_exam(
     
     try:
         # Check if exam exists
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        exam = await db.exams.find_one({"_id": ObjectId(exam_id)})
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2488,13 +2987,15 @@ async def update_admin_exam(
             update_doc["flag"] = exam_data.flag
         
         # Update exam
-        db.exams.update_one(
+        await db.exams.update_one(
             {"_id": ObjectId(exam_id)},
             {"$set": update_doc}
         )
         
+        catalog_cache.invalidate(f"exam {exam_id} updated")
+        
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="exam",
@@ -2503,7 +3004,7 @@ async def update_admin_exam(
         )
         
         # Return updated exam
-        updated_exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        updated_exam = await db.exams.find_one({"_id": ObjectId(exam_id)})
         subjects = [
             Subject(
                 id=str(subject["_id"]),
@@ -2551,7 +3052,7 @@ async def delete_admin_exam(
     
     try:
         # Check if exam exists
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        exam = await db.exams.find_one({"_id": ObjectId(exam_id)})
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2562,23 +3063,38 @@ async def delete_admin_exam(
         subject_ids = [subject["_id"] for subject in exam.get("subjects", [])]
         
         # Delete related data
+        answers = {"total": 0, "correct": 0}
+        questions_deleted = 0
         if subject_ids:
-            db.questions.delete_many({"subject_id": {"$in": subject_ids}})
-            db.user_answers.delete_many({"question_id": {"$in": [
-                q["_id"] for q in db.questions.find({"subject_id": {"$in": subject_ids}})
-            ]}})
-        
-        db.user_progress.delete_many({"exam_id": ObjectId(exam_id)})
-        db.users.update_many(
+            question_ids = await db.questions.distinct("_id", {"subject_id": {"$in": subject_ids}})
+            answers = await count_answers(db, {"question_id": {"$in": question_ids}})
+            await explanation_cache.invalidate_questions(db, question_ids)
+            await db.user_answers.delete_many({"question_id": {"$in": question_ids}})
+            questions_deleted = (await db.questions.delete_many({"subject_id": {"$in": subject_ids}})).deleted_count
+        
+        await db.user_progress.delete_many({"exam_id": ObjectId(exam_id)})
+        await db.users.update_many(
             {"selected_exam_id": ObjectId(exam_id)},
             {"$set": {"selected_exam_id": None}}
         )
+        # Any cached principal may have had this exam selected
+        principal_cache.clear()
         
         # Delete exam
-        db.exams.delete_one({"_id": ObjectId(exam_id)})
+        await db.exams.delete_one({"_id": ObjectId(exam_id)})
+        await increment_counters(
+            db,
+            total_exams=-1,
+            total_subjects=-len(subject_ids),
+            total_questions=-questions_deleted,
+            total_answers=-answers["total"],
+            correct_answers=-answers["correct"]
+        )
+        
+        catalog_cache.invalidate(f"exam {exam_id} deleted")
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="delete",
             resource_type="exam",
@@ -2601,7 +3117,9 @@ async def get_admin_questions(
     subject_id: str,
     current_admin = Depends(get_current_admin_user),
     limit: int = Query(50, ge=1, le=100),
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Offset for page-number navigation; not allowed with cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count_mode: CountMode = Query(CountMode.EXACT),
     difficulty: Optional[QuestionDifficulty] = Query(None),
     status: Optional[QuestionStatus] = Query(None)
 ):
@@ -2621,20 +3139,17 @@ async def get_admin_questions(
             query_filter["status"] = status.value
         
         # Get total count for pagination
-        total_count = db.questions.count_documents(query_filter)
+        total_count = await count_total(db.questions, query_filter, count_mode)
         
-        # Get paginated questions
-        questions = list(db.questions.find(query_filter)
-                        .sort("created_at", -1)
-                        .skip(skip)
-                        .limit(limit))
+        # Get paginated questions (keyset order, continuing after the cursor if given)
+        questions, next_cursor = await fetch_page(db.questions, query_filter, limit, skip=skip, cursor=cursor)
         
         # Calculate pagination info
         page = (skip // limit) + 1
         total_pages = (total_count + limit - 1) // limit  # Ceiling division
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="view",
             resource_type="questions",
@@ -2676,15 +3191,19 @@ async def get_admin_questions(
             total_count=total_count,
             page=page,
             page_size=limit,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
         
         
         return response_obj
+    except InvalidPage as e:
+        # `status` is shadowed by the query parameter here
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get questions: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=500,
             detail="Failed to retrieve questions"
         )
 
@@ -2703,7 +3222,7 @@ async def create_admin_question(
     
     try:
         # Verify subject exists
-        exam = db.exams.find_one({"subjects._id": ObjectId(subject_id)})
+        exam = await db.exams.find_one({"subjects._id": ObjectId(subject_id)})
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2734,22 +3253,23 @@ async def create_admin_question(
         }
         
         # Insert question
-        result = db.questions.insert_one(question_doc)
+        result = await db.questions.insert_one(question_doc)
         question_id = str(result.inserted_id)
+        await increment_counters(db, total_questions=1)
         
         # Update subject question count and duration based on actual questions
-        actual_question_count = db.questions.count_documents({"subject_id": ObjectId(subject_id)})
+        actual_question_count = await db.questions.count_documents({"subject_id": ObjectId(subject_id)})
         total_duration_pipeline = [
             {"$match": {"subject_id": ObjectId(subject_id)}},
             {"$group": {"_id": None, "total_duration": {"$sum": "$duration"}}}
         ]
-        duration_result = list(db.questions.aggregate(total_duration_pipeline))
+        duration_result = await db.questions.aggregate(total_duration_pipeline).to_list()
         total_duration = duration_result[0]["total_duration"] if duration_result else 0
         
         # Convert total duration from seconds to minutes for display
         duration_minutes = f"{total_duration // 60} min" if total_duration > 0 else "0 min"
         
-        db.exams.update_one(
+        await db.exams.update_one(
             {"subjects._id": ObjectId(subject_id)},
             {"$set": {
                 "subjects.$.total_questions": actual_question_count,
@@ -2758,19 +3278,21 @@ async def create_admin_question(
         )
         
         # Update exam total questions based on actual question counts
-        updated_exam = db.exams.find_one({"subjects._id": ObjectId(subject_id)})
+        updated_exam = await db.exams.find_one({"subjects._id": ObjectId(subject_id)})
         total_exam_questions = 0
         for subject in updated_exam.get("subjects", []):
-            subject_question_count = db.questions.count_documents({"subject_id": subject["_id"]})
+            subject_question_count = await db.questions.count_documents({"subject_id": subject["_id"]})
             total_exam_questions += subject_question_count
         
-        db.exams.update_one(
+        await db.exams.update_one(
             {"_id": updated_exam["_id"]},
             {"$set": {"total_questions": total_exam_questions}}
         )
         
+        catalog_cache.invalidate(f"question {question_id} created")
+        
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="create",
             resource_type="question",
@@ -2779,7 +3301,7 @@ async def create_admin_question(
         )
         
         # Return created question
-        created_question = db.questions.find_one({"_id": result.inserted_id})
+        created_question = await db.questions.find_one({"_id": result.inserted_id})
         return AdminQuestionResponse(
             id=str(created_question["_id"]),
             subject_id=str(created_question["subject_id"]),
@@ -2828,7 +3350,7 @@ async def update_admin_question(
     
     try:
         # Check if question exists
-        question = db.questions.find_one({"_id": ObjectId(question_id), "subject_id": ObjectId(subject_id)})
+        question = await db.questions.find_one({"_id": ObjectId(question_id), "subject_id": ObjectId(subject_id)})
         if not question:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2863,7 +3385,7 @@ async def update_admin_question(
             update_doc["duration"] = question_data.duration
         
         # Update question
-        db.questions.update_one(
+        await db.questions.update_one(
             {"_id": ObjectId(question_id)},
             {"$set": update_doc}
         )
@@ -2874,17 +3396,20 @@ async def update_admin_question(
                 {"$match": {"subject_id": ObjectId(subject_id)}},
                 {"$group": {"_id": None, "total_duration": {"$sum": "$duration"}}}
             ]
-            duration_result = list(db.questions.aggregate(total_duration_pipeline))
+            duration_result = await db.questions.aggregate(total_duration_pipeline).to_list()
             total_duration = duration_result[0]["total_duration"] if duration_result else 0
             duration_minutes = f"{total_duration // 60} min" if total_duration > 0 else "0 min"
             
-            db.exams.update_one(
+            await db.exams.update_one(
                 {"subjects._id": ObjectId(subject_id)},
                 {"$set": {"subjects.$.duration": duration_minutes}}
             )
         
+        catalog_cache.invalidate(f"question {question_id} updated")
+        await explanation_cache.invalidate_questions(db, [ObjectId(question_id)])
+        
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="question",
@@ -2893,7 +3418,7 @@ async def update_admin_question(
         )
         
         # Return updated question
-        updated_question = db.questions.find_one({"_id": ObjectId(question_id)})
+        updated_question = await db.questions.find_one({"_id": ObjectId(question_id)})
         return AdminQuestionResponse(
             id=str(updated_question["_id"]),
             subject_id=str(updated_question["subject_id"]),
@@ -2941,7 +3466,7 @@ async def delete_admin_question(
     
     try:
         # Check if question exists
-        question = db.questions.find_one({"_id": ObjectId(question_id), "subject_id": ObjectId(subject_id)})
+        question = await db.questions.find_one({"_id": ObjectId(question_id), "subject_id": ObjectId(subject_id)})
         if not question:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2949,22 +3474,29 @@ async def delete_admin_question(
             )
         
         # Delete question
-        db.questions.delete_one({"_id": ObjectId(question_id)})
+        await db.questions.delete_one({"_id": ObjectId(question_id)})
         
         # Delete related user answers
-        db.user_answers.delete_many({"question_id": ObjectId(question_id)})
+        answers = await count_answers(db, {"question_id": ObjectId(question_id)})
+        await db.user_answers.delete_many({"question_id": ObjectId(question_id)})
+        await increment_counters(
+            db,
+            total_questions=-1,
+            total_answers=-answers["total"],
+            correct_answers=-answers["correct"]
+        )
         
         # Update subject question count and duration based on remaining questions
-        actual_question_count = db.questions.count_documents({"subject_id": ObjectId(subject_id)})
+        actual_question_count = await db.questions.count_documents({"subject_id": ObjectId(subject_id)})
         total_duration_pipeline = [
             {"$match": {"subject_id": ObjectId(subject_id)}},
             {"$group": {"_id": None, "total_duration": {"$sum": "$duration"}}}
         ]
-        duration_result = list(db.questions.aggregate(total_duration_pipeline))
+        duration_result = await db.questions.aggregate(total_duration_pipeline).to_list()
         total_duration = duration_result[0]["total_duration"] if duration_result else 0
         duration_minutes = f"{total_duration // 60} min" if total_duration > 0 else "0 min"
         
-        db.exams.update_one(
+        await db.exams.update_one(
             {"subjects._id": ObjectId(subject_id)},
             {"$set": {
                 "subjects.$.total_questions": actual_question_count,
@@ -2973,19 +3505,22 @@ async def delete_admin_question(
         )
         
         # Update exam total questions
-        exam = db.exams.find_one({"subjects._id": ObjectId(subject_id)})
+        exam = await db.exams.find_one({"subjects._id": ObjectId(subject_id)})
         total_exam_questions = 0
         for subject in exam.get("subjects", []):
-            subject_question_count = db.questions.count_documents({"subject_id": subject["_id"]})
+            subject_question_count = await db.questions.count_documents({"subject_id": subject["_id"]})
             total_exam_questions += subject_question_count
         
-        db.exams.update_one(
+        await db.exams.update_one(
             {"_id": exam["_id"]},
             {"$set": {"total_questions": total_exam_questions}}
         )
         
+        catalog_cache.invalidate(f"question {question_id} deleted")
+        await explanation_cache.invalidate_questions(db, [ObjectId(question_id)])
+        
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="delete",
             resource_type="question",
@@ -3013,12 +3548,12 @@ async def get_user_analytics(current_admin = Depends(get_current_admin_user)):
     
     try:
         # Calculate user metrics
-        total_users = db.users.count_documents({})
-        active_users = db.users.count_documents({"status": {"$ne": "inactive"}})
+        total_users = await db.users.count_documents({})
+        active_users = await db.users.count_documents({"status": {"$ne": "inactive"}})
         
         # New registrations in last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        new_registrations = db.users.count_documents({"created_at": {"$gte": thirty_days_ago}})
+        new_registrations = await db.users.count_documents({"created_at": {"$gte": thirty_days_ago}})
         
         # Mock retention rate calculation
         user_retention_rate = 85.5
@@ -3066,7 +3601,7 @@ async def get_system_settings(current_admin = Depends(get_current_super_admin_us
         )
     
     try:
-        settings = list(db.system_settings.find({}))
+        settings = await db.system_settings.find({}).to_list()
         return [
             SystemSettings(
                 category=setting["category"],
@@ -3098,7 +3633,7 @@ async def update_system_settings(
     
     try:
         # Update or create settings
-        db.system_settings.update_one(
+        await db.system_settings.update_one(
             {"category": category},
             {
                 "$set": {
@@ -3111,7 +3646,7 @@ async def update_system_settings(
         )
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="system_settings",
@@ -3139,7 +3674,7 @@ async def get_admin_preferences(current_admin = Depends(get_current_admin_user))
     
     try:
         admin_id = ObjectId(current_admin["_id"])
-        preferences = db.admin_preferences.find_one({"admin_id": admin_id})
+        preferences = await db.admin_preferences.find_one({"admin_id": admin_id})
         
         if not preferences:
             # Create default preferences if none exist
@@ -3156,8 +3691,8 @@ async def get_admin_preferences(current_admin = Depends(get_current_admin_user))
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
-            result = db.admin_preferences.insert_one(default_preferences)
-            preferences = db.admin_preferences.find_one({"_id": result.inserted_id})
+            result = await db.admin_preferences.insert_one(default_preferences)
+            preferences = await db.admin_preferences.find_one({"_id": result.inserted_id})
         
         return AdminPreferences(
             admin_id=str(preferences["admin_id"]),
@@ -3214,14 +3749,14 @@ async def update_admin_preferences(
             update_doc["login_alerts"] = preferences_data.login_alerts
         
         # Update or create preferences
-        db.admin_preferences.update_one(
+        await db.admin_preferences.update_one(
             {"admin_id": admin_id},
             {"$set": update_doc},
             upsert=True
         )
         
         # Log admin activity
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="admin_preferences",
@@ -3229,7 +3764,7 @@ async def update_admin_preferences(
         )
         
         # Return updated preferences
-        updated_preferences = db.admin_preferences.find_one({"admin_id": admin_id})
+        updated_preferences = await db.admin_preferences.find_one({"admin_id": admin_id})
         return AdminPreferences(
             admin_id=str(updated_preferences["admin_id"]),
             system_alerts=updated_preferences.get("system_alerts", True),
@@ -3264,7 +3799,7 @@ async def get_system_settings_by_category(
         )
     
     try:
-        settings = db.system_settings.find_one({"category": category})
+        settings = await db.system_settings.find_one({"category": category})
         if not settings:
             # Return default settings for the category
             default_settings = get_default_settings_for_category(category)
@@ -3298,7 +3833,7 @@ async def update_system_settings_by_category(
     
     try:
         # Update or create settings
-        db.system_settings.update_one(
+        await db.system_settings.update_one(
             {"category": category},
             {
                 "$set": {
@@ -3311,7 +3846,7 @@ async def update_system_settings_by_category(
         )
         
         # Log admin activity (don't convert category to ObjectId)
-        log_admin_activity(
+        await log_admin_activity(
             admin_id=str(current_admin["_id"]),
             action="update",
             resource_type="system_settings",
@@ -3355,10 +3890,10 @@ async def get_performance_metrics(
             start_time = now - timedelta(days=7)
         
         # Get analytics metrics from database
-        metrics = list(db.analytics_metrics.find({
+        metrics = await db.analytics_metrics.find({
             "metric_type": "system_performance",
             "date": {"$gte": start_time}
-        }).sort("date", -1))
+        }).sort("date", -1).to_list()
         
         if not metrics:
             # Return mock performance data if no metrics exist
@@ -3423,10 +3958,10 @@ async def get_trending_data(
             start_time = now - timedelta(days=7)
         
         # Get time series data from database
-        time_series = list(db.time_series_data.find({
+        time_series = await db.time_series_data.find({
             "metric_name": metric,
             "timestamp": {"$gte": start_time}
-        }).sort("timestamp", 1))
+        }).sort("timestamp", 1).to_list()
         
         if not time_series:
             # Return mock trending data if no data exists
@@ -3497,7 +4032,7 @@ async def create_test_session(
     
     try:
         # Validate exam and subject exist
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
+        exam = await catalog_cache.get_exam(db, ObjectId(exam_id))
         if not exam:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -3525,10 +4060,11 @@ async def create_test_session(
             "end_time": None,
             "status": "in_progress",
             "answers": [],
+            "answers_version": 0,
             "created_at": datetime.utcnow()
         }
         
-        result = db.test_sessions.insert_one(session_doc)
+        result = await db.test_sessions.insert_one(session_doc)
         session_id = str(result.inserted_id)
         
         return {"session_id": session_id, "status": "created"}
@@ -3539,6 +4075,142 @@ async def create_test_session(
             detail="Failed to create test session"
         )
 
+@app.post("/api/v1/test-sessions/{session_id}/answers", response_model=BulkAnswerResponse)
+async def submit_test_session_answers(
+    session_id: str,
+    submission: BulkAnswerSubmission,
+    current_user = Depends(get_current_user)
+):
+    """Submit a batch of answers for a test session and get per-answer results"""
+    if db is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection not available"
+        )
+    
+    if not submission.answers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No answers submitted"
+        )
+    
+    if len(submission.answers) > MAX_BULK_ANSWERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BULK_ANSWERS} answers can be submitted at once"
+        )
+    
+    try:
+        session_object_id = ObjectId(session_id)
+        question_ids = [ObjectId(item.question_id) for item in submission.answers]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid session or question ID"
+        )
+    
+    user_id = ObjectId(current_user["_id"])
+    session = await db.test_sessions.find_one({"_id": session_object_id, "user_id": user_id})
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test session not found"
+        )
+    
+    if session.get("status") != "in_progress":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Test session is not in progress"
+        )
+    
+    try:
+        # Load every referenced question in one round-trip
+        questions = await db.questions.find({"_id": {"$in": list(set(question_ids))}}).to_list()
+        questions_by_id = {question["_id"]: question for question in questions}
+        
+        missing = [str(qid) for qid in question_ids if qid not in questions_by_id]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Questions not found: {', '.join(sorted(set(missing)))}"
+            )
+
+        # Answers only count towards the session's own subject
+        foreign = [
+            str(qid) for qid in question_ids
+            if questions_by_id[qid].get("subject_id") != session["subject_id"]
+        ]
+        if foreign:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Questions not in this test session's subject: {', '.join(sorted(set(foreign)))}"
+            )
+
+        answered_at = datetime.utcnow()
+        answer_docs = []
+        results = []
+        deltas: Dict[ObjectId, Dict[str, int]] = {}
+        
+        for item, question_id in zip(submission.answers, question_ids):
+            question = questions_by_id[question_id]
+            is_correct = item.answer == question["correct_answer"]
+            
+            answer_docs.append({
+                "user_id": user_id,
+                "session_id": session_object_id,
+                "question_id": question_id,
+                "selected_option_id": item.answer,
+                "is_correct": is_correct,
+                "answered_at": answered_at
+            })
+            
+            # Aggregate progress deltas per subject
+            delta = deltas.setdefault(question["subject_id"], {"questions": 0, "correct": 0})
+            delta["questions"] += 1
+            if is_correct:
+                delta["correct"] += 1
+            
+            results.append(BulkAnswerResult(
+                question_id=str(question_id),
+                correct=is_correct,
+                correct_answer=question["correct_answer"],
+                explanation=Explanation(
+                    reasoning=question["explanation"]["reasoning"],
+                    concept=question["explanation"]["concept"],
+                    sources=question["explanation"]["sources"],
+                    bias_check=question["explanation"]["bias_check"],
+                    reflection=question["explanation"]["reflection"]
+                )
+            ))
+        
+        # One insert_many for the answers and one bulk_write for the progress deltas
+        await asyncio.gather(
+            db.user_answers.insert_many(answer_docs, ordered=False),
+            bulk_upsert_user_progress(user_id, session["exam_id"], deltas, answered_at),
+            increment_counters(
+                db,
+                total_answers=len(answer_docs),
+                correct_answers=sum(1 for doc in answer_docs if doc["is_correct"])
+            )
+        )
+        # Marks any materialized result of the session as stale
+        await db.test_sessions.update_one({"_id": session_object_id}, {"$inc": {"answers_version": 1}})
+        
+        return BulkAnswerResponse(
+            session_id=session_id,
+            total_answers=len(results),
+            correct_answers=sum(1 for result in results if result.correct),
+            results=results
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to submit test session answers: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to submit answers"
+        )
+
 @app.put("/api/v1/test-sessions/{session_id}/complete")
 async def complete_test_session(
     session_id: str,
@@ -3553,17 +4225,33 @@ async def complete_test_session(
     
     try:
         # Update test session
-        db.test_sessions.update_one(
+        session = await db.test_sessions.find_one_and_update(
             {"_id": ObjectId(session_id), "user_id": ObjectId(current_user["_id"])},
             {
                 "$set": {
                     "end_time": datetime.utcnow(),
                     "status": "completed"
                 }
-            }
+            },
+            return_document=ReturnDocument.AFTER
         )
         
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Test session not found"
+            )
+        
+        # Compute the result once so the results endpoint is a single read;
+        # if this fails the results endpoint computes it on first access
+        try:
+            await materialize_test_session_result(session)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not materialize result for test session {session_id}: {e}")
+        
         return {"message": "Test session completed"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to complete test session: {e}")
         raise HTTPException(
@@ -3586,7 +4274,7 @@ async def get_test_results(
     
     try:
         # Get the most recent completed test session for this user, exam, and subject
-        session = db.test_sessions.find_one({
+        session = await db.test_sessions.find_one({
             "user_id": ObjectId(current_user["_id"]),
             "exam_id": ObjectId(exam_id),
             "subject_id": ObjectId(subject_id),
@@ -3599,135 +4287,13 @@ async def get_test_results(
                 detail="No completed test session found"
             )
         
-        # Get exam and subject details
-        exam = db.exams.find_one({"_id": ObjectId(exam_id)})
-        subject = next((s for s in exam.get("subjects", []) if str(s["_id"]) == subject_id), None)
-        
-        if not exam or not subject:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Exam or subject not found"
-            )
-        
-        # Get user answers for this session
-        user_answers = list(db.user_answers.find({
-            "user_id": ObjectId(current_user["_id"]),
-            "answered_at": {
-                "$gte": session["start_time"],
-                "$lte": session["end_time"]
-            }
-        }))
-        
-        # Get questions and build detailed results
-        question_details = []
-        topic_stats = {}
-        correct_count = 0
-        
-        for i, answer in enumerate(user_answers):
-            question = db.questions.find_one({"_id": answer["question_id"]})
-            if question:
-                is_correct = answer["is_correct"]
-                if is_correct:
-                    correct_count += 1
-                
-                # Track topic statistics
-                topic = "General"  # Default topic, could be enhanced with actual topic data
-                if topic not in topic_stats:
-                    topic_stats[topic] = {"correct": 0, "total": 0}
-                topic_stats[topic]["total"] += 1
-                if is_correct:
-                    topic_stats[topic]["correct"] += 1
-                
-                question_details.append(TestResultDetail(
-                    question_id=str(question["_id"]),
-                    question_number=i + 1,
-                    question_text=question["question"],
-                    selected_answer=answer["selected_option_id"],
-                    correct_answer=question["correct_answer"],
-                    is_correct=is_correct,
-                    explanation=Explanation(
-                        reasoning=question["explanation"]["reasoning"],
-                        concept=question["explanation"]["concept"],
-                        sources=question["explanation"]["sources"],
-                        bias_check=question["explanation"]["bias_check"],
-                        reflection=question["explanation"]["reflection"]
-                    ),
-                    topic=topic,
-                    difficulty=question.get("difficulty", "medium"),
-                    time_spent=None  # Could be calculated if we track timing
-                ))
-        
-        total_questions = len(user_answers)
-        score_percentage = (correct_count / total_questions * 100) if total_questions > 0 else 0
-        
-        # Calculate grade
-        if score_percentage >= 90:
-            grade = "A"
-        elif score_percentage >= 80:
-            grade = "B"
-        elif score_percentage >= 70:
-            grade = "C"
-        elif score_percentage >= 60:
-            grade = "D"
-        else:
-            grade = "F"
-        
-        # Build topic breakdown
-        topic_breakdown = []
-        for topic, stats in topic_stats.items():
-            percentage = (stats["correct"] / stats["total"] * 100) if stats["total"] > 0 else 0
-            topic_breakdown.append(TopicBreakdown(
-                topic=topic,
-                correct=stats["correct"],
-                total=stats["total"],
-                percentage=percentage
-            ))
+        # Serve the materialized result unless answers changed since it was computed
+        if session.get("result") and session.get("result_version") == session.get("answers_version", 0):
+            return TestSessionResult(**session["result"])
         
-        # Generate study recommendations based on performance
-        recommendations = []
-        for topic_data in topic_breakdown:
-            if topic_data.percentage < 70:
-                priority = "High" if topic_data.percentage < 50 else "Medium"
-                recommendations.append(StudyRecommendation(
-                    area=topic_data.topic,
-                    suggestion=f"Focus on {topic_data.topic.lower()} concepts and practice more problems",
-                    priority=priority,
-                    estimated_time="2-3 hours" if priority == "High" else "1-2 hours"
-                ))
-        
-        # Calculate time spent
-        time_diff = session["end_time"] - session["start_time"]
-        total_seconds = int(time_diff.total_seconds())
-        minutes = total_seconds // 60
-        seconds = total_seconds % 60
-        time_spent = f"{minutes}:{seconds:02d}"
-        
-        # Calculate percentile (mock calculation)
-        percentile = min(95, int(score_percentage + 5))
-        
-        # Calculate improvement (mock calculation)
-        improvement = 5.0  # Could be calculated from previous sessions
-        
-        return TestSessionResult(
-            session_id=str(session["_id"]),
-            user_id=str(session["user_id"]),
-            exam_id=str(session["exam_id"]),
-            subject_id=str(session["subject_id"]),
-            exam_name=exam["name"],
-            subject_name=subject["name"],
-            start_time=session["start_time"],
-            end_time=session["end_time"],
-            total_questions=total_questions,
-            correct_answers=correct_count,
-            score_percentage=score_percentage,
-            grade=grade,
-            time_spent=time_spent,
-            question_details=question_details,
-            topic_breakdown=topic_breakdown,
-            recommendations=recommendations,
-            percentile=percentile,
-            improvement=improvement
-        )
+        return await materialize_test_session_result(session)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get test results: {e}")
         raise HTTPException(
@@ -3795,7 +4361,7 @@ async def get_tutor_profile(current_tutor = Depends(get_current_tutor_user)):
     
     try:
         # Get fresh user data from database
-        user = get_user_by_id(str(current_tutor["_id"]))
+        user = await get_user_by_id(str(current_tutor["_id"]))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -3838,7 +4404,7 @@ async def update_tutor_profile(
     
     try:
         # Get current tutor data
-        user = get_user_by_id(str(current_tutor["_id"]))
+        user = await get_user_by_id(str(current_tutor["_id"]))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -3865,7 +4431,7 @@ async def update_tutor_profile(
             update_tutor_data["languages"] = profile_data.languages
         
         # Update user in database
-        db.users.update_one(
+        await db.users.update_one(
             {"_id": ObjectId(current_tutor["_id"])},
             {
                 "$set": {
@@ -3874,9 +4440,10 @@ async def update_tutor_profile(
                 }
             }
         )
+        principal_cache.invalidate(current_tutor["_id"])
         
         # Return updated user
-        updated_user = get_user_by_id(str(current_tutor["_id"]))
+        updated_user = await get_user_by_id(str(current_tutor["_id"]))
         tutor_data = TutorData(**updated_user["tutor_data"]) if updated_user.get("tutor_data") else None
         
         return UserResponse(
@@ -3947,14 +4514,17 @@ def initialize_default_data():
     if db is None:
         return
     
+    # Runs at import time, outside the event loop, so use the blocking driver directly
+    sync_db = db.delegate
+    
     try:
         # Initialize default system settings
         categories = ["general", "database", "email", "security", "localization", "theme"]
         for category in categories:
-            existing = db.system_settings.find_one({"category": category})
+            existing = sync_db.system_settings.find_one({"category": category})
             if not existing:
                 default_settings = get_default_settings_for_category(category)
-                db.system_settings.insert_one({
+                sync_db.system_settings.insert_one({
                     "category": category,
                     "settings": default_settings,
                     "updated_by": None,  # System initialization
@@ -3988,18 +4558,40 @@ def initialize_default_data():
         ]
         
         for metric in sample_metrics:
-            existing = db.analytics_metrics.find_one({
+            existing = sync_db.analytics_metrics.find_one({
                 "metric_type": metric["metric_type"],
                 "date": metric["date"]
             })
             if not existing:
-                db.analytics_metrics.insert_one(metric)
+                sync_db.analytics_metrics.insert_one(metric)
         
         logger.info("Database initialization completed")
     except Exception as e:
         logger.error(f"Failed to initialize default data: {e}")
 
-# Initialize default data on startup
+def apply_schema_migrations():
+    """
+    Apply pending index and data migrations (idempotent, safe on every cold start)
+    
+    Deferred migrations are left to `python migrations.py`, so a cold start
+    never repeats their checks.
+    """
+    if db is None:
+        return
+    
+    if os.getenv("MONGODB_RUN_MIGRATIONS", "true").lower() == "false":
+        logger.info("Skipping schema migrations (MONGODB_RUN_MIGRATIONS=false)")
+        return
+    
+    try:
+        applied = run_migrations(db.delegate, retry_deferred=False)
+        if applied:
+            logger.info(f"✅ Applied schema migrations: {applied}")
+    except Exception as e:
+        logger.error(f"Failed to apply schema migrations: {e}")
+
+# Initialize indexes and default data on startup
+apply_schema_migrations()
 initialize_default_data()
 
 if __name__ == "__main__":
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Versioned index bootstrap and data migrations for the artori database.
+
+Each migration is registered with a version number and recorded in the
+`schema_migrations` collection once it succeeds, so running this module
+repeatedly (at every deploy or process start) only applies what is new.
+Index creation is idempotent, which keeps concurrent runs harmless.
+Migrations that had to be deferred are retried by this command only, not
+by the API's startup run, so cold starts never repeat their checks.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # show applied / pending versions
+"""
+
+import os
+import sys
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+
+class MigrationDeferred(Exception):
+    """
+    Raised by a migration that cannot be applied until data is fixed by hand
+
+    The migration is recorded as deferred, not as applied, and the
+    migrations after it still run. `python migrations.py` retries it.
+    """
+
+# Registered migrations, in version order
+MIGRATIONS: List[Dict] = []
+
+
+def migration(version: int, description: str):
+    """Register a migration function under a version number"""
+    def decorator(fn: Callable[[Database], None]):
+        MIGRATIONS.append({"version": version, "description": description, "apply": fn})
+        MIGRATIONS.sort(key=lambda m: m["version"])
+        return fn
+    return decorator
+
+
+@migration(1, "Create indexes for hot query paths")
+def create_core_indexes(db: Database):
+    # Login / signup lookups (made unique by migration 11 once duplicates are resolved)
+    db.users.create_index([("email", ASCENDING)], name="users_email")
+    # Admin user listing and new-user counts
+    db.users.create_index([("created_at", DESCENDING)], name="users_created_at")
+
+    # Dashboard, answer submission and admin progress views
+    db.user_progress.create_index(
+        [("user_id", ASCENDING), ("exam_id", ASCENDING), ("subject_id", ASCENDING)],
+        name="user_progress_user_exam_subject"
+    )
+
+    # Test results time-range lookups and cascade deletes
+    db.user_answers.create_index(
+        [("user_id", ASCENDING), ("answered_at", ASCENDING)],
+        name="user_answers_user_answered_at"
+    )
+    db.user_answers.create_index([("question_id", ASCENDING)], name="user_answers_question")
+
+    # Question listings per subject
+    db.questions.create_index(
+        [("subject_id", ASCENDING), ("created_at", DESCENDING)],
+        name="questions_subject_created_at"
+    )
+
+    # Subject -> exam resolution
+    db.exams.create_index([("subjects._id", ASCENDING)], name="exams_subject_ids")
+
+    # Most recent completed session per user / exam / subject
+    db.test_sessions.create_index(
+        [("user_id", ASCENDING), ("exam_id", ASCENDING), ("subject_id", ASCENDING),
+         ("status", ASCENDING), ("end_time", DESCENDING)],
+        name="test_sessions_user_exam_subject_status_end"
+    )
+
+    # Admin dashboard activity feed
+    db.admin_activity_logs.create_index([("timestamp", DESCENDING)], name="admin_activity_logs_timestamp")
+
+    # Analytics time ranges
+    db.time_series_data.create_index(
+        [("metric_name", ASCENDING), ("timestamp", ASCENDING)],
+        name="time_series_data_metric_timestamp"
+    )
+    db.analytics_metrics.create_index(
+        [("metric_type", ASCENDING), ("date", DESCENDING)],
+        name="analytics_metrics_type_date"
+    )
+
+    # Settings and preferences lookups
+    db.system_settings.create_index([("category", ASCENDING)], name="system_settings_category")
+    db.admin_preferences.create_index([("admin_id", ASCENDING)], name="admin_preferences_admin")
+
+
+@migration(2, "Merge duplicate user_progress documents and make the progress key unique")
+def unique_user_progress(db: Database):
+    # Earlier read-modify-write answer handling could insert the same progress key twice
+    duplicates = db.user_progress.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "exam_id": "$exam_id", "subject_id": "$subject_id"},
+            "ids": {"$push": "$_id"},
+            "questions_solved": {"$sum": {"$ifNull": ["$questions_solved", 0]}},
+            "correct_answers": {"$sum": {"$ifNull": ["$correct_answers", 0]}},
+            "last_studied_date": {"$max": "$last_studied_date"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    for group in duplicates:
+        keep_id, remove_ids = group["ids"][0], group["ids"][1:]
+        solved = group["questions_solved"]
+        correct = group["correct_answers"]
+        db.user_progress.update_one(
+            {"_id": keep_id},
+            {"$set": {
+                "questions_solved": solved,
+                "correct_answers": correct,
+                "accuracy_rate": (correct / solved * 100) if solved > 0 else 0.0,
+                "last_studied_date": group["last_studied_date"]
+            }}
+        )
+        db.user_progress.delete_many({"_id": {"$in": remove_ids}})
+
+    # A unique key lets concurrent upserts of a new progress document converge on one
+    if "user_progress_user_exam_subject" in db.user_progress.index_information():
+        db.user_progress.drop_index("user_progress_user_exam_subject")
+    db.user_progress.create_index(
+        [("user_id", ASCENDING), ("exam_id", ASCENDING), ("subject_id", ASCENDING)],
+        name="user_progress_user_exam_subject_unique",
+        unique=True
+    )
+
+
+@migration(3, "Index user_answers by test session")
+def user_answers_session_index(db: Database):
+    # Test results read a session's answers by session_id instead of a time-range scan
+    db.user_answers.create_index(
+        [("session_id", ASCENDING), ("answered_at", ASCENDING)],
+        name="user_answers_session_answered_at",
+        partialFilterExpression={"session_id": {"$exists": True}}
+    )
+
+
+@migration(4, "Build platform counters for the admin dashboard")
+def build_platform_counters(db: Database):
+    from platform_counters import reconcile_counters
+    reconcile_counters(db)
+
+
+@migration(5, "Keyset pagination indexes for admin listings")
+def keyset_pagination_indexes(db: Database):
+    # Admin listings page on (created_at, _id); the compound keys replace the single-field ones
+    db.users.create_index([("created_at", DESCENDING), ("_id", DESCENDING)], name="users_created_at_id")
+    if "users_created_at" in db.users.index_information():
+        db.users.drop_index("users_created_at")
+
+    db.questions.create_index(
+        [("subject_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="questions_subject_created_at_id"
+    )
+    if "questions_subject_created_at" in db.questions.index_information():
+        db.questions.drop_index("questions_subject_created_at")
+
+
+@migration(6, "Backfill user search tokens and index them")
+def user_search_tokens(db: Database):
+    from user_search import backfill_search_tokens
+    backfill_search_tokens(db)
+    # Admin directory search, sorted like the keyset listing
+    db.users.create_index(
+        [("search_tokens", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="users_search_tokens_created_at_id"
+    )
+
+
+@migration(7, "Indexes for the AI explanation cache")
+def explanation_cache_indexes(db: Database):
+    # Unpinned explanations expire at their expires_at; pinned ones store null and never expire
+    db.ai_explanations.create_index([("expires_at", ASCENDING)], name="ai_explanations_expires_at",
+                                    expireAfterSeconds=0)
+    # Invalidation when a question is edited or deleted
+    db.ai_explanations.create_index([("question_id", ASCENDING)], name="ai_explanations_question")
+    # Least-recently-served eviction
+    db.ai_explanations.create_index([("last_hit_at", ASCENDING)], name="ai_explanations_last_hit_at")
+
+
+@migration(8, "Indexes for offline explanation pre-generation")
+def explanation_pregeneration_indexes(db: Database):
+    # The pre-generation job walks the question bank subject by subject in _id order
+    db.questions.create_index([("subject_id", ASCENDING), ("_id", ASCENDING)], name="questions_subject_id")
+    # Pinned entries are left out of the cache size bound
+    db.ai_explanations.create_index([("pinned", ASCENDING)], name="ai_explanations_pinned")
+
+
+@migration(9, "Expire cross-worker single-flight locks")
+def flight_lock_indexes(db: Database):
+    # Locks carry their own expiry; the TTL index only cleans up ones left by crashed workers
+    db.llm_flight_locks.create_index([("expires_at", ASCENDING)], name="llm_flight_locks_expires_at",
+                                     expireAfterSeconds=0)
+
+
+@migration(10, "Expire idle AI tutor conversations")
+def conversation_indexes(db: Database):
+    db.ai_conversations.create_index([("expires_at", ASCENDING)], name="ai_conversations_expires_at",
+                                     expireAfterSeconds=0)
+
+
+@migration(11, "Make user emails unique")
+def unique_user_emails(db: Database):
+    indexes = db.users.index_information()
+    if "users_email_unique" in indexes:
+        return
+
+    # Legacy databases may hold duplicate accounts; merging them needs a human decision
+    duplicates = list(db.users.aggregate([
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True))
+    if duplicates:
+        for group in duplicates:
+            logger.error(f"❌ Duplicate email {group['_id']!r}: users {[str(user_id) for user_id in group['ids']]}")
+        raise MigrationDeferred(
+            f"{len(duplicates)} emails belong to more than one user; resolve them to make emails unique"
+        )
+
+    if "users_email" in indexes:
+        db.users.drop_index("users_email")
+    db.users.create_index([("email", ASCENDING)], name="users_email_unique", unique=True)
+
+
+@migration(12, "Expire per-day signup counters")
+def signup_counter_expiry_index(db: Database):
+    # Only the per-day signup documents carry expires_at; the platform totals document is kept
+    db.platform_counters.create_index([("expires_at", ASCENDING)], name="platform_counters_expires_at",
+                                      expireAfterSeconds=0)
+    from platform_counters import reconcile_counters
+    reconcile_counters(db)
+
+
+@migration(13, "Drop AI explanations cached under colon-joined keys")
+def drop_legacy_explanation_keys(db: Database):
+    # Keys are now hashes; the old entries are unreachable and pinned ones would never expire
+    db.ai_explanations.delete_many({"_id": {"$regex": ":"}})
+
+
+def get_applied_versions(db: Database) -> List[int]:
+    """Versions already recorded as applied in the migrations collection"""
+    return sorted(doc["_id"] for doc in db[MIGRATIONS_COLLECTION].find({"applied_at": {"$exists": True}}, {"_id": 1}))
+
+
+def get_deferred_versions(db: Database) -> List[int]:
+    """Versions whose last attempt was deferred"""
+    return sorted(doc["_id"] for doc in db[MIGRATIONS_COLLECTION].find(
+        {"applied_at": {"$exists": False}, "deferred_at": {"$exists": True}}, {"_id": 1}
+    ))
+
+
+def run_migrations(db: Database, retry_deferred: bool = True) -> List[int]:
+    """
+    Apply every pending migration in version order
+
+    Args:
+        retry_deferred: Also retry migrations deferred by an earlier run
+            (False at API startup, where they would repeat on every cold start)
+
+    Returns:
+        List of versions applied by this run
+    """
+    applied = set(get_applied_versions(db))
+    deferred = set() if retry_deferred else set(get_deferred_versions(db))
+    newly_applied = []
+
+    for entry in MIGRATIONS:
+        if entry["version"] in applied:
+            continue
+        if entry["version"] in deferred:
+            logger.info(f"Migration {entry['version']} is deferred; run `python migrations.py` to retry it")
+            continue
+
+        logger.info(f"Applying migration {entry['version']}: {entry['description']}")
+        try:
+            entry["apply"](db)
+        except MigrationDeferred as e:
+            logger.warning(f"⚠️ Migration {entry['version']} deferred: {e}")
+            db[MIGRATIONS_COLLECTION].update_one(
+                {"_id": entry["version"]},
+                {"$set": {"description": entry["description"], "deferred_at": datetime.utcnow(),
+                          "deferred_reason": str(e)}},
+                upsert=True
+            )
+            continue
+        db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": entry["version"]},
+            {"$set": {"description": entry["description"], "applied_at": datetime.utcnow()},
+             "$unset": {"deferred_at": "", "deferred_reason": ""}},
+            upsert=True
+        )
+        newly_applied.append(entry["version"])
+        logger.info(f"✅ Migration {entry['version']} applied")
+
+    return newly_applied
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database import create_mongo_client
+
+    mongodb_uri = os.getenv("MONGODB_URI") or os.getenv("MONGODB_URL")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI or MONGODB_URL environment variable is required")
+        sys.exit(1)
+
+    client = create_mongo_client(mongodb_uri, profile="batch")
+    db = client.artori
+
+    if "--status" in sys.argv:
+        applied = set(get_applied_versions(db))
+        deferred = set(get_deferred_versions(db))
+        print("📋 Migration status")
+        for entry in MIGRATIONS:
+            state = "applied" if entry["version"] in applied else "deferred" if entry["version"] in deferred else "pending"
+            print(f"   {entry['version']:>3}  {state:<8} {entry['description']}")
+        return
+
+    newly_applied = run_migrations(db)
+    if newly_applied:
+        print(f"✅ Applied migrations: {newly_applied}")
+    else:
+        print("✅ Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination helpers for the admin listings.
+
+Listings are ordered by `(created_at desc, _id desc)`. A page's
+`next_cursor` is an opaque base64 token that encodes the sort key of its
+last document. The next page filters on that key instead of skipping
+documents, so every page costs the same index seek however deep it is.
+A request pages either by `cursor` or by `skip` offset, never both; in
+cursor mode the `page` number of a listing response is not meaningful.
+
+Total counts can be exact, estimated from collection metadata, or served
+from a short-lived in-process cache, because an exact count of a large
+filtered collection often costs more than the page itself.
+"""
+
+import os
+import json
+import time
+import base64
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+
+# Seconds a cached total count is reused
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("PAGINATION_COUNT_CACHE_TTL_SECONDS", "60"))
+COUNT_CACHE_MAX_ENTRIES = 1000
+
+# Sort order shared by every keyset listing
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+
+class CountMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
+class InvalidPage(ValueError):
+    """Pagination query parameters that cannot be honoured"""
+
+
+class InvalidCursor(InvalidPage):
+    """A `cursor` query parameter that was not produced by `encode_cursor`"""
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past `doc` in keyset order"""
+    created_at = doc.get("created_at")
+    payload = {
+        "c": created_at.isoformat() if created_at else None,
+        "i": str(doc["_id"]),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    """
+    Decode a cursor produced by `encode_cursor`
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, ObjectId(payload["i"])
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def keyset_filter(query_filter: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Combine a listing filter with the 'after cursor' condition"""
+    if not cursor:
+        return query_filter
+
+    created_at, last_id = decode_cursor(cursor)
+    if created_at is None:
+        # Documents without created_at sort last; page through them by _id
+        after = {"created_at": None, "_id": {"$lt": last_id}}
+    else:
+        after = {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+            {"created_at": None},
+        ]}
+
+    if not query_filter:
+        return after
+    return {"$and": [query_filter, after]}
+
+
+async def fetch_page(collection, query_filter: Dict[str, Any], limit: int, skip: int = 0,
+                     cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page in keyset order, after `cursor` or `skip` documents in (not both)
+
+    Returns:
+        (documents, next_cursor), where next_cursor is None on the last page
+    """
+    if cursor and skip:
+        raise InvalidPage("cursor cannot be combined with skip")
+    find_cursor = collection.find(keyset_filter(query_filter, cursor)).sort(KEYSET_SORT)
+    if skip:
+        find_cursor = find_cursor.skip(skip)
+    # One extra document tells whether another page exists
+    docs = await find_cursor.limit(limit + 1).to_list()
+
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+class CountCache:
+    """Short-lived cache of total counts keyed by collection and filter"""
+
+    def __init__(self, ttl_seconds: float = COUNT_CACHE_TTL_SECONDS, max_entries: int = COUNT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+
+    @staticmethod
+    def _key(collection_name: str, query_filter: Dict[str, Any]) -> str:
+        return f"{collection_name}:{json.dumps(query_filter, sort_keys=True, default=str)}"
+
+    async def count(self, collection, query_filter: Dict[str, Any]) -> int:
+        key = self._key(collection.name, query_filter)
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        total = await collection.count_documents(query_filter)
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, total)
+        return total
+
+
+# Global count cache instance
+count_cache = CountCache()
+
+
+async def count_total(collection, query_filter: Dict[str, Any], mode: CountMode) -> int:
+    """Total documents matching `query_filter` using the requested count mode"""
+    if mode == CountMode.ESTIMATED:
+        if not query_filter:
+            return await collection.estimated_document_count()
+        # Metadata counts only cover whole collections
+        return await count_cache.count(collection, query_filter)
+    if mode == CountMode.CACHED:
+        return await count_cache.count(collection, query_filter)
+    return await collection.count_documents(query_filter)
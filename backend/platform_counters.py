@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained platform counters for the admin dashboard.
+
+The `platform_counters` collection holds one `platform` document with
+running totals, plus one `signups:YYYY-MM-DD` document per day. Signup
+documents carry an `expires_at` and are dropped by a TTL index after
+SIGNUP_COUNTER_RETENTION_DAYS. Write paths
+in main.py apply `$inc` deltas as users, answers, exams and questions are
+created or deleted, so the dashboard reads both documents with a single
+query instead of counting whole collections.
+
+The counters, and the signup documents of the retention window, are rebuilt
+from the source collections by `reconcile_counters`, which the API runs
+periodically and which can also be run from cron:
+
+Usage:
+    python platform_counters.py            # recompute and store the counters
+    python platform_counters.py --status   # show stored counters
+"""
+
+import os
+import sys
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "platform_counters"
+PLATFORM_COUNTERS_ID = "platform"
+
+# Totals kept on the platform document
+COUNTER_FIELDS = [
+    "total_users",
+    "active_users",
+    "total_exams",
+    "total_subjects",
+    "total_questions",
+    "total_answers",
+    "correct_answers",
+]
+
+# Seconds between background reconciliations (0 disables the loop)
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("PLATFORM_COUNTERS_RECONCILE_SECONDS", "3600"))
+# Days a per-day signup document is kept and rebuilt by reconciliation
+SIGNUP_COUNTER_RETENTION_DAYS = max(1, int(os.getenv("SIGNUP_COUNTER_RETENTION_DAYS", "30")))
+
+SIGNUP_COUNTER_PREFIX = "signups:"
+
+
+def start_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def signup_counter_id(day: datetime) -> str:
+    """Id of the per-day signup document for the UTC day of `day`"""
+    return f"{SIGNUP_COUNTER_PREFIX}{day.strftime('%Y-%m-%d')}"
+
+
+def signup_counter_expiry(day: datetime) -> datetime:
+    """When the TTL index drops the signup document of `day`"""
+    return start_of_day(day) + timedelta(days=SIGNUP_COUNTER_RETENTION_DAYS)
+
+
+async def increment_counters(db, **deltas: int):
+    """Apply `$inc` deltas to the platform document (db is an AsyncDatabase)"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": PLATFORM_COUNTERS_ID},
+        {"$inc": deltas, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def record_user_created(db, created_at: datetime, active: bool = True):
+    """Count a new user and its signup day"""
+    await increment_counters(db, total_users=1, active_users=1 if active else 0)
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": signup_counter_id(created_at)},
+        {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": signup_counter_expiry(created_at)}},
+        upsert=True
+    )
+
+
+async def record_user_deleted(db, created_at: Optional[datetime], active: bool = True, **deltas: int):
+    """Uncount a deleted user and its signup day, plus any other deltas (e.g. its answers)"""
+    await increment_counters(db, total_users=-1, active_users=-1 if active else 0, **deltas)
+    if created_at:
+        # Days that already expired have no document left to correct
+        await db[COUNTERS_COLLECTION].update_one(
+            {"_id": signup_counter_id(created_at), "count": {"$gt": 0}},
+            {"$inc": {"count": -1}}
+        )
+
+
+async def count_answers(db, query: Dict) -> Dict[str, int]:
+    """Total and correct answers matching `query`, for decrementing before a delete"""
+    result = await db.user_answers.aggregate([
+        {"$match": query},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "correct": {"$sum": {"$cond": ["$is_correct", 1, 0]}}
+        }}
+    ]).to_list()
+    if not result:
+        return {"total": 0, "correct": 0}
+    return {"total": result[0]["total"], "correct": result[0]["correct"]}
+
+
+async def read_counters(db, today: datetime) -> Optional[Dict[str, int]]:
+    """
+    Read the platform totals and today's signups in one query
+
+    Returns:
+        Dict of counters, or None if the counters have never been built
+    """
+    docs = await db[COUNTERS_COLLECTION].find(
+        {"_id": {"$in": [PLATFORM_COUNTERS_ID, signup_counter_id(today)]}}
+    ).to_list()
+    by_id = {doc["_id"]: doc for doc in docs}
+    platform = by_id.get(PLATFORM_COUNTERS_ID)
+    if not platform:
+        return None
+
+    counters = {field: max(platform.get(field, 0), 0) for field in COUNTER_FIELDS}
+    counters["new_users_today"] = by_id.get(signup_counter_id(today), {}).get("count", 0)
+    return counters
+
+
+def compute_counters(db: Database, today: datetime) -> Dict[str, int]:
+    """Count everything from the source collections (db is a pymongo Database)"""
+    counters = {
+        "total_users": db.users.count_documents({}),
+        "active_users": db.users.count_documents({"status": {"$ne": "inactive"}}),
+        "total_exams": db.exams.count_documents({}),
+        "total_questions": db.questions.count_documents({}),
+        "total_answers": db.user_answers.count_documents({}),
+        "correct_answers": db.user_answers.count_documents({"is_correct": True}),
+    }
+    subjects = list(db.exams.aggregate([
+        {"$group": {"_id": None, "count": {"$sum": {"$size": {"$ifNull": ["$subjects", []]}}}}}
+    ]))
+    counters["total_subjects"] = subjects[0]["count"] if subjects else 0
+    counters["new_users_today"] = db.users.count_documents({"created_at": {"$gte": today}})
+    return counters
+
+
+def count_signups(db: Database, since: datetime) -> Dict[str, int]:
+    """Users created per UTC day since `since`, keyed by signup document id"""
+    days = db.users.aggregate([
+        {"$match": {"created_at": {"$gte": since}}},
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}, "count": {"$sum": 1}}}
+    ])
+    return {f"{SIGNUP_COUNTER_PREFIX}{day['_id']}": day["count"] for day in days}
+
+
+def reconcile_counters(db: Database) -> Dict[str, int]:
+    """
+    Recompute the counters and overwrite the stored documents to correct drift
+
+    Every signup document of the retention window is rewritten, and older
+    ones that predate the TTL index are deleted. Writes that land between
+    the counts and the overwrite can still be off by a few until the next run.
+    """
+    today = start_of_day(datetime.utcnow())
+    counters = compute_counters(db, today)
+    now = datetime.utcnow()
+
+    db[COUNTERS_COLLECTION].update_one(
+        {"_id": PLATFORM_COUNTERS_ID},
+        {"$set": {**{field: counters[field] for field in COUNTER_FIELDS},
+                  "updated_at": now, "reconciled_at": now}},
+        upsert=True
+    )
+
+    window_start = today - timedelta(days=SIGNUP_COUNTER_RETENTION_DAYS - 1)
+    signups = count_signups(db, window_start)
+    days = [window_start + timedelta(days=offset) for offset in range(SIGNUP_COUNTER_RETENTION_DAYS)]
+    db[COUNTERS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"_id": signup_counter_id(day)},
+            {"$set": {"count": signups.get(signup_counter_id(day), 0), "expires_at": signup_counter_expiry(day)}},
+            upsert=True
+        )
+        for day in days
+    ], ordered=False)
+    db[COUNTERS_COLLECTION].delete_many({
+        "_id": {"$gte": SIGNUP_COUNTER_PREFIX, "$lt": signup_counter_id(window_start)}
+    })
+    return counters
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database import create_mongo_client
+
+    mongodb_uri = os.getenv("MONGODB_URI") or os.getenv("MONGODB_URL")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI or MONGODB_URL environment variable is required")
+        sys.exit(1)
+
+    client = create_mongo_client(mongodb_uri, profile="batch")
+    db = client.artori
+
+    if "--status" in sys.argv:
+        platform = db[COUNTERS_COLLECTION].find_one({"_id": PLATFORM_COUNTERS_ID})
+        if not platform:
+            print("⚠️ Platform counters have not been built yet")
+            return
+        print("📋 Platform counters")
+        for field in COUNTER_FIELDS:
+            print(f"   {field:<18} {platform.get(field, 0)}")
+        print(f"   reconciled_at      {platform.get('reconciled_at')}")
+        return
+
+    counters = reconcile_counters(db)
+    print("✅ Platform counters reconciled")
+    for field, value in counters.items():
+        print(f"   {field:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
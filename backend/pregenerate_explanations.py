@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Offline pre-generation of AI explanations for the whole question bank.
+
+Walks `questions` subject by subject and generates an explanation for every
+(question, language, selected answer) variant that `get_ai_explanation` can
+be asked for. Results are written to the explanation cache as pinned
+entries under the same key the endpoint looks up, so they are served
+without calling the LLM and never expire. Editing a question still drops
+its entries.
+
+Questions are processed in batches in `(subject_id, _id)` order with a
+bounded number of LLM calls in flight. After each batch the position is
+checkpointed in `explanation_pregeneration_jobs`, so an interrupted run
+resumes where it stopped. Variants already in the cache are skipped, which
+makes `--restart` fill in only what is missing (e.g. after failed calls).
+
+Point OPENAI_BASE_URL at stub_llm_server.py to run it without an API key.
+
+Usage:
+    python pregenerate_explanations.py                      # en/pt/es, every answer variant
+    python pregenerate_explanations.py --languages pt --answers none
+    python pregenerate_explanations.py --concurrency 16 --restart
+    python pregenerate_explanations.py --status
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "explanation_pregeneration_jobs"
+
+DEFAULT_LANGUAGES = ["en", "pt", "es"]
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_CONCURRENCY = 8
+
+# USD per 1K tokens, used for the cost estimate in the report
+PROMPT_PRICE_PER_1K = float(os.getenv("OPENAI_PROMPT_PRICE_PER_1K", "0.0005"))
+COMPLETION_PRICE_PER_1K = float(os.getenv("OPENAI_COMPLETION_PRICE_PER_1K", "0.0015"))
+
+QUESTION_PROJECTION = {
+    "subject_id": 1, "question": 1, "options": 1, "correct_answer": 1, "difficulty": 1
+}
+
+
+def explanation_variants(question: Dict[str, Any], languages: List[str],
+                         answers: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    (language, selected_answer) pairs to generate for one question
+
+    `answers="none"` covers only the generic explanation; `"all"` also covers
+    each option a student can select.
+    """
+    selected_answers: List[Optional[str]] = [None]
+    if answers == "all":
+        selected_answers += [option["id"] for option in question.get("options", [])]
+    return [(language, selected) for language in languages for selected in selected_answers]
+
+
+def pregeneration_job_id(model: str, prompt_version: Any, languages: List[str], answers: str) -> str:
+    """Checkpoint id; a new model, prompt or variant set starts a fresh walk"""
+    return f"{model}:v{prompt_version}:{','.join(sorted(languages))}:{answers}"
+
+
+def resume_filter(checkpoint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Questions after the checkpointed one in (subject_id, _id) order"""
+    if not checkpoint:
+        return {}
+    return {"$or": [
+        {"subject_id": {"$gt": checkpoint["subject_id"]}},
+        {"subject_id": checkpoint["subject_id"], "_id": {"$gt": checkpoint["question_id"]}},
+    ]}
+
+
+async def pregenerate_explanations(db, service, languages: List[str], answers: str = "all",
+                                   concurrency: int = DEFAULT_CONCURRENCY,
+                                   batch_size: int = DEFAULT_BATCH_SIZE,
+                                   restart: bool = False) -> Dict[str, Any]:
+    """
+    Generate and pin explanations for every question (db is an AsyncDatabase)
+
+    Returns:
+        Report with counts, elapsed time, throughput, token usage and cost
+    """
+    from catalog_cache import catalog_cache
+    from explanation_cache import EXPLANATION_CACHE_COLLECTION, explanation_cache, explanation_cache_key
+
+    model, prompt_version = service.model, service.explanation_prompt_version
+    job_id = pregeneration_job_id(model, prompt_version, languages, answers)
+    job = None if restart else await db[JOBS_COLLECTION].find_one({"_id": job_id})
+    checkpoint = job.get("checkpoint") if job else None
+
+    report = {
+        "job_id": job_id,
+        "resumed": checkpoint is not None,
+        "questions": 0,
+        "generated": 0,
+        "skipped": 0,
+        "failed": 0,
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+    prompt_tokens_before, completion_tokens_before = service.prompt_tokens, service.completion_tokens
+    subject_names: Dict[Any, str] = {}
+    started = time.perf_counter()
+
+    async def subject_name(subject_id) -> str:
+        if subject_id not in subject_names:
+            exam, subject = await catalog_cache.get_subject(db, subject_id)
+            subject_names[subject_id] = subject["name"] if subject else "General"
+        return subject_names[subject_id]
+
+    async def generate(question: Dict[str, Any], language: str, selected_answer: Optional[str]):
+        async with semaphore:
+            explanation = await service.generate_explanation(
+                question=question["question"],
+                options=question["options"],
+                correct_answer=question["correct_answer"],
+                selected_answer=selected_answer,
+                subject=await subject_name(question["subject_id"]),
+                difficulty=question.get("difficulty", "medium"),
+                language=language
+            )
+        if explanation.get("fallback"):
+            report["failed"] += 1
+            return
+        await explanation_cache.put(
+            db, question["_id"], selected_answer, language, model, prompt_version, explanation, pinned=True
+        )
+        report["generated"] += 1
+
+    while True:
+        batch = await (db.questions.find(resume_filter(checkpoint), QUESTION_PROJECTION)
+                       .sort([("subject_id", 1), ("_id", 1)])
+                       .limit(batch_size)
+                       .to_list())
+        if not batch:
+            break
+
+        # Skip variants a previous run (or a live request) already cached
+        wanted = {
+            explanation_cache_key(question["_id"], selected, language, model, prompt_version): (question, language, selected)
+            for question in batch
+            for language, selected in explanation_variants(question, languages, answers)
+        }
+        cached = await db[EXPLANATION_CACHE_COLLECTION].find(
+            {"_id": {"$in": list(wanted)}}, {"_id": 1}
+        ).to_list()
+        for entry in cached:
+            wanted.pop(entry["_id"], None)
+        report["skipped"] += len(cached)
+
+        await asyncio.gather(*(generate(*variant) for variant in wanted.values()))
+
+        report["questions"] += len(batch)
+        checkpoint = {"subject_id": batch[-1]["subject_id"], "question_id": batch[-1]["_id"]}
+        await db[JOBS_COLLECTION].update_one(
+            {"_id": job_id},
+            {
+                "$set": {"checkpoint": checkpoint, "completed": False, "updated_at": datetime.utcnow()},
+                "$setOnInsert": {"started_at": datetime.utcnow()},
+            },
+            upsert=True
+        )
+        logger.info(f"Pre-generated explanations for {report['questions']} questions "
+                    f"({report['generated']} generated, {report['skipped']} cached, {report['failed']} failed)")
+
+    await db[JOBS_COLLECTION].update_one(
+        {"_id": job_id},
+        {"$set": {"completed": True, "completed_at": datetime.utcnow(), "last_report": dict(report)}},
+        upsert=True
+    )
+
+    elapsed = time.perf_counter() - started
+    prompt_tokens = service.prompt_tokens - prompt_tokens_before
+    completion_tokens = service.completion_tokens - completion_tokens_before
+    report.update({
+        "elapsed_seconds": round(elapsed, 2),
+        "explanations_per_second": round(report["generated"] / elapsed, 2) if elapsed else 0.0,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "estimated_cost_usd": round(
+            prompt_tokens / 1000 * PROMPT_PRICE_PER_1K + completion_tokens / 1000 * COMPLETION_PRICE_PER_1K, 4
+        ),
+    })
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"✅ Explanation pre-generation finished ({report['job_id']})")
+    for field, value in report.items():
+        if field != "job_id":
+            print(f"   {field:<24} {value}")
+    if report["failed"]:
+        print("⚠️ Some explanations failed; run again with --restart to fill in only the missing ones")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate AI explanations for the whole question bank")
+    parser.add_argument("--languages", default=",".join(DEFAULT_LANGUAGES), help="Comma-separated language codes")
+    parser.add_argument("--answers", choices=["all", "none"], default="all",
+                        help="'all' also covers every selectable answer, 'none' only the generic explanation")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="LLM calls in flight")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Questions per checkpoint")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and walk every question again")
+    parser.add_argument("--status", action="store_true", help="Show stored pre-generation jobs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # AIService reads its concurrency cap at import time
+    os.environ["OPENAI_MAX_CONCURRENCY"] = str(args.concurrency)
+    from database import AsyncDatabase, create_mongo_client
+    from migrations import run_migrations
+
+    mongodb_uri = os.getenv("MONGODB_URI") or os.getenv("MONGODB_URL")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI or MONGODB_URL environment variable is required")
+        sys.exit(1)
+
+    client = create_mongo_client(mongodb_uri, profile="batch")
+
+    if args.status:
+        jobs = list(client.artori[JOBS_COLLECTION].find())
+        if not jobs:
+            print("⚠️ No pre-generation jobs have run yet")
+            return
+        print("📋 Explanation pre-generation jobs")
+        for job in jobs:
+            state = "completed" if job.get("completed") else "in progress"
+            print(f"   {job['_id']:<40} {state:<12} updated {job.get('updated_at')}")
+        return
+
+    from ai_service import ai_service
+    if not ai_service.is_available():
+        print("❌ OPENAI_API_KEY is required (set OPENAI_BASE_URL to use the local stub)")
+        sys.exit(1)
+
+    run_migrations(client.artori)
+    db = AsyncDatabase(client.artori)
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    report = asyncio.run(pregenerate_explanations(
+        db, ai_service, languages,
+        answers=args.answers,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        restart=args.restart
+    ))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Short-lived cache of authenticated principals.
+
+`get_current_user` resolves the JWT subject to a user document on every
+request. This module keeps recently resolved users in a bounded LRU keyed
+by the token's `(sub, iat)` pair, so a fresh login never reuses an entry
+from an older token. Entries expire after a short TTL.
+
+Handlers that change a user's role, status, exam selection or profile
+call `invalidate(user_id)`. A global version counter stops a lookup that
+started before an invalidation from caching the old document.
+Invalidation is per process; other workers converge within the TTL.
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds a resolved principal is reused
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+# Maximum number of cached principals before LRU eviction
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+PrincipalKey = Tuple[str, Optional[int]]
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS,
+                 max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: "OrderedDict[PrincipalKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: PrincipalKey) -> Optional[Dict[str, Any]]:
+        """Cached user document for a token, or None"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Handlers get their own copy so they cannot alter the cached document
+        return dict(entry[1])
+
+    def put(self, key: PrincipalKey, user: Dict[str, Any], version: int):
+        """Cache a user loaded while the cache was at `version`"""
+        if self.ttl_seconds <= 0 or version != self.version:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: Any):
+        """Drop every cached token of a user after their document changed"""
+        user_id = str(user_id)
+        self.version += 1
+        self.invalidations += 1
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    def clear(self):
+        """Drop every cached principal"""
+        self.version += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate and size metrics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
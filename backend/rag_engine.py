@@ -0,0 +1,123 @@
+"""
+Direct retrieval engine for RAG queries.
+
+Instead of a LangChain vectorstore wrapper and a "stuff" QA chain on the
+legacy completion model, `DirectRetrievalEngine` queries the Chroma
+collection itself with precomputed (and cached) query embeddings, fills the
+prompt template itself and calls the configured `LLMProvider`. No LangChain
+objects are created per query, several questions can be searched in one
+Chroma call, and the distances Chroma returns are passed on to the caller.
+"""
+
+import os
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from llm_provider import LLMProvider
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+RAG_MAX_TOKENS = int(os.getenv("RAG_MAX_TOKENS", "500"))
+RAG_TEMPERATURE = 0.7
+
+# Prompt for educational answers grounded in the retrieved chunks
+RAG_PROMPT_TEMPLATE = """You are an expert educational AI tutor. Use the following context to answer the student's question.
+
+                Context: {context}
+
+                Question: {question}
+
+                Instructions:
+                - Provide a clear, educational answer based on the context
+                - If the context doesn't contain enough information, say so clearly
+                - Include specific references to the source material when possible
+                - Keep the answer appropriate for educational purposes
+                - Be encouraging and supportive in your tone
+
+                Answer:"""
+
+
+@dataclass
+class RetrievedChunk:
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Chroma distance to the query (lower is closer); None when the source does not report it
+    distance: Optional[float] = None
+
+
+class DirectRetrievalEngine:
+    def __init__(self, client: Any, embeddings: Any, provider: Optional[LLMProvider],
+                 prompt_template: str = RAG_PROMPT_TEMPLATE):
+        """
+        Args:
+            client: ChromaDB client
+            embeddings: CachedEmbeddings used for the query vectors
+            provider: LLM provider answering the prompts (None: retrieval only)
+        """
+        self.client = client
+        self.embeddings = embeddings
+        self.provider = provider
+        self.prompt_template = prompt_template
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, name: str):
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = self.client.get_collection(name)
+                    self._collections[name] = collection
+        return collection
+
+    def search(self, collection_name: str, query_embeddings: List[List[float]], k: int,
+               where: Optional[Dict[str, Any]] = None) -> List[List[RetrievedChunk]]:
+        """Top-k chunks for each query vector, in one Chroma call"""
+        try:
+            results = self._collection(collection_name).query(
+                query_embeddings=query_embeddings,
+                n_results=k,
+                where=where or None,
+                include=["documents", "metadatas", "distances"]
+            )
+        except Exception:
+            # The collection may have been dropped and recreated; fetch a fresh handle next time
+            self._collections.pop(collection_name, None)
+            raise
+        return [
+            [
+                RetrievedChunk(text=text, metadata=metadata or {}, distance=distance)
+                for text, metadata, distance in zip(documents, metadatas, distances)
+            ]
+            for documents, metadatas, distances in zip(
+                results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
+
+    def retrieve(self, collection_name: str, questions: List[str], k: int,
+                 content_language: Optional[str] = None) -> List[List[RetrievedChunk]]:
+        """Embed the questions in one pass and search them together"""
+        query_embeddings = self.embeddings.embed_queries(questions)
+        where = {"content_language": content_language} if content_language else None
+        return self.search(collection_name, query_embeddings, k, where)
+
+    def build_messages(self, question: str, chunks: List[RetrievedChunk]) -> List[Dict[str, str]]:
+        context = "\n\n".join(chunk.text for chunk in chunks)
+        return [{"role": "user", "content": self.prompt_template.format(context=context, question=question)}]
+
+    def answer(self, question: str, chunks: List[RetrievedChunk]) -> str:
+        """Answer from the retrieved chunks (blocking, for query threads)"""
+        return self.provider.complete_blocking(
+            self.build_messages(question, chunks), max_tokens=RAG_MAX_TOKENS, temperature=RAG_TEMPERATURE
+        ).content
+
+    async def aanswer(self, question: str, chunks: List[RetrievedChunk]) -> str:
+        """Answer from the retrieved chunks on the event loop"""
+        completion = await self.provider.complete(
+            self.build_messages(question, chunks), max_tokens=RAG_MAX_TOKENS, temperature=RAG_TEMPERATURE
+        )
+        return completion.content
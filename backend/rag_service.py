@@ -1,18 +1,26 @@
 import os
+import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from pathlib import Path
-import chromadb
-from chromadb.config import Settings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import SentenceTransformerEmbeddings
-from langchain.vectorstores import Chroma
-from langchain.llms import OpenAI
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.schema import Document
 from dotenv import load_dotenv
 import json
+from llm_provider import LLM_PROVIDER, StubProvider, create_llm_provider, is_llm_configured, openai_settings
+from embedding_cache import CachedEmbeddings, embedding_cache
+from rag_engine import RAG_MAX_TOKENS, RAG_PROMPT_TEMPLATE, RAG_TEMPERATURE, DirectRetrievalEngine, RetrievedChunk
+
+# chromadb, LangChain and the embedding model are imported and loaded on first
+# use (or by the background warm-up), so importing this module stays cheap
+if TYPE_CHECKING:
+    from langchain.chains.combine_documents.base import BaseCombineDocumentsChain
+    from langchain.llms.base import LLM
+    from langchain.schema import Document
+    from langchain.schema.language_model import BaseLanguageModel
+    from langchain.vectorstores import Chroma
 
 # Load environment variables
 load_dotenv()
@@ -20,34 +28,157 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+# Seconds before a failed initialization is attempted again
+RAG_INIT_RETRY_SECONDS = float(os.getenv("RAG_INIT_RETRY_SECONDS", "60"))
+# Seconds the per-subject availability registry (built from the Chroma collection list) is trusted
+RAG_AVAILABILITY_REFRESH_SECONDS = float(os.getenv("RAG_AVAILABILITY_REFRESH_SECONDS", "300"))
+# Threads running RAG queries (embedding, vector search and the blocking LLM call) for async callers
+RAG_QUERY_WORKERS = int(os.getenv("RAG_QUERY_WORKERS", "8"))
+# LLM calls a batch query runs at the same time
+RAG_BATCH_LLM_CONCURRENCY = int(os.getenv("RAG_BATCH_LLM_CONCURRENCY", "4"))
+
+# "direct": query Chroma and the LLM provider directly; "chain": LangChain vectorstore and QA chain
+RAG_ENGINE = os.getenv("RAG_ENGINE", "direct")
+
+_stub_llm_class = None
+
+def _stub_langchain_llm(provider: StubProvider) -> "LLM":
+    """LangChain adapter answering through the offline stub provider"""
+    global _stub_llm_class
+    if _stub_llm_class is None:
+        from langchain.llms.base import LLM
+        
+        class StubLangChainLLM(LLM):
+            provider: Any
+            
+            @property
+            def _llm_type(self) -> str:
+                return "artori-stub"
+            
+            def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+                return self.provider.complete_blocking(
+                    [{"role": "user", "content": prompt}], max_tokens=RAG_MAX_TOKENS, temperature=RAG_TEMPERATURE
+                ).content
+        
+        _stub_llm_class = StubLangChainLLM
+    return _stub_llm_class(provider=provider)
+
 class RAGService:
     """RAG service for retrieval-augmented generation using LangChain and ChromaDB"""
     
     def __init__(self, persist_directory: str = "./chroma_db"):
         """
-        Initialize the RAG service
+        Create the RAG service without loading anything
+        
+        The embedding model and the ChromaDB client are initialized on first use
+        or by `start_warm_up()`; `status()` reports the readiness state.
         
         Args:
             persist_directory: Directory to persist ChromaDB data (used only for local development)
         """
         self.persist_directory = persist_directory
         self.embeddings = None
+        self.query_embeddings = None  # self.embeddings behind the query embedding cache
         self.vectorstores = {}  # Dictionary to store subject-specific vectorstores
-        self.qa_chains = {}     # Dictionary to store subject-specific QA chains
+        self.answer_chains = {} # Dictionary to store subject-specific answer chains (no retriever state)
         self.client = None
+        self.engine = None      # DirectRetrievalEngine, created on first use
         self.default_collection = "artori"  # Default collection name
         
-        # Initialize components
-        self._initialize_embeddings()
-        self._initialize_client()
+        # Readiness: cold -> warming -> ready, or failed (retried after RAG_INIT_RETRY_SECONDS)
+        self.state = "cold"
+        self.init_error = None
+        self.init_seconds = None
+        self._failed_at = 0.0
+        self._init_lock = threading.Lock()
+        self._warm_up_thread = None
+        self._components_lock = threading.Lock()
+        self._query_executor = None
+        
+        # Availability registry: collections that exist, refreshed from Chroma every
+        # RAG_AVAILABILITY_REFRESH_SECONDS; subjects missing from it are answered
+        # negatively from the cache until the next refresh. It is filled during
+        # initialization and later refreshed in a background thread, so checks
+        # on the request path never wait on Chroma
+        self._collections = set()
+        self._collections_refreshed_at = None
+        self._availability_lock = threading.Lock()
+        self._refresh_thread = None
+        self.availability_checks = 0
+        self.availability_refreshes = 0
+    
+    def _ensure_initialized(self) -> bool:
+        """Load the embedding model and connect to ChromaDB once (blocking)"""
+        if self.state == "ready":
+            return True
+        with self._init_lock:
+            if self.state == "ready":
+                return True
+            if self.state == "failed" and time.monotonic() - self._failed_at < RAG_INIT_RETRY_SECONDS:
+                return False
+            
+            self.state = "warming"
+            started = time.perf_counter()
+            try:
+                self._initialize_embeddings()
+                self._initialize_client()
+                with self._availability_lock:
+                    self._refresh_availability_locked()
+            except Exception as e:
+                self.state = "failed"
+                self.init_error = str(e)
+                self._failed_at = time.monotonic()
+                return False
+            
+            self.init_seconds = round(time.perf_counter() - started, 2)
+            self.init_error = None
+            self.state = "ready"
+            logger.info(f"✅ RAG service ready in {self.init_seconds}s")
+            return True
+    
+    def warm_up(self) -> bool:
+        """Initialize and run one embedding so the first real query does not pay for it"""
+        if not self._ensure_initialized():
+            return False
+        try:
+            self.embeddings.embed_query("warm-up")
+        except Exception as e:
+            logger.warning(f"⚠️ RAG warm-up embedding failed: {e}")
+        return True
+    
+    def start_warm_up(self):
+        """Warm up in a background thread unless that is already done or under way"""
+        if self.state == "ready" or (self._warm_up_thread and self._warm_up_thread.is_alive()):
+            return
+        self._warm_up_thread = threading.Thread(target=self.warm_up, name="rag-warm-up", daemon=True)
+        self._warm_up_thread.start()
+    
+    def is_ready(self) -> bool:
+        """Whether the model and client are loaded (never blocks)"""
+        return self.state == "ready"
+    
+    def status(self) -> Dict[str, Any]:
+        """Readiness state for health and metrics endpoints"""
+        return {
+            "state": self.state,
+            "init_seconds": self.init_seconds,
+            "error": self.init_error,
+            "embedding_model": EMBEDDING_MODEL_NAME,
+            "embedding_cache": embedding_cache.stats(),
+            "availability": self.availability_stats(),
+        }
         
     def _initialize_embeddings(self):
         """Initialize the embedding model for multilingual support"""
         try:
+            from langchain.embeddings import SentenceTransformerEmbeddings
+            
             # Use a multilingual sentence transformer model
             self.embeddings = SentenceTransformerEmbeddings(
-                model_name="paraphrase-multilingual-MiniLM-L12-v2"
+                model_name=EMBEDDING_MODEL_NAME
             )
+            self.query_embeddings = CachedEmbeddings(self.embeddings, EMBEDDING_MODEL_NAME, embedding_cache)
             logger.info("✅ Multilingual embeddings initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize embeddings: {e}")
@@ -56,6 +187,9 @@ class RAGService:
     def _initialize_client(self):
         """Initialize ChromaDB client"""
         try:
+            import chromadb
+            from chromadb.config import Settings
+            
             # Check if we should use ChromaDB Cloud
             chroma_api_key = os.getenv("CHROMA_API_KEY")
             chroma_tenant = os.getenv("CHROMA_TENANT")
@@ -100,116 +234,173 @@ class RAGService:
             return f"artori_{normalized_subject}"
         return self.default_collection
     
-    def _get_vectorstore(self, subject: str = None) -> Optional[Chroma]:
+    def _get_vectorstore(self, subject: str = None) -> Optional["Chroma"]:
         """Get or create vectorstore for a subject"""
         collection_name = self._get_collection_name(subject)
         
         if collection_name not in self.vectorstores:
-            try:
-                # Check if we're using cloud or local
-                chroma_api_key = os.getenv("CHROMA_API_KEY")
+            if not self._ensure_initialized():
+                return None
+            with self._components_lock:
+                if collection_name in self.vectorstores:
+                    return self.vectorstores[collection_name]
+                try:
+                    from langchain.vectorstores import Chroma
                 
-                if chroma_api_key:
-                    # Cloud: no persist_directory
-                    vectorstore = Chroma(
-                        client=self.client,
-                        collection_name=collection_name,
-                        embedding_function=self.embeddings
-                    )
-                else:
-                    # Local: with persist_directory
-                    vectorstore = Chroma(
-                        client=self.client,
-                        collection_name=collection_name,
-                        embedding_function=self.embeddings,
-                        persist_directory=self.persist_directory
-                    )
+                    # Check if we're using cloud or local
+                    chroma_api_key = os.getenv("CHROMA_API_KEY")
                 
-                self.vectorstores[collection_name] = vectorstore
-                logger.info(f"✅ Vectorstore for collection '{collection_name}' initialized")
+                    if chroma_api_key:
+                        # Cloud: no persist_directory
+                        vectorstore = Chroma(
+                            client=self.client,
+                            collection_name=collection_name,
+                            embedding_function=self.query_embeddings
+                        )
+                    else:
+                        # Local: with persist_directory
+                        vectorstore = Chroma(
+                            client=self.client,
+                            collection_name=collection_name,
+                            embedding_function=self.query_embeddings,
+                            persist_directory=self.persist_directory
+                        )
                 
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize vectorstore for collection '{collection_name}': {e}")
-                return None
+                    self.vectorstores[collection_name] = vectorstore
+                    logger.info(f"✅ Vectorstore for collection '{collection_name}' initialized")
+                
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize vectorstore for collection '{collection_name}': {e}")
+                    return None
         
         return self.vectorstores[collection_name]
     
-    def _get_qa_chain(self, subject: str = None) -> Optional[RetrievalQA]:
-        """Get or create QA chain for a subject"""
+    def _create_llm(self) -> Optional["BaseLanguageModel"]:
+        """
+        Model for the QA chains: the offline stub when LLM_PROVIDER=stub,
+        otherwise the same OpenAI chat model and endpoint as the provider
+        """
+        if LLM_PROVIDER == "stub":
+            return _stub_langchain_llm(create_llm_provider("stub"))
+        settings = openai_settings()
+        if not settings["api_key"]:
+            return None
+        from langchain.chat_models import ChatOpenAI
+        return ChatOpenAI(
+            openai_api_key=settings["api_key"],
+            model_name=settings["model"],
+            openai_api_base=settings["base_url"],
+            temperature=RAG_TEMPERATURE,
+            max_tokens=RAG_MAX_TOKENS
+        )
+    
+    def _get_answer_chain(self, subject: str = None) -> Optional["BaseCombineDocumentsChain"]:
+        """
+        Get or create the chain that answers from already retrieved documents
+        
+        Retrieval is not part of the chain, so nothing in it depends on the
+        request and it can be shared by concurrent queries.
+        """
         collection_name = self._get_collection_name(subject)
         
-        if collection_name not in self.qa_chains:
-            try:
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    logger.warning("⚠️ OPENAI_API_KEY not found, QA chain will not be available")
-                    return None
-                
-                vectorstore = self._get_vectorstore(subject)
-                if not vectorstore:
+        if collection_name not in self.answer_chains:
+            with self._components_lock:
+                if collection_name in self.answer_chains:
+                    return self.answer_chains[collection_name]
+                try:
+                    from langchain.chains.question_answering import load_qa_chain
+                    from langchain.prompts import PromptTemplate
+                    
+                    llm = self._create_llm()
+                    if llm is None:
+                        logger.warning("⚠️ OPENAI_API_KEY not found, QA chain will not be available")
+                        return None
+                    
+                    PROMPT = PromptTemplate(
+                        template=RAG_PROMPT_TEMPLATE,
+                        input_variables=["context", "question"]
+                    )
+                    
+                    # "Stuff" all retrieved chunks into the prompt
+                    self.answer_chains[collection_name] = load_qa_chain(llm, chain_type="stuff", prompt=PROMPT)
+                    logger.info(f"✅ QA chain for collection '{collection_name}' initialized")
+                    
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize QA chain for collection '{collection_name}': {e}")
                     return None
-                
-                # Initialize OpenAI LLM
-                llm = OpenAI(
-                    openai_api_key=api_key,
-                    temperature=0.7,
-                    max_tokens=500
-                )
-                
-                # Create custom prompt template for educational content
-                prompt_template = """You are an expert educational AI tutor. Use the following context to answer the student's question.
-                
-                Context: {context}
-                
-                Question: {question}
-                
-                Instructions:
-                - Provide a clear, educational answer based on the context
-                - If the context doesn't contain enough information, say so clearly
-                - Include specific references to the source material when possible
-                - Keep the answer appropriate for educational purposes
-                - Be encouraging and supportive in your tone
-                
-                Answer:"""
-                
-                PROMPT = PromptTemplate(
-                    template=prompt_template,
-                    input_variables=["context", "question"]
-                )
-                
-                # Create retrieval QA chain
-                qa_chain = RetrievalQA.from_chain_type(
-                    llm=llm,
-                    chain_type="stuff",
-                    retriever=vectorstore.as_retriever(
-                        search_type="similarity",
-                        search_kwargs={"k": 4}  # Retrieve top 4 most relevant chunks
-                    ),
-                    chain_type_kwargs={"prompt": PROMPT},
-                    return_source_documents=True
-                )
-                
-                self.qa_chains[collection_name] = qa_chain
-                logger.info(f"✅ QA chain for collection '{collection_name}' initialized")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize QA chain for collection '{collection_name}': {e}")
-                return None
         
-        return self.qa_chains[collection_name]
+        return self.answer_chains[collection_name]
     
-    def is_available(self, subject: str = None) -> bool:
-        """Check if RAG service is available for a subject"""
-        if self.embeddings is None or self.client is None:
+    @staticmethod
+    def _collection_names(collections) -> List[str]:
+        # chromadb returns Collection objects (names only in 0.6)
+        return [getattr(collection, "name", collection) for collection in collections]
+    
+    def refresh_availability(self) -> bool:
+        """Rebuild the availability registry from the collections in Chroma"""
+        if not self._ensure_initialized():
             return False
+        with self._availability_lock:
+            return self._refresh_availability_locked()
+    
+    def _refresh_availability_locked(self) -> bool:
+        # A failed listing is not retried before the next interval either
+        self._collections_refreshed_at = time.monotonic()
+        self.availability_refreshes += 1
+        try:
+            self._collections = set(self._collection_names(self.client.list_collections()))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to list ChromaDB collections: {e}")
+            return False
+        logger.info(f"📚 RAG collections available: {sorted(self._collections)}")
+        return True
+    
+    def _known_collections(self) -> set:
+        """Registry contents; once per interval a background refresh is started"""
+        refreshed_at = self._collections_refreshed_at
+        if refreshed_at is None or time.monotonic() - refreshed_at >= RAG_AVAILABILITY_REFRESH_SECONDS:
+            self._start_refresh()
+        return self._collections
+    
+    def _start_refresh(self):
+        """List the collections in a background thread unless a refresh is under way"""
+        with self._availability_lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh_availability, name="rag-availability",
+                                                    daemon=True)
+            self._refresh_thread.start()
+    
+    def _is_llm_configured(self) -> bool:
+        # Checks the settings only; building a provider would create an API client per call
+        return is_llm_configured()
+    
+    def is_available(self, subject: str = None) -> bool:
+        """
+        Check if RAG service is available for a subject
         
-        # For basic availability, just check if we can create a vectorstore
-        vectorstore = self._get_vectorstore(subject)
-        qa_chain = self._get_qa_chain(subject)
-        
-        return vectorstore is not None and qa_chain is not None
+        Served from the availability registry: no LangChain objects are built,
+        and Chroma is only listed in a background thread, at most once per
+        refresh interval, so the check never blocks the event loop.
+        """
+        if not self._ensure_initialized():
+            return False
+        self.availability_checks += 1
+        if not self._is_llm_configured():
+            return False
+        return self._get_collection_name(subject) in self._known_collections()
+    
+    def availability_stats(self) -> Dict[str, Any]:
+        refreshed_at = self._collections_refreshed_at
+        return {
+            "collections": sorted(self._collections),
+            "checks": self.availability_checks,
+            "refreshes": self.availability_refreshes,
+            "refreshed_seconds_ago": round(time.monotonic() - refreshed_at, 1) if refreshed_at is not None else None,
+            "refresh_interval_seconds": RAG_AVAILABILITY_REFRESH_SECONDS,
+        }
     
-    def add_documents(self, documents: List[Document], subject: str = None) -> bool:
+    def add_documents(self, documents: List["Document"], subject: str = None) -> bool:
         """
         Add documents to the vectorstore for a specific subject
         
@@ -230,6 +421,8 @@ class RAGService:
                 logger.error(f"Failed to get vectorstore for subject: {subject}")
                 return False
             
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            
             # Split documents into chunks
             text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=1000,
@@ -243,6 +436,8 @@ class RAGService:
             vectorstore.add_documents(split_docs)
             
             collection_name = self._get_collection_name(subject)
+            with self._availability_lock:
+                self._collections.add(collection_name)
             logger.info(f"✅ Added {len(split_docs)} document chunks to collection '{collection_name}'")
             return True
             
@@ -275,47 +470,13 @@ class RAGService:
             return self._get_fallback_response(question, interface_language)
         
         try:
-            qa_chain = self._get_qa_chain(subject)
-            if not qa_chain:
-                return self._get_fallback_response(question, interface_language)
-            
-            # Update retriever with current parameters
-            qa_chain.retriever.search_kwargs["k"] = max_results
-            
-            # Add content language filter if needed
-            filter_dict = {}
-            if content_language:
-                filter_dict["content_language"] = content_language
-            
-            if filter_dict:
-                qa_chain.retriever.search_kwargs["filter"] = filter_dict
-            
-            # Query the chain
-            result = qa_chain({"query": question})
-            
-            # Extract answer and sources
-            answer = result["result"]
-            source_documents = result.get("source_documents", [])
-            
-            # Format sources for explainability
-            sources = []
-            for doc in source_documents:
-                source_info = {
-                    "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                    "metadata": doc.metadata,
-                    "similarity_score": getattr(doc, 'similarity_score', None)
-                }
-                sources.append(source_info)
-            
-            response = {
-                "answer": answer,
-                "sources": sources,
-                "confidence": self._calculate_confidence(sources),
-                "interface_language": interface_language,
-                "content_language": content_language,
-                "subject": subject,
-                "retrieved_chunks": len(source_documents)
-            }
+            if RAG_ENGINE == "chain":
+                chunks, answer = self._query_chain(question, subject, max_results, content_language)
+            else:
+                engine = self._get_engine()
+                chunks = engine.retrieve(self._get_collection_name(subject), [question], max_results, content_language)[0]
+                answer = engine.answer(question, chunks)
+            response = self._answer_response(question, answer, chunks, interface_language, content_language, subject)
             
             collection_name = self._get_collection_name(subject)
             logger.info(f"✅ RAG query processed successfully for collection '{collection_name}' with interface language: {interface_language}")
@@ -325,6 +486,188 @@ class RAGService:
             logger.error(f"❌ Failed to process RAG query for subject '{subject}': {e}")
             return self._get_fallback_response(question, interface_language)
     
+    def _get_engine(self) -> DirectRetrievalEngine:
+        if self.engine is None:
+            with self._components_lock:
+                if self.engine is None:
+                    self.engine = DirectRetrievalEngine(self.client, self.query_embeddings, create_llm_provider())
+        return self.engine
+    
+    def _query_chain(self, question: str, subject: Optional[str], k: int,
+                     content_language: Optional[str]) -> tuple:
+        """Retrieve and answer through the LangChain vectorstore and QA chain (RAG_ENGINE=chain)"""
+        vectorstore = self._get_vectorstore(subject)
+        answer_chain = self._get_answer_chain(subject)
+        if not vectorstore or not answer_chain:
+            return [], None
+        
+        # k and the filter belong to this request only; no shared retriever is mutated
+        filter_dict = {"content_language": content_language} if content_language else None
+        documents = vectorstore.similarity_search(question, k=k, filter=filter_dict)
+        answer = answer_chain.run(input_documents=documents, question=question)
+        return [RetrievedChunk(text=doc.page_content, metadata=doc.metadata) for doc in documents], answer
+    
+    def _retrieve_chain(self, subject: Optional[str], questions: List[str], k: int,
+                        content_language: Optional[str]) -> Optional[List[List[RetrievedChunk]]]:
+        """Top-k chunks per question from the LangChain vectorstore (RAG_ENGINE=chain batches)"""
+        vectorstore = self._get_vectorstore(subject)
+        if not vectorstore or not self._get_answer_chain(subject):
+            return None
+        
+        # One embedding pass for the batch, then one vectorstore search per question
+        filter_dict = {"content_language": content_language} if content_language else None
+        return [
+            [
+                RetrievedChunk(text=doc.page_content, metadata=doc.metadata, distance=distance)
+                for doc, distance in vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    embedding, k=k, filter=filter_dict
+                )
+            ]
+            for embedding in self.query_embeddings.embed_queries(questions)
+        ]
+    
+    def _answer_chunks(self, subject: Optional[str], question: str, chunks: List[RetrievedChunk]) -> str:
+        """Answer from chunks that were already retrieved, with the configured engine"""
+        if RAG_ENGINE == "chain":
+            from langchain.schema import Document
+            
+            documents = [Document(page_content=chunk.text, metadata=chunk.metadata) for chunk in chunks]
+            return self._get_answer_chain(subject).run(input_documents=documents, question=question)
+        return self._get_engine().answer(question, chunks)
+    
+    def _answer_response(self, question: str, answer: Optional[str], chunks: List[RetrievedChunk],
+                         interface_language: str, content_language: Optional[str],
+                         subject: Optional[str]) -> Dict[str, Any]:
+        """Response for a generated answer, or the fallback when the LLM returned nothing"""
+        if not answer:
+            return self._get_fallback_response(question, interface_language)
+        return self._build_response(answer, chunks, interface_language, content_language, subject)
+    
+    def _build_response(self, answer: str, chunks: List[RetrievedChunk], interface_language: str,
+                        content_language: Optional[str], subject: Optional[str]) -> Dict[str, Any]:
+        # Format sources for explainability
+        sources = []
+        for chunk in chunks:
+            source_info = {
+                "content": chunk.text[:200] + "..." if len(chunk.text) > 200 else chunk.text,
+                "metadata": chunk.metadata,
+                # Chroma distance (lower is more similar)
+                "similarity_score": chunk.distance
+            }
+            sources.append(source_info)
+        
+        return {
+            "answer": answer,
+            "sources": sources,
+            "confidence": self._calculate_confidence(sources),
+            "interface_language": interface_language,
+            "content_language": content_language,
+            "subject": subject,
+            "retrieved_chunks": len(chunks)
+        }
+    
+    def query_batch(
+        self,
+        questions: List[str],
+        interface_language: str = "en",
+        content_language: str = None,
+        subject: str = None,
+        max_results: int = 4,
+        max_concurrency: int = RAG_BATCH_LLM_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the RAG system for several questions of one subject at once
+        
+        All questions are embedded in one forward pass of the model (cache
+        hits excluded) and searched with one multi-query Chroma call (one
+        vectorstore search per question with RAG_ENGINE=chain); the answers
+        are then generated in parallel, at most `max_concurrency` LLM calls
+        at a time.
+        
+        Returns:
+            One response per question, in order, shaped like `query` responses
+        """
+        if not questions:
+            return []
+        if not self.is_available(subject):
+            return [self._get_fallback_response(question, interface_language) for question in questions]
+        
+        collection_name = self._get_collection_name(subject)
+        try:
+            if RAG_ENGINE == "chain":
+                retrieved = self._retrieve_chain(subject, questions, max_results, content_language)
+                if retrieved is None:
+                    return [self._get_fallback_response(question, interface_language) for question in questions]
+            else:
+                retrieved = self._get_engine().retrieve(collection_name, questions, max_results, content_language)
+        except Exception as e:
+            logger.error(f"❌ Failed to process RAG batch query for subject '{subject}': {e}")
+            return [self._get_fallback_response(question, interface_language) for question in questions]
+        
+        def answer(index: int) -> Dict[str, Any]:
+            question, chunks = questions[index], retrieved[index]
+            try:
+                text = self._answer_chunks(subject, question, chunks)
+            except Exception as e:
+                logger.error(f"❌ Failed to answer RAG batch question {index} for subject '{subject}': {e}")
+                return self._get_fallback_response(question, interface_language)
+            return self._answer_response(question, text, chunks, interface_language, content_language, subject)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(questions))),
+                                thread_name_prefix="rag-batch") as pool:
+            responses = list(pool.map(answer, range(len(questions))))
+        
+        logger.info(f"✅ RAG batch of {len(questions)} questions processed for collection '{collection_name}'")
+        return responses
+    
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._query_executor is None:
+            with self._components_lock:
+                if self._query_executor is None:
+                    self._query_executor = ThreadPoolExecutor(
+                        max_workers=RAG_QUERY_WORKERS, thread_name_prefix="rag-query"
+                    )
+        return self._query_executor
+    
+    async def aquery(
+        self,
+        question: str,
+        interface_language: str = "en",
+        content_language: str = None,
+        subject: str = None,
+        max_results: int = 4
+    ) -> Dict[str, Any]:
+        """
+        `query` for async callers
+        
+        Retrieval runs on the RAG thread pool. With the direct engine the LLM
+        call is awaited on the event loop, so no thread waits on it.
+        """
+        loop = asyncio.get_running_loop()
+        if RAG_ENGINE == "chain":
+            return await loop.run_in_executor(self._executor(), functools.partial(
+                self.query, question, interface_language, content_language, subject, max_results
+            ))
+        
+        available = await loop.run_in_executor(self._executor(), self.is_available, subject)
+        if not available:
+            return self._get_fallback_response(question, interface_language)
+        try:
+            engine = self._get_engine()
+            retrieved = await loop.run_in_executor(self._executor(), functools.partial(
+                engine.retrieve, self._get_collection_name(subject), [question], max_results, content_language
+            ))
+            answer = await engine.aanswer(question, retrieved[0])
+            return self._answer_response(question, answer, retrieved[0], interface_language, content_language, subject)
+        except Exception as e:
+            logger.error(f"❌ Failed to process RAG query for subject '{subject}': {e}")
+            return self._get_fallback_response(question, interface_language)
+    
+    async def aquery_batch(self, **kwargs) -> List[Dict[str, Any]]:
+        """`query_batch` on the RAG thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), functools.partial(self.query_batch, **kwargs))
+    
     def _calculate_confidence(self, sources: List[Dict]) -> float:
         """
         Calculate confidence score based on retrieved sources
@@ -370,7 +713,7 @@ class RAGService:
     def get_collection_stats(self, subject: str = None) -> Dict[str, Any]:
         """Get statistics about the knowledge base for a subject"""
         try:
-            if not self.client:
+            if not self._ensure_initialized():
                 return {"error": "ChromaDB client not initialized"}
             
             collection_name = self._get_collection_name(subject)
@@ -383,7 +726,7 @@ class RAGService:
                     "total_documents": count,
                     "collection_name": collection_name,
                     "subject": subject,
-                    "embedding_model": "paraphrase-multilingual-MiniLM-L12-v2"
+                    "embedding_model": EMBEDDING_MODEL_NAME
                 }
             except Exception as collection_error:
                 # Collection might not exist yet
@@ -391,7 +734,7 @@ class RAGService:
                     "total_documents": 0,
                     "collection_name": collection_name,
                     "subject": subject,
-                    "embedding_model": "paraphrase-multilingual-MiniLM-L12-v2",
+                    "embedding_model": EMBEDDING_MODEL_NAME,
                     "note": "Collection not yet created"
                 }
                 
@@ -402,14 +745,13 @@ class RAGService:
     def get_all_subjects(self) -> List[str]:
         """Get list of all subjects with collections"""
         try:
-            if not self.client:
+            if not self._ensure_initialized():
                 return []
             
-            collections = self.client.list_collections()
+            names = self._collection_names(self.client.list_collections())
             subjects = []
             
-            for collection in collections:
-                name = collection.name
+            for name in names:
                 if name.startswith("artori_"):
                     # Extract subject from collection name
                     subject = name.replace("artori_", "").replace("_", " ").title()
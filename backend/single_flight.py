@@ -0,0 +1,176 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When a class takes the same test, many students ask for the same
+explanation at the same moment. `SingleFlight.do(key, fn)` runs `fn` once
+per key at a time: callers that arrive while a call for their key is in
+flight await that call's result instead of starting their own. The shared
+call runs in its own task, so a caller that disconnects does not cancel it
+for the others.
+
+Across uvicorn workers, a pluggable `FlightLock` elects one worker per key.
+The default lock is process-local and always granted. `MongoFlightLock`
+keeps short-lived lock documents in `llm_flight_locks`. A worker that
+finds the key locked polls the shared result store through `recheck`
+(e.g. the explanation cache) until the other worker has stored its result.
+
+Per-key counters (calls started, callers coalesced, results taken from
+another worker) are kept for the most recently used keys.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FLIGHT_LOCKS_COLLECTION = "llm_flight_locks"
+
+# "local" (per process) or "mongo" (shared by every worker)
+SINGLE_FLIGHT_LOCK = os.getenv("SINGLE_FLIGHT_LOCK", "local")
+# Seconds a cross-worker lock is held before another worker may take over
+SINGLE_FLIGHT_LOCK_TTL_SECONDS = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL_SECONDS", "60"))
+# How often and how long a worker waits for another worker's result
+SINGLE_FLIGHT_POLL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_SECONDS", "0.25"))
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "45"))
+# Keys with their own counters; older keys are folded into the totals only
+SINGLE_FLIGHT_TRACKED_KEYS = 1000
+
+
+class FlightLock:
+    """Process-local lock: every worker runs its own call"""
+
+    distributed = False
+
+    async def acquire(self, db, key: str, ttl_seconds: float) -> Optional[str]:
+        """Token if this worker now owns `key`, None if another worker does"""
+        return "local"
+
+    async def release(self, db, key: str, token: str):
+        pass
+
+
+class MongoFlightLock(FlightLock):
+    """Cross-worker lock backed by one document per key (db is an AsyncDatabase)"""
+
+    distributed = True
+
+    async def acquire(self, db, key: str, ttl_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        now = datetime.utcnow()
+        try:
+            # Takes a missing or expired lock; a live one makes the upsert collide on _id
+            await db[FLIGHT_LOCKS_COLLECTION].update_one(
+                {"_id": key, "expires_at": {"$lt": now}},
+                {"$set": {"token": token, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+            return token
+        except DuplicateKeyError:
+            return None
+
+    async def release(self, db, key: str, token: str):
+        await db[FLIGHT_LOCKS_COLLECTION].delete_one({"_id": key, "token": token})
+
+
+def create_flight_lock(kind: str = SINGLE_FLIGHT_LOCK) -> FlightLock:
+    """Lock implementation selected by SINGLE_FLIGHT_LOCK"""
+    if kind == "mongo":
+        return MongoFlightLock()
+    if kind != "local":
+        logger.warning(f"⚠️ Unknown SINGLE_FLIGHT_LOCK '{kind}', using the process-local lock")
+    return FlightLock()
+
+
+class SingleFlight:
+    def __init__(self, name: str, lock: Optional[FlightLock] = None,
+                 lock_ttl_seconds: float = SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+                 poll_seconds: float = SINGLE_FLIGHT_POLL_SECONDS,
+                 wait_seconds: float = SINGLE_FLIGHT_WAIT_SECONDS):
+        self.name = name
+        self.lock = lock or FlightLock()
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.wait_seconds = wait_seconds
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._keys: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.calls = 0
+        self.coalesced = 0
+        self.remote_results = 0
+
+    def _count(self, key: str, counter: str):
+        setattr(self, counter, getattr(self, counter) + 1)
+        counters = self._keys.get(key)
+        if counters is None:
+            counters = self._keys[key] = {"calls": 0, "coalesced": 0, "remote_results": 0}
+            if len(self._keys) > SINGLE_FLIGHT_TRACKED_KEYS:
+                self._keys.popitem(last=False)
+        self._keys.move_to_end(key)
+        counters[counter] += 1
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 recheck: Optional[Callable[[], Awaitable[Any]]] = None, db=None) -> Any:
+        """
+        Result of `fn()`, shared with every concurrent caller using the same key
+
+        Args:
+            recheck: Reads the shared result store; with a distributed lock and `db`,
+                a worker that loses the lock waits for this to return a result
+        """
+        shared = self._in_flight.get(key)
+        if shared is None:
+            shared = asyncio.ensure_future(self._lead(key, fn, recheck, db))
+            self._in_flight[key] = shared
+            shared.add_done_callback(lambda done: self._in_flight.pop(key, None)
+                                     if self._in_flight.get(key) is done else None)
+        else:
+            self._count(key, "coalesced")
+        return await asyncio.shield(shared)
+
+    async def _lead(self, key: str, fn, recheck, db) -> Any:
+        if not self.lock.distributed or recheck is None or db is None:
+            self._count(key, "calls")
+            return await fn()
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            token = await self.lock.acquire(db, key, self.lock_ttl_seconds)
+            if token is not None:
+                try:
+                    self._count(key, "calls")
+                    return await fn()
+                finally:
+                    await self.lock.release(db, key, token)
+
+            # Another worker is computing this key; wait for its result
+            await asyncio.sleep(self.poll_seconds)
+            result = await recheck()
+            if result is not None:
+                self._count(key, "remote_results")
+                return result
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Gave up waiting for another worker on '{key}'")
+                self._count(key, "calls")
+                return await fn()
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        """Totals plus the keys that were coalesced the most"""
+        busiest = sorted(self._keys.items(), key=lambda item: item[1]["coalesced"], reverse=True)[:top]
+        requests = self.calls + self.coalesced + self.remote_results
+        return {
+            "lock": type(self.lock).__name__,
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "remote_results": self.remote_results,
+            "dedup_ratio": round((self.coalesced + self.remote_results) / requests, 4) if requests else 0.0,
+            "top_keys": [{"key": key, **counters} for key, counters in busiest if counters["coalesced"]],
+        }
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Local stub of the OpenAI chat completions API for tests and benchmarks.
+
+Answers `POST /v1/chat/completions` after a fixed latency, without any
+network access or API key. Prompts that ask for JSON get a valid
+explanation object; anything else gets a short tutor reply. Each request
+is handled on its own thread, so concurrent calls overlap like they do
+against the real API. Requests with `"stream": true` get the reply as
+`chat.completion.chunk` Server-Sent Events: the first token after the
+latency, then one word per token interval.
+
+Point the backend at it with:
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+
+Usage:
+    python stub_llm_server.py --port 8787 --latency-ms 1000 --token-interval-ms 20
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from llm_provider import reply_for
+
+
+class StubLLMState:
+    """Counters and knobs shared by the request handlers"""
+
+    def __init__(self, latency_ms: float = 1000, fail_rate: float = 0.0, token_interval_ms: float = 20):
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.token_interval_ms = token_interval_ms
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = 0
+
+
+def build_completion(model: str, content: str, prompt_tokens: int) -> dict:
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def build_chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> dict:
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+def make_handler(state: StubLLMState):
+    class StubLLMHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, model: str, content: str):
+            """Write the reply word by word as SSE chunks (the first after the latency)"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            words = content.split(" ")
+            for index, word in enumerate(words):
+                if index:
+                    time.sleep(state.token_interval_ms / 1000)
+                token = word if index == 0 else f" {word}"
+                delta = {"role": "assistant", "content": token} if index == 0 else {"content": token}
+                self._write_event(build_chunk(completion_id, model, delta))
+            self._write_event(build_chunk(completion_id, model, {}, finish_reason="stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _write_event(self, payload: dict):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                time.sleep(state.latency_ms / 1000)
+                if state.fail_rate and random.random() < state.fail_rate:
+                    with state.lock:
+                        state.failures += 1
+                    self._send_json(500, {"error": {"message": "Stub failure", "type": "server_error"}})
+                    return
+
+                messages = request.get("messages", [])
+                prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+                content = reply_for(messages)
+                if request.get("stream"):
+                    self._send_stream(request.get("model", "stub"), content)
+                    return
+                self._send_json(200, build_completion(request.get("model", "stub"), content, prompt_tokens))
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return StubLLMHandler
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 makes extra concurrent connects wait for a SYN retry (~1 s)
+    request_queue_size = 128
+
+
+def start_stub_server(port: int = 0, latency_ms: float = 1000, fail_rate: float = 0.0,
+                      token_interval_ms: float = 20) -> Tuple[ThreadingHTTPServer, StubLLMState, str]:
+    """
+    Start the stub in a background thread
+
+    Returns:
+        (server, state, base_url) - call server.shutdown() when done
+    """
+    state = StubLLMState(latency_ms=latency_ms, fail_rate=fail_rate, token_interval_ms=token_interval_ms)
+    server = StubHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the OpenAI chat completions API")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=1000)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--token-interval-ms", type=float, default=20, help="Delay between streamed tokens")
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub_server(args.port, args.latency_ms, args.fail_rate, args.token_interval_ms)
+    print(f"🧪 Stub LLM listening on {base_url} (latency {args.latency_ms:.0f}ms, fail rate {args.fail_rate})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n✅ Served {state.requests} requests (max {state.max_in_flight} concurrent)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
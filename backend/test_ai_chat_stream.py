@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check that the AI tutor chat streams tokens as they are generated.
+
+Starts the local stub LLM in streaming mode, points AIService at it and
+consumes stream_chat_response. The first token should arrive after about
+one stub latency, well before the full reply is complete. A service
+without a client must deliver its fallback message through the same stream.
+
+Usage:
+    python test_ai_chat_stream.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from stub_llm_server import start_stub_server
+
+STUB_LATENCY_MS = 300
+TOKEN_INTERVAL_MS = 40
+
+MESSAGES = [{"role": "user", "content": "Can you explain this question step by step?"}]
+
+
+async def consume_stream(service):
+    started = time.perf_counter()
+    arrivals_ms = []
+    events = []
+    async for event in service.stream_chat_response(messages=MESSAGES, language="en"):
+        arrivals_ms.append((time.perf_counter() - started) * 1000)
+        events.append(event)
+    total_ms = (time.perf_counter() - started) * 1000
+    return events, arrivals_ms, total_ms
+
+
+def test_tokens_stream_before_completion():
+    """The first token arrives long before the last one"""
+    server, state, base_url = start_stub_server(latency_ms=STUB_LATENCY_MS, token_interval_ms=TOKEN_INTERVAL_MS)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    try:
+        from ai_service import AIService
+        service = AIService()
+        assert service.is_available(), "AIService did not initialize against the stub"
+
+        events, arrivals_ms, total_ms = asyncio.run(consume_stream(service))
+        tokens = [event for event in events if event["type"] == "token"]
+        first_token_ms = arrivals_ms[0] if arrivals_ms else 0.0
+
+        print(f"   {len(tokens)} tokens, first after {first_token_ms:.0f} ms, complete after {total_ms:.0f} ms")
+        assert tokens and len(tokens) == len(events), f"Expected only token events, got {events}"
+        assert "stub tutor reply" in "".join(event["content"] for event in tokens)
+        assert first_token_ms < STUB_LATENCY_MS * 2, \
+            f"First token took {first_token_ms:.0f} ms"
+        # Each token must arrive on its own, about one stub token interval after the previous one;
+        # a buffered reply arrives in one burst. A few late reads may still merge two gaps.
+        gaps = [later - earlier for earlier, later in zip(arrivals_ms, arrivals_ms[1:])]
+        spaced = sum(1 for gap in gaps if gap >= TOKEN_INTERVAL_MS / 2)
+        assert spaced >= 0.8 * len(gaps), \
+            f"Tokens were buffered instead of streamed: {spaced} of {len(gaps)} gaps were a token interval apart"
+
+        stats = service.stats()
+        assert stats["streams"] == 1 and stats["stream_ttfb_p50_ms"] > 0
+        print(f"   stats: ttfb p50 {stats['stream_ttfb_p50_ms']} ms, total p50 {stats['stream_total_p50_ms']} ms")
+        print("   ✅ Tokens were streamed as they were generated")
+    finally:
+        server.shutdown()
+
+
+def test_fallback_uses_the_stream():
+    """Without a provider the fallback message is a single stream event"""
+    from ai_service import AIService
+    service = AIService()
+    service.provider = None
+
+    events, _, _ = asyncio.run(consume_stream(service))
+    assert len(events) == 1 and events[0]["type"] == "fallback", f"Unexpected events: {events}"
+    assert events[0]["reason"] == "unavailable" and events[0]["content"]
+    print("   ✅ Fallback message delivered through the stream")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streamed AI tutor chat against the stub LLM")
+    print("=" * 60)
+    try:
+        test_tokens_stream_before_completion()
+        test_fallback_uses_the_stream()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ AI chat streaming test complete!")
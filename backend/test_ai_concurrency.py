@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Check that concurrent AI explanation requests overlap instead of queueing.
+
+Starts the local stub LLM, points AIService at it and fires N concurrent
+generate_explanation calls. With the async client they must all be in
+flight at the stub together and finish in about one LLM latency, and the
+event loop must stay responsive meanwhile.
+
+Usage:
+    python test_ai_concurrency.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from stub_llm_server import start_stub_server
+
+STUB_LATENCY_MS = 500
+CONCURRENT_REQUESTS = 8
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list):
+    """Record how late a 10ms tick fires; a blocked loop shows up as large lag"""
+    while not stop.is_set():
+        expected = time.perf_counter() + 0.01
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - expected) * 1000)
+
+
+def explain(service, question: str):
+    return service.generate_explanation(
+        question=question,
+        options=[{"id": "a", "text": "A"}, {"id": "b", "text": "B"}],
+        correct_answer="a",
+        selected_answer="b",
+        subject="Math"
+    )
+
+
+async def run_concurrent_explanations(service, state):
+    # One call first so client setup and the first connection are not timed
+    await explain(service, "Warm-up question")
+    with state.lock:
+        state.max_in_flight = 0
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(explain(service, f"Question {i}") for i in range(CONCURRENT_REQUESTS)))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stop.set()
+    await ticker
+    return results, elapsed_ms, max(lags) if lags else 0.0
+
+
+def test_concurrent_explanations_overlap():
+    """N concurrent explanations take about one stub latency, not N"""
+    server, state, base_url = start_stub_server(latency_ms=STUB_LATENCY_MS)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_MAX_CONCURRENCY"] = str(CONCURRENT_REQUESTS)
+
+    try:
+        from ai_service import AIService
+        service = AIService()
+        assert service.is_available(), "AIService did not initialize against the stub"
+
+        results, elapsed_ms, max_lag_ms = asyncio.run(run_concurrent_explanations(service, state))
+
+        print(f"   {CONCURRENT_REQUESTS} explanations in {elapsed_ms:.0f} ms "
+              f"(stub latency {STUB_LATENCY_MS} ms, max {state.max_in_flight} in flight)")
+        print(f"   max event loop lag: {max_lag_ms:.1f} ms")
+
+        assert all(not r.get("fallback") for r in results), "Some explanations fell back"
+        assert state.max_in_flight == CONCURRENT_REQUESTS, \
+            f"Requests did not overlap: at most {state.max_in_flight} of {CONCURRENT_REQUESTS} in flight"
+        assert elapsed_ms < STUB_LATENCY_MS * 1.5, \
+            f"Requests did not overlap: {elapsed_ms:.0f} ms for {CONCURRENT_REQUESTS} calls"
+        assert max_lag_ms < STUB_LATENCY_MS / 2, f"Event loop was blocked for {max_lag_ms:.0f} ms"
+        print("   ✅ Calls overlapped and the event loop stayed responsive")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing concurrent AI explanations against the stub LLM")
+    print("=" * 60)
+    try:
+        test_concurrent_explanations_overlap()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ AI concurrency test complete!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Check that long AI tutor chats stay bounded with the server-side store.
+
+Plays a long conversation against the stub LLM: every turn sends only the
+new user message, appends the reply and runs the rolling summarization
+like the chat endpoint does. The stored history and the prompt sent to the
+LLM must stay under their token budgets however many turns are played.
+
+Usage:
+    python test_conversation_store.py --uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from stub_llm_server import start_stub_server
+
+TEST_DB = "artori_conversation_test"
+TURNS = 40
+USER_MESSAGE = "Could you explain once more why the second option is wrong? " * 8
+
+
+async def play_conversation(db, service, store):
+    from conversation_store import CONVERSATION_MAX_STORED_MESSAGES, estimate_tokens
+
+    user_id, question_id = ObjectId(), ObjectId()
+    conversation = await store.create(db, user_id, question_id, [{"role": "assistant", "content": "Hi! Ask me anything."}])
+    conversation_id = str(conversation["_id"])
+
+    prompt_tokens, stored_tokens = [], []
+    for turn in range(TURNS):
+        conversation = await store.append(db, conversation_id, user_id, question_id,
+                                          [{"role": "user", "content": f"Turn {turn}: {USER_MESSAGE}"}])
+        api_messages = service._build_chat_messages(
+            store.chat_messages(conversation), summary=conversation.get("summary")
+        )
+        prompt_tokens.append(sum(estimate_tokens(message["content"]) for message in api_messages))
+
+        reply = await service.generate_chat_response(store.chat_messages(conversation),
+                                                     summary=conversation.get("summary"))
+        assert not service.is_fallback_chat_response(reply), "Chat fell back to the canned reply"
+        await store.append(db, conversation_id, user_id, question_id,
+                           [{"role": "assistant", "content": reply}], turn=True)
+        await store.summarize_if_needed(db, conversation["_id"],
+                                        lambda summary, messages: service.summarize_conversation(summary, messages))
+
+        stored = await db.ai_conversations.find_one({"_id": conversation["_id"]})
+        stored_tokens.append(sum(message["tokens"] for message in stored["messages"]))
+
+    assert len(stored["messages"]) < CONVERSATION_MAX_STORED_MESSAGES
+    return stored, prompt_tokens, stored_tokens
+
+
+def test_long_conversation_stays_bounded(uri: str):
+    server, state, base_url = start_stub_server(latency_ms=5, token_interval_ms=0)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    client = MongoClient(uri)
+    client.drop_database(TEST_DB)
+    try:
+        from ai_service import AIService, CHAT_HISTORY_TOKEN_BUDGET
+        from conversation_store import ConversationStore
+        from database import AsyncDatabase
+
+        store = ConversationStore()
+        stored, prompt_tokens, stored_tokens = asyncio.run(
+            play_conversation(AsyncDatabase(client[TEST_DB]), AIService(), store)
+        )
+
+        print(f"   {TURNS} turns: prompt tokens first {prompt_tokens[0]}, max {max(prompt_tokens)}, "
+              f"last {prompt_tokens[-1]}")
+        print(f"   stored history max {max(stored_tokens)} tokens, {store.summaries} summaries, "
+              f"{len(stored['messages'])} messages kept")
+
+        assert stored.get("summary"), "History was never summarized"
+        assert stored["turns"] == TURNS
+        # System prompt and summary come on top of the history budget
+        assert max(prompt_tokens) < CHAT_HISTORY_TOKEN_BUDGET + 1000, "Prompt grew past the history budget"
+        assert max(stored_tokens) < store.summary_trigger_tokens + 500, "Stored history was not bounded"
+        print("   ✅ Prompt and stored history stayed bounded")
+    finally:
+        client.drop_database(TEST_DB)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default=os.getenv("TEST_MONGODB_URI", "mongodb://localhost:27017"))
+    args = parser.parse_args()
+
+    print("🧪 Testing the server-side AI tutor conversation store")
+    print("=" * 60)
+    try:
+        test_long_conversation_stays_bounded(args.uri)
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ Conversation store test complete!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Check the RAG query embedding cache.
+
+Uses a deliberately slow stand-in for the SentenceTransformer model (no
+model download needed) and checks that:
+1. repeated and whitespace-variant queries are embedded once,
+2. the in-memory LRU stays within its MB budget,
+3. embeddings spilled to disk are served after a "restart",
+4. hit ratio and embedding time saved are reported.
+
+Usage:
+    python test_embedding_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from embedding_cache import EmbeddingCache
+
+MODEL = "test-model"
+DIMENSIONS = 384
+EMBED_SECONDS = 0.02
+
+
+class SlowEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    @staticmethod
+    def vector(text):
+        seed = sum(text.encode("utf-8")) % 1000
+        return [(seed + i) / 1000 for i in range(DIMENSIONS)]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        time.sleep(EMBED_SECONDS)
+        return self.vector(text)
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(EMBED_SECONDS)
+        return [self.vector(text) for text in texts]
+
+
+def test_repeated_queries_embed_once():
+    cache, model = EmbeddingCache(max_mb=1, path=""), SlowEmbedder()
+    first = cache.get_or_embed(MODEL, "Why is option B wrong?", model.embed_query)
+    for variant in ["Why is option B wrong?", "  Why is option B\nwrong? ", "Why  is option B wrong?"]:
+        assert cache.get_or_embed(MODEL, variant, model.embed_query) == first
+    # Another model never shares entries
+    cache.get_or_embed("other-model", "Why is option B wrong?", model.embed_query)
+
+    stats = cache.stats()
+    assert len(model.calls) == 2, f"Model ran {len(model.calls)} times"
+    assert model.calls[0] == "Why is option B wrong?"
+    assert stats["hits"] == 3 and stats["misses"] == 2 and stats["hit_ratio"] == 0.6, stats
+    assert stats["embed_seconds_saved"] >= 3 * EMBED_SECONDS * 0.9, stats
+    print(f"   ✅ 5 lookups, 2 embeddings, {stats['embed_seconds_saved']}s saved")
+
+    # Only the key is normalized; the model embeds the query exactly as asked
+    cache.get_or_embed(MODEL, "  What is\nosmosis? ", model.embed_query)
+    cache.get_or_embed_many(MODEL, ["Define  diffusion", "Define diffusion"], model.embed_documents)
+    assert model.calls[2] == "  What is\nosmosis? " and model.calls[3] == ["Define  diffusion"], model.calls[2:]
+
+
+def test_memory_budget():
+    cache, model = EmbeddingCache(max_mb=0.1, path=""), SlowEmbedder()
+    for i in range(200):
+        cache.get_or_embed(MODEL, f"question {i}", lambda text: [float(i)] * DIMENSIONS)
+    stats = cache.stats()
+    assert stats["memory_mb"] <= 0.1, stats
+    assert stats["evictions"] > 0 and stats["entries"] < 200, stats
+    # The most recent entries survive
+    assert cache.get_or_embed(MODEL, "question 199", model.embed_query)[0] == 199.0 and not model.calls
+    print(f"   ✅ {stats['entries']} entries in {stats['memory_mb']} MB (budget 0.1 MB), "
+          f"{stats['evictions']} evictions")
+
+
+def test_disk_spill_survives_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "embeddings.sqlite3")
+        model = SlowEmbedder()
+        before = EmbeddingCache(max_mb=1, path=path)
+        expected = before.get_or_embed(MODEL, "What is photosynthesis?", model.embed_query)
+
+        after = EmbeddingCache(max_mb=1, path=path)
+        assert after.get_or_embed(MODEL, "What is photosynthesis?", model.embed_query) == expected
+        assert len(model.calls) == 1, "Embedding was recomputed after restart"
+        assert after.stats()["disk_hits"] == 1
+        print("   ✅ Embedding served from disk after restart")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the query embedding cache")
+    print("=" * 60)
+    try:
+        test_repeated_queries_embed_once()
+        test_memory_budget()
+        test_disk_spill_survives_restart()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ Embedding cache test complete!")
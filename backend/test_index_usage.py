@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Verify that every hot query in main.py is served by an index.
+
+Runs the migrations against a scratch database on a local mongod, then
+calls explain() on each query shape used by the API and fails if any
+winning plan falls back to a COLLSCAN.
+
+Usage:
+    MONGODB_TEST_URI=mongodb://localhost:27017 python test_index_usage.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from migrations import run_migrations
+from user_search import build_search_tokens
+
+MONGODB_TEST_URI = os.getenv("MONGODB_TEST_URI", "mongodb://localhost:27017")
+TEST_DB = "artori_index_test"
+
+
+def collect_stages(plan):
+    """Flatten the stage names of an explain() plan tree"""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages.extend(collect_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(collect_stages(child))
+    # Slot-based engine plans nest the classic tree under queryPlan
+    if "queryPlan" in plan:
+        stages.extend(collect_stages(plan["queryPlan"]))
+    return stages
+
+
+def seed(db, ids):
+    """Insert one representative document per collection"""
+    now = datetime.utcnow()
+    db.users.insert_one({"_id": ids["user"], "email": "student@artori.app", "name": "Student",
+                         "search_tokens": build_search_tokens("Student", "student@artori.app"),
+                         "created_at": now, "updated_at": now})
+    db.exams.insert_one({"_id": ids["exam"], "name": "ENEM", "subjects": [{"_id": ids["subject"], "name": "Math"}]})
+    db.questions.insert_one({"_id": ids["question"], "subject_id": ids["subject"], "created_at": now})
+    db.user_progress.insert_one({"user_id": ids["user"], "exam_id": ids["exam"], "subject_id": ids["subject"]})
+    db.user_answers.insert_one({"user_id": ids["user"], "session_id": ids["session"], "question_id": ids["question"],
+                                "answered_at": now})
+    db.test_sessions.insert_one({"user_id": ids["user"], "exam_id": ids["exam"], "subject_id": ids["subject"],
+                                 "status": "completed", "end_time": now})
+    db.admin_activity_logs.insert_one({"admin_id": ids["user"], "timestamp": now})
+    db.time_series_data.insert_one({"metric_name": "user_engagement", "timestamp": now})
+    db.analytics_metrics.insert_one({"metric_type": "system_performance", "date": now})
+    db.system_settings.insert_one({"category": "general"})
+    db.admin_preferences.insert_one({"admin_id": ids["user"]})
+
+
+def hot_queries(ids):
+    """(label, collection, filter, sort) for each query shape issued by main.py"""
+    now = datetime.utcnow()
+    return [
+        ("login / signup email lookup", "users", {"email": "student@artori.app"}, None),
+        ("admin user listing", "users", {}, [("created_at", -1), ("_id", -1)]),
+        ("admin user listing after cursor", "users",
+         {"$or": [{"created_at": {"$lt": now}}, {"created_at": now, "_id": {"$lt": ids["user"]}},
+                  {"created_at": None}]},
+         [("created_at", -1), ("_id", -1)]),
+        ("admin user search", "users", {"search_tokens": {"$all": ["stu", "artori"]}},
+         [("created_at", -1), ("_id", -1)]),
+        ("new users today", "users", {"created_at": {"$gte": now - timedelta(days=1)}}, None),
+        ("answer progress lookup", "user_progress",
+         {"user_id": ids["user"], "exam_id": ids["exam"], "subject_id": ids["subject"]}, None),
+        ("dashboard progress", "user_progress", {"user_id": ids["user"], "exam_id": ids["exam"]}, None),
+        ("admin progress detail", "user_progress", {"user_id": ids["user"]}, None),
+        ("session answers by time range", "user_answers",
+         {"user_id": ids["user"], "answered_at": {"$gte": now - timedelta(hours=1), "$lte": now}}, None),
+        ("session answers", "user_answers",
+         {"session_id": ids["session"], "user_id": ids["user"]}, [("answered_at", 1)]),
+        ("answers of a question", "user_answers", {"question_id": ids["question"]}, None),
+        ("subject questions", "questions", {"subject_id": ids["subject"]}, None),
+        ("admin question listing", "questions", {"subject_id": ids["subject"]}, [("created_at", -1), ("_id", -1)]),
+        ("explanation pre-generation walk", "questions",
+         {"subject_id": {"$gt": ids["subject"]}}, [("subject_id", 1), ("_id", 1)]),
+        ("exam of a subject", "exams", {"subjects._id": ids["subject"]}, None),
+        ("latest completed session", "test_sessions",
+         {"user_id": ids["user"], "exam_id": ids["exam"], "subject_id": ids["subject"], "status": "completed"},
+         [("end_time", -1)]),
+        ("admin activity feed", "admin_activity_logs", {}, [("timestamp", -1)]),
+        ("trending data", "time_series_data",
+         {"metric_name": "user_engagement", "timestamp": {"$gte": now - timedelta(days=7)}}, [("timestamp", 1)]),
+        ("performance metrics", "analytics_metrics",
+         {"metric_type": "system_performance", "date": {"$gte": now - timedelta(days=7)}}, [("date", -1)]),
+        ("settings by category", "system_settings", {"category": "general"}, None),
+        ("admin preferences", "admin_preferences", {"admin_id": ids["user"]}, None),
+    ]
+
+
+def test_hot_queries_use_indexes():
+    """Fail if any hot query from main.py is planned as a collection scan"""
+    client = MongoClient(MONGODB_TEST_URI, serverSelectionTimeoutMS=3000)
+    client.drop_database(TEST_DB)
+    db = client[TEST_DB]
+
+    try:
+        run_migrations(db)
+        # Second run must be a no-op
+        assert run_migrations(db) == [], "Migrations are not idempotent"
+
+        ids = {name: ObjectId() for name in ["user", "exam", "subject", "question", "session"]}
+        seed(db, ids)
+
+        failures = []
+        for label, collection, query_filter, sort in hot_queries(ids):
+            cursor = db[collection].find(query_filter)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = cursor.explain()["queryPlanner"]["winningPlan"]
+            stages = collect_stages(plan)
+            status = "COLLSCAN" if "COLLSCAN" in stages else "index"
+            print(f"   {'❌' if status == 'COLLSCAN' else '✅'} {label:<32} {collection:<20} {' <- '.join(s for s in stages if s)}")
+            if status == "COLLSCAN":
+                failures.append(label)
+
+        assert not failures, f"Queries falling back to COLLSCAN: {failures}"
+    finally:
+        client.drop_database(TEST_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    print("🧪 Checking index usage of hot queries")
+    print("=" * 60)
+    try:
+        test_hot_queries_use_indexes()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ All hot queries use an index")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+End-to-end check of the explanation pre-generation job against the stub LLM.
+
+Seeds a small question bank in a throwaway database on a local mongod, runs
+the job against stub_llm_server.py and checks that every variant is pinned
+under the key get_ai_explanation looks up. A second run must resume from
+the checkpoint and generate nothing. Prints the throughput and cost report.
+
+Usage:
+    python test_pregenerate_explanations.py --uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from stub_llm_server import start_stub_server
+
+TEST_DB = "artori_pregeneration_test"
+QUESTIONS_PER_SUBJECT = 6
+LANGUAGES = ["en", "pt"]
+STUB_LATENCY_MS = 100
+
+
+def seed(db):
+    """Two subjects with QUESTIONS_PER_SUBJECT three-option questions each"""
+    subject_ids = [ObjectId(), ObjectId()]
+    db.exams.insert_one({
+        "name": "Pre-generation exam",
+        "subjects": [{"_id": subject_id, "name": f"Subject {i}"} for i, subject_id in enumerate(subject_ids)]
+    })
+    db.questions.insert_many([
+        {
+            "subject_id": subject_id,
+            "question": f"Question {i}",
+            "options": [{"id": option, "text": option.upper()} for option in ("a", "b", "c")],
+            "correct_answer": "a",
+            "difficulty": "easy",
+            "created_at": datetime.utcnow()
+        }
+        for subject_id in subject_ids
+        for i in range(QUESTIONS_PER_SUBJECT)
+    ])
+
+
+def test_pregeneration(uri: str):
+    server, state, base_url = start_stub_server(latency_ms=STUB_LATENCY_MS)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    client = MongoClient(uri)
+    client.drop_database(TEST_DB)
+    try:
+        from ai_service import AIService
+        from database import AsyncDatabase
+        from explanation_cache import explanation_cache_key
+        from migrations import run_migrations
+        from pregenerate_explanations import pregenerate_explanations, print_report
+
+        raw = client[TEST_DB]
+        run_migrations(raw)
+        seed(raw)
+        db = AsyncDatabase(raw)
+        service = AIService()
+
+        # Generic explanation plus one per option, per language
+        expected = QUESTIONS_PER_SUBJECT * 2 * len(LANGUAGES) * 4
+        report = asyncio.run(pregenerate_explanations(db, service, LANGUAGES, answers="all",
+                                                      concurrency=8, batch_size=4))
+        print_report(report)
+        assert report["generated"] == expected, f"Generated {report['generated']}, expected {expected}"
+        assert raw.ai_explanations.count_documents({"pinned": True, "expires_at": None}) == expected
+
+        question = raw.questions.find_one()
+        key = explanation_cache_key(question["_id"], "b", "pt", service.model, service.explanation_prompt_version)
+        assert raw.ai_explanations.find_one({"_id": key}), "Entry not stored under the endpoint's cache key"
+        print(f"   ✅ {expected} explanations pinned ({state.max_in_flight} LLM calls in flight at most)")
+
+        requests_before = state.requests
+        report = asyncio.run(pregenerate_explanations(db, service, LANGUAGES, answers="all"))
+        assert report["resumed"] and report["generated"] == 0 and state.requests == requests_before, \
+            f"Resumed run called the LLM again: {report}"
+        print("   ✅ Second run resumed from the checkpoint without LLM calls")
+
+        report = asyncio.run(pregenerate_explanations(db, service, LANGUAGES, answers="all", restart=True))
+        assert report["skipped"] == expected and report["generated"] == 0, f"Restart regenerated entries: {report}"
+        print("   ✅ Restart skipped every cached variant")
+    finally:
+        client.drop_database(TEST_DB)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default=os.getenv("TEST_MONGODB_URI", "mongodb://localhost:27017"))
+    args = parser.parse_args()
+
+    print("🧪 Testing explanation pre-generation against the stub LLM")
+    print("=" * 60)
+    try:
+        test_pregeneration(args.uri)
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ Explanation pre-generation test complete!")
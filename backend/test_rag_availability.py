@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Check the cached per-subject RAG availability registry.
+
+Against a throw-away local Chroma store (fake embeddings, stub LLM):
+1. warm-up populates the registry from the existing collections,
+2. repeated checks, including for a missing subject, list the
+   collections at most once per refresh interval and build no
+   vectorstores or chains,
+3. ingesting documents makes a subject available at once,
+4. a collection created behind the service's back shows up after the
+   refresh interval, without the check itself waiting on Chroma.
+
+Usage:
+    python test_rag_availability.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ.pop("CHROMA_API_KEY", None)
+
+from langchain.embeddings import DeterministicFakeEmbedding
+from langchain.schema import Document
+
+import rag_service as rag_module
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from rag_service import RAGService
+
+CHECKS = 1000
+
+
+def create_service(persist_directory: str) -> RAGService:
+    service = RAGService(persist_directory=persist_directory)
+
+    def fake_embeddings():
+        service.embeddings = DeterministicFakeEmbedding(size=32)
+        service.query_embeddings = CachedEmbeddings(service.embeddings, "fake", EmbeddingCache(max_mb=1, path=""))
+
+    service._initialize_embeddings = fake_embeddings
+    return service
+
+
+def count_listings(service: RAGService) -> list:
+    calls = []
+    list_collections = service.client.list_collections
+
+    def counted():
+        calls.append(1)
+        return list_collections()
+
+    service.client.list_collections = counted
+    return calls
+
+
+def test_registry(persist_directory: str):
+    seeding = create_service(persist_directory)
+    assert seeding.add_documents([Document(page_content="Derivatives measure change", metadata={})], "math")
+
+    service = create_service(persist_directory)
+    assert service.warm_up()
+    assert "artori_math" in service.availability_stats()["collections"], "Warm-up did not load the registry"
+
+    listings = count_listings(service)
+    started = time.perf_counter()
+    for _ in range(CHECKS):
+        assert service.is_available("math")
+        assert not service.is_available("history")
+    elapsed_us = (time.perf_counter() - started) / (2 * CHECKS) * 1e6
+    assert not listings, f"Collections listed {len(listings)} times within the refresh interval"
+    assert not service.vectorstores and not service.answer_chains, "Availability checks built LangChain objects"
+    print(f"   ✅ {2 * CHECKS} checks served from the registry ({elapsed_us:.1f} µs each)")
+
+    assert service.add_documents([Document(page_content="Cells divide by mitosis", metadata={})], "biology")
+    assert service.is_available("biology"), "Ingested subject not available"
+    print("   ✅ Ingested subject available immediately")
+
+    # Created by another process: seen once the registry is refreshed
+    seeding.add_documents([Document(page_content="The French Revolution began in 1789", metadata={})], "history")
+    assert not service.is_available("history")
+    rag_module.RAG_AVAILABILITY_REFRESH_SECONDS = 0.2
+    time.sleep(0.3)
+    # The stale check answers from the registry and refreshes it in the background
+    assert not service.is_available("history"), "Check waited for the collection listing"
+    service._refresh_thread.join(timeout=5)
+    assert service.is_available("history"), "Registry was not refreshed"
+    assert len(listings) == 1
+    print("   ✅ New collection picked up after the refresh interval")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the RAG availability registry")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as persist_directory:
+        try:
+            test_registry(persist_directory)
+        except AssertionError as e:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+    print("\n✅ RAG availability test complete!")
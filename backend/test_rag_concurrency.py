@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stress test of concurrent RAG queries with mixed filters.
+
+Ingests chunks in three content languages into a throw-away local Chroma
+collection, then runs many queries at once from a thread pool, each with
+its own `k` and `content_language` filter (or none). Every result must
+honour exactly its own parameters: a filter or `k` set by one request must
+never leak into another, and unfiltered queries must still see all
+languages after filtered ones ran. An LLM that returns no answer gives
+the same fallback response through `query`, `aquery` and `query_batch`.
+
+Runs offline: deterministic fake embeddings stand in for the
+SentenceTransformer model and the stub provider answers instead of OpenAI.
+
+Usage:
+    python test_rag_concurrency.py --queries 300 --threads 32
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ.setdefault("STUB_LLM_LATENCY_MS", "5")
+os.environ.setdefault("STUB_LLM_TOKENS_PER_SECOND", "0")
+os.environ.pop("CHROMA_API_KEY", None)
+
+from langchain.embeddings import DeterministicFakeEmbedding
+from langchain.schema import Document
+
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from llm_provider import LLMCompletion
+from rag_service import RAGService
+
+SUBJECT = "stress"
+LANGUAGES = ["en", "pt", "es"]
+CHUNKS_PER_LANGUAGE = 10
+MAX_K = 6
+
+
+def create_service(persist_directory: str) -> RAGService:
+    service = RAGService(persist_directory=persist_directory)
+
+    def fake_embeddings():
+        service.embeddings = DeterministicFakeEmbedding(size=64)
+        service.query_embeddings = CachedEmbeddings(service.embeddings, "fake", EmbeddingCache(max_mb=1, path=""))
+
+    service._initialize_embeddings = fake_embeddings
+    documents = [
+        Document(page_content=f"[{language}] Study note {i} about photosynthesis and cell energy",
+                 metadata={"content_language": language, "note": i})
+        for language in LANGUAGES for i in range(CHUNKS_PER_LANGUAGE)
+    ]
+    assert service.add_documents(documents, subject=SUBJECT), "Ingestion failed"
+    return service
+
+
+def check_result(params: dict, result: dict):
+    assert not result.get("fallback"), f"Query fell back: {result.get('error')}"
+    languages = {source["metadata"]["content_language"] for source in result["sources"]}
+    assert result["retrieved_chunks"] == params["max_results"], \
+        f"Asked for k={params['max_results']}, got {result['retrieved_chunks']}"
+    if params["content_language"]:
+        assert languages == {params["content_language"]}, \
+            f"Filter {params['content_language']} returned {languages}"
+    return languages
+
+
+def test_mixed_filters(service: RAGService, queries: int, threads: int):
+    rng = random.Random(7)
+    requests = [
+        {
+            "question": f"Question {i}: how do plants turn light into energy?",
+            "content_language": rng.choice(LANGUAGES + [None]),
+            "max_results": rng.randint(1, MAX_K),
+            "subject": SUBJECT,
+        }
+        for i in range(queries)
+    ]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda params: service.query(**params), requests))
+    elapsed = time.perf_counter() - started
+
+    unfiltered_languages = set()
+    for params, result in zip(requests, results):
+        languages = check_result(params, result)
+        if not params["content_language"]:
+            unfiltered_languages |= languages
+    assert unfiltered_languages == set(LANGUAGES), \
+        f"Unfiltered queries only saw {unfiltered_languages} (a filter leaked)"
+    print(f"   ✅ {queries} queries on {threads} threads isolated ({queries / elapsed:.0f} queries/s)")
+
+
+def test_async_queries(service: RAGService, queries: int):
+    async def run():
+        requests = [{"question": f"Async question {i}", "content_language": LANGUAGES[i % 3] if i % 2 else None,
+                     "max_results": 1 + i % MAX_K, "subject": SUBJECT} for i in range(queries)]
+        results = await asyncio.gather(*(service.aquery(**params) for params in requests))
+        for params, result in zip(requests, results):
+            check_result(params, result)
+
+    asyncio.run(run())
+    print(f"   ✅ {queries} concurrent aquery calls isolated")
+
+
+def test_batch_queries(service: RAGService):
+    # Batches running concurrently with different parameters stay isolated too
+    def batch(language):
+        params = {"content_language": language, "max_results": 3, "subject": SUBJECT}
+        questions = [f"Batch question {i} in {language}" for i in range(10)]
+        return params, service.query_batch(questions, **params)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        batches = list(pool.map(batch, LANGUAGES + [None]))
+    for params, results in batches:
+        assert len(results) == 10
+        for result in results:
+            check_result(params, result)
+            assert all(source["similarity_score"] is not None for source in result["sources"])
+    print(f"   ✅ {len(batches)} concurrent query_batch calls isolated")
+
+
+def test_empty_answers_fall_back(service: RAGService):
+    provider = service._get_engine().provider
+    complete, complete_blocking = provider.complete, provider.complete_blocking
+
+    async def no_content(*args, **kwargs):
+        return LLMCompletion(content=None)
+
+    provider.complete = no_content
+    provider.complete_blocking = lambda *args, **kwargs: LLMCompletion(content=None)
+    try:
+        params = {"question": "Why do leaves turn yellow?", "subject": SUBJECT}
+        responses = {
+            "query": service.query(**params),
+            "aquery": asyncio.run(service.aquery(**params)),
+            "query_batch": service.query_batch([params["question"]], subject=SUBJECT)[0],
+        }
+    finally:
+        provider.complete, provider.complete_blocking = complete, complete_blocking
+
+    for path, response in responses.items():
+        assert response.get("fallback"), f"{path} returned {response.get('answer')!r} instead of the fallback"
+    print("   ✅ query, aquery and query_batch fall back alike when the LLM returns no answer")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    print("🧪 Stress testing concurrent RAG queries with mixed filters")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as persist_directory:
+        service = create_service(persist_directory)
+        try:
+            test_mixed_filters(service, args.queries, args.threads)
+            test_async_queries(service, 100)
+            test_batch_queries(service)
+            test_empty_answers_fall_back(service)
+        except AssertionError as e:
+            print(f"\n❌ {e}")
+            sys.exit(1)
+    print("\n✅ RAG concurrency test complete!")
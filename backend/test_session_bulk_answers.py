@@ -0,0 +1,75 @@
+import os
+import sys
+
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BASE_URL = os.getenv("TEST_BASE_URL", "http://127.0.0.1:8000/api/v1")
+TEST_EMAIL = os.getenv("TEST_EMAIL", "test@example.com")
+TEST_PASSWORD = os.getenv("TEST_PASSWORD", "TestPassword123!")
+
+
+def test_bulk_session_answers():
+    """Submit a whole test session in one call and check per-answer results"""
+
+    print("🧪 Testing bulk answer submission for test sessions")
+    print("=" * 50)
+
+    # Step 1: Login
+    print("\n1. Logging in...")
+    login_response = requests.post(f"{BASE_URL}/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert login_response.status_code == 200, f"Login failed: {login_response.status_code} {login_response.text}"
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    print("   ✅ Login successful")
+
+    # Step 2: Pick an exam / subject and its questions
+    print("\n2. Loading questions...")
+    exams = requests.get(f"{BASE_URL}/exams", headers=headers).json()
+    assert exams, "No exams available"
+    exam = requests.get(f"{BASE_URL}/exams/{exams[0]['id']}", headers=headers).json()
+    subject_id = exam["subjects"][0]["id"]
+    questions = requests.get(f"{BASE_URL}/exams/{exam['id']}/subjects/{subject_id}/questions", headers=headers).json()
+    assert questions, "Subject has no questions"
+    print(f"   Exam: {exam['name']} | {len(questions)} questions")
+
+    # Step 3: Create a session and submit every answer at once
+    print("\n3. Submitting session answers in bulk...")
+    session_response = requests.post(
+        f"{BASE_URL}/test-sessions",
+        params={"exam_id": exam["id"], "subject_id": subject_id},
+        headers=headers
+    )
+    assert session_response.status_code == 200, f"Session creation failed: {session_response.text}"
+    session_id = session_response.json()["session_id"]
+
+    answers = [{"question_id": q["id"], "answer": q["options"][0]["id"]} for q in questions]
+    response = requests.post(f"{BASE_URL}/test-sessions/{session_id}/answers", json={"answers": answers}, headers=headers)
+    assert response.status_code == 200, f"Bulk submission failed: {response.status_code} {response.text}"
+    data = response.json()
+
+    assert data["total_answers"] == len(answers), f"Expected {len(answers)} results, got {data['total_answers']}"
+    assert [r["question_id"] for r in data["results"]] == [a["question_id"] for a in answers], "Results out of order"
+    for result, answer in zip(data["results"], answers):
+        assert result["correct"] == (result["correct_answer"] == answer["answer"]), "Inconsistent correctness"
+        assert result["explanation"]["reasoning"], "Missing explanation"
+    print(f"   ✅ {data['correct_answers']}/{data['total_answers']} correct")
+
+    # Step 4: Completed sessions reject further answers
+    print("\n4. Completing session...")
+    requests.put(f"{BASE_URL}/test-sessions/{session_id}/complete", headers=headers).raise_for_status()
+    response = requests.post(f"{BASE_URL}/test-sessions/{session_id}/answers", json={"answers": answers}, headers=headers)
+    assert response.status_code == 400, f"Expected 400 for completed session, got {response.status_code}"
+    print("   ✅ Completed session rejects new answers")
+
+
+if __name__ == "__main__":
+    try:
+        test_bulk_session_answers()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n" + "=" * 50)
+    print("✅ Bulk answer test complete!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Check single-flight coalescing of identical concurrent LLM requests.
+
+1. In process: many concurrent calls with one key run the function once,
+   and a caller that is cancelled does not cancel the shared call.
+2. Against the stub LLM: concurrent identical generate_explanation calls
+   send a single request upstream.
+3. Across workers: two SingleFlight instances sharing a MongoFlightLock
+   (two simulated uvicorn workers) generate a key once; the other worker
+   picks the result up from the shared store.
+
+Usage:
+    python test_single_flight.py --uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from single_flight import MongoFlightLock, SingleFlight
+from stub_llm_server import start_stub_server
+
+CONCURRENT_CALLERS = 50
+TEST_DB = "artori_single_flight_test"
+
+
+async def coalesce_in_process():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"value": 42}
+
+    results = await asyncio.gather(*(flight.do("same", slow_call) for _ in range(CONCURRENT_CALLERS)))
+    assert len(calls) == 1, f"Function ran {len(calls)} times"
+    assert all(result == {"value": 42} for result in results)
+
+    # Cancelling one waiter leaves the shared call running for the rest
+    calls.clear()
+    first = asyncio.ensure_future(flight.do("cancel", slow_call))
+    second = asyncio.ensure_future(flight.do("cancel", slow_call))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    assert await second == {"value": 42} and len(calls) == 1
+
+    stats = flight.stats()
+    assert stats["coalesced"] == CONCURRENT_CALLERS, stats
+    assert stats["top_keys"][0]["key"] == "same"
+    print(f"   ✅ {CONCURRENT_CALLERS} callers shared one call (dedup ratio {stats['dedup_ratio']})")
+
+
+def test_in_process():
+    asyncio.run(coalesce_in_process())
+
+
+def test_identical_explanations_share_one_llm_call():
+    server, state, base_url = start_stub_server(latency_ms=300)
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    try:
+        from ai_service import AIService
+        service = AIService()
+
+        async def explain(selected_answer):
+            return await service.generate_explanation(
+                question="What is 2 + 2?",
+                options=[{"id": "a", "text": "4"}, {"id": "b", "text": "5"}],
+                correct_answer="a",
+                selected_answer=selected_answer,
+                subject="Math"
+            )
+
+        async def run():
+            return await asyncio.gather(*([explain("b") for _ in range(20)] + [explain("a")]))
+
+        results = asyncio.run(run())
+        assert all(not result.get("fallback") for result in results)
+        assert state.requests == 2, f"Expected 2 upstream calls (two distinct answers), got {state.requests}"
+        print(f"   ✅ 21 explanation requests sent {state.requests} LLM calls")
+    finally:
+        server.shutdown()
+
+
+async def coalesce_across_workers(db):
+    store = {}
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.3)
+        store["key"] = {"value": "generated once"}
+        return store["key"]
+
+    async def recheck():
+        return store.get("key")
+
+    lock = MongoFlightLock()
+    workers = [SingleFlight(f"worker-{i}", lock=lock, poll_seconds=0.05) for i in range(2)]
+    results = await asyncio.gather(*(
+        worker.do("shared-key", generate, recheck=recheck, db=db)
+        for worker in workers for _ in range(5)
+    ))
+    assert len(calls) == 1, f"Generated {len(calls)} times across workers"
+    assert all(result == {"value": "generated once"} for result in results)
+    assert sum(worker.remote_results for worker in workers) == 1
+    assert await db.llm_flight_locks.count_documents({}) == 0, "Lock was not released"
+    print("   ✅ Two workers generated the key once through the shared lock")
+
+
+def test_across_workers(uri: str):
+    from database import AsyncDatabase
+    client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"   ⚠️ MongoDB not available at {uri} ({type(e).__name__}), skipping cross-worker check")
+        client.close()
+        return
+
+    client.drop_database(TEST_DB)
+    try:
+        asyncio.run(coalesce_across_workers(AsyncDatabase(client[TEST_DB])))
+    finally:
+        client.drop_database(TEST_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default=os.getenv("TEST_MONGODB_URI", "mongodb://localhost:27017"))
+    args = parser.parse_args()
+
+    print("🧪 Testing single-flight coalescing")
+    print("=" * 60)
+    try:
+        test_in_process()
+        test_identical_explanations_share_one_llm_call()
+        test_across_workers(args.uri)
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n✅ Single-flight test complete!")
@@ -0,0 +1,153 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BASE_URL = os.getenv("TEST_BASE_URL", "http://127.0.0.1:8000/api/v1")
+TEST_EMAIL = os.getenv("TEST_EMAIL", "test@example.com")
+TEST_PASSWORD = os.getenv("TEST_PASSWORD", "TestPassword123!")
+PARALLEL_ANSWERS = 100
+
+
+def get_subject_progress(headers, subject_id):
+    """Return (questions_solved, correct_answers) for a subject from the dashboard"""
+    response = requests.get(f"{BASE_URL}/users/me/dashboard", headers=headers)
+    response.raise_for_status()
+    progress = response.json().get("user_progress") or {}
+    for subject in progress.get("subject_progress", []):
+        if subject["subject_id"] == subject_id:
+            return subject["questions_solved"], subject["correct_answers"]
+    return 0, 0
+
+
+def test_parallel_answers_do_not_lose_increments():
+    """Submit 100 answers in parallel and check every one is counted in progress"""
+
+    print("🧪 Testing concurrent answer submission")
+    print("=" * 50)
+
+    # Step 1: Login
+    print("\n1. Logging in...")
+    login_response = requests.post(f"{BASE_URL}/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert login_response.status_code == 200, f"Login failed: {login_response.status_code} {login_response.text}"
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    print("   ✅ Login successful")
+
+    # Step 2: Select the first exam and pick a question
+    print("\n2. Selecting exam and question...")
+    exams = requests.get(f"{BASE_URL}/exams", headers=headers).json()
+    assert exams, "No exams available"
+    exam = requests.get(f"{BASE_URL}/exams/{exams[0]['id']}", headers=headers).json()
+    requests.post(f"{BASE_URL}/users/me/exam", json={"exam_id": exam["id"]}, headers=headers).raise_for_status()
+    subject_id = exam["subjects"][0]["id"]
+    questions = requests.get(f"{BASE_URL}/exams/{exam['id']}/subjects/{subject_id}/questions", headers=headers).json()
+    assert questions, "Subject has no questions"
+    question = questions[0]
+    answer = question["options"][0]["id"]
+    print(f"   Exam: {exam['name']} | Question: {question['id']}")
+
+    solved_before, correct_before = get_subject_progress(headers, subject_id)
+    print(f"   Progress before: {solved_before} solved, {correct_before} correct")
+
+    # Step 3: Fire the answers in parallel
+    print(f"\n3. Submitting {PARALLEL_ANSWERS} answers in parallel...")
+
+    def submit(_):
+        response = requests.post(
+            f"{BASE_URL}/questions/{question['id']}/answer",
+            json={"answer": answer},
+            headers=headers
+        )
+        response.raise_for_status()
+        return response.json()["correct"]
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_ANSWERS) as pool:
+        results = list(pool.map(submit, range(PARALLEL_ANSWERS)))
+    expected_correct = sum(1 for correct in results if correct)
+
+    # Step 4: Every submission must be reflected in progress
+    print("\n4. Checking progress...")
+    solved_after, correct_after = get_subject_progress(headers, subject_id)
+    print(f"   Progress after: {solved_after} solved, {correct_after} correct")
+
+    assert solved_after - solved_before == PARALLEL_ANSWERS, \
+        f"Lost increments: expected +{PARALLEL_ANSWERS}, got +{solved_after - solved_before}"
+    assert correct_after - correct_before == expected_correct, \
+        f"Lost correct increments: expected +{expected_correct}, got +{correct_after - correct_before}"
+    print("   ✅ No lost increments")
+
+
+def test_session_answers_are_validated():
+    """A single answer tagged with a session must fit that session, like bulk answers"""
+
+    print("\n🧪 Testing session checks on single answers")
+    print("=" * 50)
+
+    login_response = requests.post(f"{BASE_URL}/auth/login", json={"email": TEST_EMAIL, "password": TEST_PASSWORD})
+    assert login_response.status_code == 200, f"Login failed: {login_response.status_code} {login_response.text}"
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    exams = requests.get(f"{BASE_URL}/exams", headers=headers).json()
+    assert exams, "No exams available"
+    exam = requests.get(f"{BASE_URL}/exams/{exams[0]['id']}", headers=headers).json()
+    subject_id = exam["subjects"][0]["id"]
+    questions = requests.get(f"{BASE_URL}/exams/{exam['id']}/subjects/{subject_id}/questions", headers=headers).json()
+    assert questions, "Subject has no questions"
+    question = questions[0]
+    answer = question["options"][0]["id"]
+
+    session_response = requests.post(
+        f"{BASE_URL}/test-sessions",
+        params={"exam_id": exam["id"], "subject_id": subject_id},
+        headers=headers
+    )
+    assert session_response.status_code == 200, f"Session creation failed: {session_response.text}"
+    session_id = session_response.json()["session_id"]
+
+    def submit(question_id, session):
+        return requests.post(
+            f"{BASE_URL}/questions/{question_id}/answer",
+            json={"answer": answer, "session_id": session},
+            headers=headers
+        )
+
+    response = submit(question["id"], "0" * 24)
+    assert response.status_code == 404, f"Expected 404 for an unknown session, got {response.status_code}"
+
+    response = submit(question["id"], session_id)
+    assert response.status_code == 200, f"Answer in session failed: {response.status_code} {response.text}"
+    print("   ✅ Answer accepted for an open session of its subject")
+
+    # A question of another subject must not be tagged into the session
+    other_subjects = exam["subjects"][1:]
+    if other_subjects:
+        other_id = other_subjects[0]["id"]
+        others = requests.get(f"{BASE_URL}/exams/{exam['id']}/subjects/{other_id}/questions", headers=headers).json()
+        if others:
+            response = submit(others[0]["id"], session_id)
+            assert response.status_code == 400, \
+                f"Expected 400 for a question of another subject, got {response.status_code}"
+            print("   ✅ Question of another subject rejected")
+    else:
+        print("   ⚠️ Exam has a single subject, skipping the other-subject check")
+
+    requests.put(f"{BASE_URL}/test-sessions/{session_id}/complete", headers=headers).raise_for_status()
+    response = submit(question["id"], session_id)
+    assert response.status_code == 400, f"Expected 400 for completed session, got {response.status_code}"
+    print("   ✅ Completed session rejected")
+
+
+if __name__ == "__main__":
+    try:
+        test_parallel_answers_do_not_lose_increments()
+        test_session_answers_are_validated()
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    print("\n" + "=" * 50)
+    print("✅ Concurrency test complete!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Indexed prefix search for the admin user directory.
+
+Each user document carries a `search_tokens` array with every prefix of
+the normalized words of their name and email. Normalization lowercases
+the text and strips accents. Searching "jo sil" then becomes an equality
+match on a multikey index (`{"search_tokens": {"$all": ["jo", "sil"]}}`)
+instead of an unanchored case-insensitive `$regex` over the collection.
+
+Tokens are written by the signup and admin user create/update handlers.
+Users created outside the API can be backfilled with:
+
+Usage:
+    python user_search.py            # (re)build search tokens for every user
+"""
+
+import os
+import re
+import sys
+import logging
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.database import Database
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Prefixes longer than this are not stored; longer search terms are truncated
+MAX_PREFIX_LENGTH = 20
+BACKFILL_BATCH_SIZE = 1000
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase, accent-free words of `text`"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    return [word for word in _WORD_SPLIT.split(ascii_text) if word]
+
+
+def build_search_tokens(name: Optional[str], email: Optional[str]) -> List[str]:
+    """Every prefix of every normalized word of the user's name and email"""
+    words = set(normalize(name or "")) | set(normalize(email or ""))
+    # The full local part lets "john.doe" style searches match as one term
+    if email and "@" in email:
+        words.add("".join(normalize(email.split("@", 1)[0])))
+
+    tokens = set()
+    for word in words:
+        for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1):
+            tokens.add(word[:length])
+    return sorted(tokens)
+
+
+def search_filter(search: str) -> Dict[str, Any]:
+    """Query filter matching users whose tokens cover every term of `search`"""
+    terms = sorted({term[:MAX_PREFIX_LENGTH] for term in normalize(search)})
+    if not terms:
+        # Only punctuation or symbols: nothing can match, rather than dropping the filter
+        return {"search_tokens": {"$in": []}}
+    if len(terms) == 1:
+        return {"search_tokens": terms[0]}
+    return {"search_tokens": {"$all": terms}}
+
+
+def backfill_search_tokens(db: Database) -> int:
+    """Rebuild `search_tokens` for every user (db is a pymongo Database)"""
+    updated = 0
+    operations = []
+    for user in db.users.find({}, {"name": 1, "email": 1}):
+        tokens = build_search_tokens(user.get("name"), user.get("email"))
+        operations.append(UpdateOne({"_id": user["_id"]}, {"$set": {"search_tokens": tokens}}))
+        if len(operations) == BACKFILL_BATCH_SIZE:
+            updated += db.users.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += db.users.bulk_write(operations, ordered=False).modified_count
+    return updated
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database import create_mongo_client
+
+    mongodb_uri = os.getenv("MONGODB_URI") or os.getenv("MONGODB_URL")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI or MONGODB_URL environment variable is required")
+        sys.exit(1)
+
+    client = create_mongo_client(mongodb_uri, profile="batch")
+    updated = backfill_search_tokens(client.artori)
+    print(f"✅ Search tokens rebuilt ({updated} users updated)")
+
+
+if __name__ == "__main__":
+    main()
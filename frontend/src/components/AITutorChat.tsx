@@ -43,6 +43,7 @@ export const AITutorChat = ({
   const [inputMessage, setInputMessage] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const [isInitialized, setIsInitialized] = useState(false);
+  const [conversationId, setConversationId] = useState<string | undefined>();
   const scrollAreaRef = useRef<HTMLDivElement>(null);
   const chatMutation = useChatMessage();
 
@@ -116,13 +117,16 @@ Feel free to ask me anything about this question!`,
     setIsLoading(true);
 
     try {
-      // Convert messages to ChatMessage format for API
-      const chatMessages: ChatMessage[] = messages.map((msg) => ({
-        role: msg.role === "user" ? "user" : "assistant",
-        content: msg.content,
-      }));
+      // The server keeps the history once a conversation exists, so only the
+      // first request carries the earlier messages
+      const chatMessages: ChatMessage[] = conversationId
+        ? []
+        : messages.map((msg) => ({
+            role: msg.role === "user" ? "user" : "assistant",
+            content: msg.content,
+          }));
 
-      // Add the new user message to the conversation history
+      // Add the new user message to the conversation
       chatMessages.push({
         role: "user",
         content: inputMessage.trim(),
@@ -131,7 +135,9 @@ Feel free to ask me anything about this question!`,
       const response = await chatMutation.mutateAsync({
         questionId: question.id,
         messages: chatMessages,
+        conversationId,
       });
+      setConversationId(response.conversation_id);
 
       const assistantMessage: Message = {
         id: (Date.now() + 1).toString(),
@@ -173,6 +179,7 @@ Feel free to ask me anything about this question!`,
     setMessages([]);
     setInputMessage("");
     setIsInitialized(false);
+    setConversationId(undefined);
     onClose();
   };
 
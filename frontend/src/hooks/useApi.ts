@@ -140,10 +140,12 @@ export const useChatMessage = () => {
     mutationFn: ({
       questionId,
       messages,
+      conversationId,
     }: {
       questionId: string;
       messages: ChatMessage[];
-    }) => apiClient.sendChatMessage(questionId, messages),
+      conversationId?: string;
+    }) => apiClient.sendChatMessage(questionId, messages, conversationId),
   });
 };
 
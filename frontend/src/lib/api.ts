@@ -380,6 +380,7 @@ export interface ChatMessage {
 // Chat request interface
 export interface ChatRequest {
   messages: ChatMessage[];
+  conversation_id?: string;
 }
 
 // Chat response interface
@@ -516,13 +517,19 @@ class ApiClient {
     );
   }
 
+  // With a conversationId, only the new messages need to be sent
   async sendChatMessage(
     questionId: string,
-    messages: ChatMessage[]
+    messages: ChatMessage[],
+    conversationId?: string
   ): Promise<ChatResponse> {
+    const body: ChatRequest = { messages };
+    if (conversationId) {
+      body.conversation_id = conversationId;
+    }
     return this.request<ChatResponse>(`/questions/${questionId}/ai-chat`, {
       method: "POST",
-      body: JSON.stringify({ messages }),
+      body: JSON.stringify(body),
     });
   }
 